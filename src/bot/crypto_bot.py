@@ -9,14 +9,23 @@ from time import sleep
 import pandas as pd
 from bs4 import BeautifulSoup
 from src.db.psql import PostgresConnection
+from src.db.connection_pool import close_pool
+from src.db.write_behind import WriteBehindQueue
 from src.utils.utils import is_in_range, create_calendar_list, is_day_of_the_month, is_valid_market, normalize_inf_rows_dicts, add_saved_timestamp, normalize_index, calculate_base_currency_volume, is_valid_pair
 from src.utils.logger import Logger
-from src.exceptions import LargeLossError, TradeFailureError, InsufficientFundsError, MixedTradeError, MissingTickError, NoDataError, DatabaseError
+from src.exceptions import LargeLossError, TradeFailureError, InsufficientFundsError, MixedTradeError, MissingTickError, NoDataError
 from src.utils.reporter import Reporter
 from src.utils.plotter import Plotter
 from src.exchange.exchange_adaptor import ExchangeAdaptor
 from src.exchange.coinmarketcap.core import Market
 from src.exchange.coinmarketcap import coinmarketcap_usd_history2
+from src.data_structures.ring_buffer import RingBuffer
+from src.data_structures.bar_aggregator import BarAggregator
+from src.data_structures.date_index import DateIndex
+from src.indicators.indicator_registry import IndicatorRegistry
+from src.bot.strategy_pool import StrategyPool
+from src.bot.vector_backtester import VectorBacktester, compress_summaries
+from src.bot.index_backtester import IndexBacktester, is_rebalance_day, compress_balances, rebalance_holdings
 
 MAX_CURRENCY_PER_BUY = {
     'BTC': .2,
@@ -32,13 +41,26 @@ ORDER_BOOK_DEPTH = 20
 REQUIRE_STRAT_CONSENSUS = os.getenv('REQUIRE_STRAT_CONSENSUS', 'FALSE') == 'TRUE'
 SEND_REPORTS = os.getenv('SEND_REPORTS', 'FALSE') == 'TRUE'
 TARGET_PAIR_TICKERS = os.getenv('TARGET_PAIR_TICKERS', 'FALSE') == 'TRUE'
+TICK_BUFFER_SIZE = int(os.getenv('TICK_BUFFER_SIZE', 1000))
+MAJOR_BAR_SIZE = str(MAJOR_TICK_SIZE) + 't'
+STRAT_WORKERS = int(os.getenv('STRAT_WORKERS', 0))  # 0 runs the strats in process
+EXTRA_BAR_SIZES = [b for b in os.getenv('EXTRA_BAR_SIZES', '').split(',') if b != '' and b != MAJOR_BAR_SIZE]
 
 class CryptoBot:
     def __init__(self, strats):
         log.info('Initializing bot...')
         self.psql = PostgresConnection()
+        # trades, index snapshots and cmc tickers are persisted in the background
+        self.writer = WriteBehindQueue()
+        self.writer.register('trades', self.psql.save_trades)
+        self.writer.register('index_balances', self.psql.save_index_balances)
+        self.writer.register('index_metadata', self.psql.save_index_metadata)
+        self.writer.register('cmc_tickers', lambda tickers: self.psql.save_cmc_tickers(tickers, []))
         self.ex = ExchangeAdaptor()
         self.strats = strats['v1_strats']
+        self.indicators = IndicatorRegistry()
+        for strat in self.strats:
+            strat.use_indicator_registry(self.indicators)
         self.index_strats = strats['index_strats']
         self.trade_functions = {'buy': self.buy_limit, 'sell': self.sell_limit}
         self.base_coins = ['btc']
@@ -50,6 +72,7 @@ class CryptoBot:
         self.cmc_rate_limit = datetime.timedelta(minutes=5)
         self.cmc_historical_data = None
         self.all_cmc_historical_data = None
+        self.cmc_date_index = None
         self.test_date = datetime.date(2017, 1, 1)
         self.index_calc_window = datetime.timedelta(days=90)
         self.one_day = datetime.timedelta(days=1)
@@ -73,6 +96,9 @@ class CryptoBot:
         self.currencies = []
         self.compressed_tickers = {}
         self.tickers = {}
+        self.pending_bars = {}
+        self.strategy_pool = None
+        self.bars = dict((bar_size, {}) for bar_size in EXTRA_BAR_SIZES)
         # self.init_markets()
         self.pairs_to_watch = []
         self.accounts = []
@@ -82,6 +108,7 @@ class CryptoBot:
         self.plotter = Plotter()
         self.exchange = 'gemini'
         self.exchanges = ['gemini', 'binance', 'bittrex']
+        self.bar_aggregator = BarAggregator.for_exchange([MAJOR_BAR_SIZE] + EXTRA_BAR_SIZES, self.exchange)
         self.exchange_pairs = {}
         self.balances = self.init_balances()
         self.valid_mkt_coins = None
@@ -95,10 +122,16 @@ class CryptoBot:
         self.init_valid_mkt_coins()
         for p, pair in self.exchange_pairs[self.exchange].items():
             if self.is_valid_pair(pair):
-                self.compressed_tickers[p] = pd.DataFrame()
-                self.tickers[p] = pd.DataFrame()
+                self.compressed_tickers[p] = RingBuffer(TICK_BUFFER_SIZE)
+                self.tickers[p] = RingBuffer(TICK_BUFFER_SIZE)
+                self.pending_bars[p] = []
+                for bar_size in EXTRA_BAR_SIZES:
+                    self.bars[bar_size][p] = RingBuffer(TICK_BUFFER_SIZE)
         for strat in self.strats:
             strat.init_market_positions(self.exchange_pairs[self.exchange])
+        if STRAT_WORKERS > 0:
+            self.strategy_pool = StrategyPool(self.strats, STRAT_WORKERS, TICK_BUFFER_SIZE)
+            self.strategy_pool.start(dict((p, self.exchange_pairs[self.exchange][p]) for p in self.compressed_tickers))
 
     def init_balances(self):
         if BACKTESTING:
@@ -153,50 +186,86 @@ class CryptoBot:
         self.cash_out()
         self.analyze_performance()
 
+    def run_vector_test(self, strat_class=None, options=None, param_grid=None):
+        """
+            backtests the v1 strats over the whole fixture history in one pass instead of tick by tick
+            with <param_grid> runs a parameter sweep of <strat_class> instead
+        :return: <DataFrame> the trades, or one row per parameter combination for a sweep
+        """
+        log.info('* * * ! * * * BEGIN VECTOR TEST RUN * * * ! * * *')
+        pairs = dict((p, self.exchange_pairs[self.exchange][p]) for p in self.compressed_tickers)
+        summaries = self.psql.get_all_market_summaries(tuple(pairs))
+        balances = dict((row['coin'], row['balance']) for idx, row in self.balances.iterrows())
+        backtester = VectorBacktester(self.strats, pairs, balances, MAX_CURRENCY_PER_BUY, REQUIRE_STRAT_CONSENSUS)
+        backtester.load_bars(compress_summaries(summaries, MAJOR_TICK_SIZE))
+        if param_grid is not None:
+            return backtester.sweep(strat_class, options, param_grid)
+        trades = backtester.run()
+        log.info('vector test net values :: ' + str(backtester.get_net_values()))
+        return trades
+
+    def run_index_batch(self, runs, start_date=None, end_date=None):
+        """
+            backtests many index configurations off one load of the cmc history, then saves every
+            configuration's index balances in one bulk write
+        :param runs: <List> <IndexRun>
+        :return: (<DataFrame> index balances, <List> index metadata)
+        """
+        log.info('* * * ! * * * BEGIN INDEX BATCH TEST RUN :: ' + str(len(runs)) + ' indexes * * * ! * * *')
+        backtester = IndexBacktester(runs)
+        backtester.load(self.load_cmc_date_index(), self.psql.get_cmc_coin_metadata())
+        index_balances, index_metadata = backtester.run(self.test_date if start_date is None else start_date, end_date)
+        if not index_balances.empty:
+            self.psql.save_index(index_balances, index_metadata)
+        return index_balances, index_metadata
+
     def run_stock_index_test(self, opts):
         self.rebalance_frequency = opts["rebalance_frequency"]
         log.info('* * * ! * * * BEGIN STOCK INDEX TEST RUN * * * ! * * *')
         self.stock_index = True
         self.balances = self.init_balances()
-        while self.test_date < datetime.date.today():
-            try:
-                self.tick_step_stock_index()
-                self.test_date += self.one_day
-            except NoDataError as e:
-                self.test_date += self.one_day
+        try:
+            while self.test_date < datetime.date.today():
+                try:
+                    self.tick_step_stock_index()
+                    self.test_date += self.one_day
+                except NoDataError as e:
+                    self.test_date += self.one_day
+        finally:
+            # index snapshots are written in the background, drain them before returning
+            self.writer.stop()
 
     def run_cmc_index_test(self, opts):
         self.rebalance_frequency = opts["rebalance_frequency"]
         log.info('* * * ! * * * BEGIN CMC INDEX TEST RUN * * * ! * * *')
         self.stock_index = False
         self.balances = self.init_balances()
-        while self.test_date < datetime.date.today():
-            self.tick_step_index()
-            if self.should_rebalance_index():
-                self.rebalance_index_holdings()
-            self.test_date += self.one_day
+        try:
+            while self.test_date < datetime.date.today():
+                self.tick_step_index()
+                if self.should_rebalance_index():
+                    self.rebalance_index_holdings()
+                self.test_date += self.one_day
+        finally:
+            self.writer.stop()
 
     def run_cmc_ema_index_test(self):
         log.info('* * * ! * * * BEGIN CMC EMA INDEX TEST RUN * * * ! * * *')
         self.index_calc_window = datetime.timedelta(days=self.index_strats[0].ema_window)
         self.stock_index = False
         self.balances = self.init_balances()
-        while self.test_date < datetime.date.today():
-            self.calc_ema_index()
-            if self.should_rebalance_index():
-                self.rebalance_index_holdings()
-            self.save_index(self.current_index[self.current_index['id'].isin(self.current_index_coins)])
-            self.test_date += self.one_day
+        try:
+            while self.test_date < datetime.date.today():
+                self.calc_ema_index()
+                if self.should_rebalance_index():
+                    self.rebalance_index_holdings()
+                self.save_index(self.current_index[self.current_index['id'].isin(self.current_index_coins)])
+                self.test_date += self.one_day
+        finally:
+            self.writer.stop()
 
     def should_rebalance_index(self):
-        if self.rebalance_frequency == 4:
-            return is_day_of_the_month(self.test_date, 1) or is_day_of_the_month(self.test_date, 7) or is_day_of_the_month(self.test_date, 15), is_day_of_the_month(self.test_date, 22)
-        elif self.rebalance_frequency == 3:
-            return is_day_of_the_month(self.test_date, 1) or is_day_of_the_month(self.test_date, 10) or is_day_of_the_month(self.test_date, 20)
-        elif self.rebalance_frequency == 2:
-            return is_day_of_the_month(self.test_date, 1) or is_day_of_the_month(self.test_date, 15)
-        else:
-            return is_day_of_the_month(self.test_date, 1)
+        return is_rebalance_day(self.test_date, self.rebalance_frequency)
 
     def run_collect_cmc(self):
         self.rate_limiter_reset()
@@ -213,6 +282,10 @@ class CryptoBot:
 
     def kill(self):
         log.warning('* * * ! * * * SHUTTING DOWN BOT * * * ! * * *')
+        if self.strategy_pool is not None:
+            self.strategy_pool.stop()
+        self.writer.stop()
+        close_pool()
         raise Exception
 
     def send_report(self, subj, body):
@@ -236,15 +309,25 @@ class CryptoBot:
             # get the ticker for all the markets
             for p, pair in self.exchange_pairs[self.exchange].items():
                 ticker = self.get_current_pair_ticker(pair)
-                self.tickers[pair['pair']] = self.tickers[pair['pair']].append(ticker, ignore_index=True)
+                if ticker is not None:
+                    self.add_ticker(pair['pair'], ticker.iloc[0])
         else:
             tickers = self.get_current_tickers()
             for ticker in tickers:
-                self.tickers[ticker['pair']] = self.tickers[ticker['pair']].append(ticker, ignore_index=True)
+                if ticker['pair'] in self.tickers:
+                    self.add_ticker(ticker['pair'], ticker)
 
         # end = datetime.datetime.now()
         # log.info('MINOR TICK STEP ' + str(self.tick) + ' runtime :: ' + str(end - start))
 
+    def add_ticker(self, pair, ticker):
+        self.tickers[pair].append(ticker)
+        for bar_size, bar in self.bar_aggregator.update(pair, ticker).items():
+            if bar_size == MAJOR_BAR_SIZE:
+                self.pending_bars[pair].append(bar)
+            else:
+                self.bars[bar_size][pair].append(bar)
+
     def major_tick_step(self):
         # start = datetime.datetime.now()
 
@@ -255,11 +338,18 @@ class CryptoBot:
             self.save_cmc_data()
 
         self.increment_major_tick()
-        self.compress_tickers()
-        for strat in self.strats:
-            log.info(strat.name + ' :: handle_data')
+        new_bars = self.compress_tickers()
+        if self.strategy_pool is not None:
+            # the workers evaluate their own shard of markets and send back the positions
+            self.strategy_pool.step(new_bars)
+        else:
+            # step the shared indicators once per market, every strat reads the same state
             for mkt_name, mkt_data in self.compressed_tickers.items():
-                self.compressed_tickers[mkt_name] = strat.handle_data(mkt_data, mkt_name)
+                self.indicators.update(mkt_name, mkt_data)
+            for strat in self.strats:
+                log.info(strat.name + ' :: handle_data')
+                for mkt_name, mkt_data in self.compressed_tickers.items():
+                    strat.handle_data(mkt_data, mkt_name)
         self.generate_report()
 
         # end = datetime.datetime.now()
@@ -273,10 +363,11 @@ class CryptoBot:
             self.has_index = False
             self.current_index_coins = None
         self.cmc_historical_data = self.get_cmc_historical_data(self.test_date.__str__(), start_date=(self.test_date - self.index_calc_window).__str__())
-        historical_data = self.cmc_historical_data
         self.cmc_coin_metadata = self.psql.get_cmc_coin_metadata()
         balances = self.get_compressed_balances()
-        self.current_index = self.index_strats[0].handle_data_index(historical_data, balances, self.current_index_coins)
+        # the strat steps its per coin ema state forward a day instead of recalculating the whole window
+        self.current_index = self.index_strats[0].handle_day_index(self.cmc_date_index, balances, self.current_index_coins,
+                                                                   self.test_date, self.index_calc_window.days)
         if not self.has_index:
             self.current_index_coins = self.current_index.head(self.index_strats[0].index_depth)['id'].values
             self.has_index = True
@@ -322,24 +413,23 @@ class CryptoBot:
 
     def rebalance_index_holdings(self):
         log.info('== REBALANCING INDEX ==')
-        self.current_index['balance'] = self.current_index['balance'] + self.current_index['delta_coins']
-        self.current_index['balance_usd'] = self.current_index['balance'] * self.current_index['rate_usd']
-        self.balances = self.current_index[['coin', 'id', 'balance']]
-        self.balances['exchange'] = 'test'
-        self.current_index.fillna({'exchange': 'test', 'exchange_id': 'test'}, inplace=True)
-        self.current_index.dropna(inplace=True)
-        self.balances.dropna(inplace=True)
+        self.current_index, self.balances = rebalance_holdings(self.current_index)
         # log.info("\n" + self.current_index.to_string() + "\n")
         # log.info("\n" + self.balances.to_string() + "\n")
 
+    def load_cmc_date_index(self):
+        """
+            the whole cmc history, loaded and indexed by date once per bot
+        :return: <DateIndex>
+        """
+        if self.cmc_date_index is None:
+            if self.all_cmc_historical_data is None:
+                self.all_cmc_historical_data = self.psql.get_all_cmc_historical_data()
+            self.cmc_date_index = DateIndex(self.all_cmc_historical_data)
+        return self.cmc_date_index
+
     def get_cmc_historical_data(self, date, start_date=None):
-        if self.all_cmc_historical_data is None:
-            self.all_cmc_historical_data = self.psql.get_cmc_historical_data(None, start_date=None)
-        data = self.all_cmc_historical_data
-        if date is not None:
-            data = self.all_cmc_historical_data[self.all_cmc_historical_data['date'] <= date]
-        if start_date is not None:
-            data = data[data['date'] >= start_date]
+        data = self.load_cmc_date_index().slice(start_date, date)
         if data.empty:
             raise NoDataError('self.cmc_historical_data')
         return data
@@ -365,10 +455,8 @@ class CryptoBot:
             'portfolio_balance_usd': index.head(self.index_strats[0].index_depth)['balance_usd'].sum(),
             'bitcoin_value_usd': btc_value_usd
         }
-        try:
-            self.psql.save_index(index.head(self.index_strats[0].index_depth), index_metadata)
-        except DatabaseError as e:
-            print(e)
+        self.writer.put('index_balances', index.head(self.index_strats[0].index_depth).copy())
+        self.writer.put('index_metadata', [index_metadata])
         return index
 
     def generate_cmc_index(self):
@@ -378,52 +466,25 @@ class CryptoBot:
         add_columns = []
         for strat in self.index_strats:
             add_columns += strat.add_columns
-        self.psql.save_cmc_tickers(self.cmc_data, [])
+        self.writer.put('cmc_tickers', self.cmc_data.copy())
         self.nonce += 1
 
     def compress_tickers(self):
         # start = datetime.datetime.now()
 
-        for mkt_name, mkt_data in self.tickers.items():
-            # mkt_data = mkt_data.drop(mkt_data.index[-MAJOR_TICK_SIZE:])
-            agg_funcs = {
-                'open': ['first'],
-                'high': ['max'],
-                'low': ['min'],
-                'close': ['last'],
-                'bid': ['last'],
-                'last': ['last'],
-                'ask': ['last'],
-                'pair': ['last'],
-                'vol_base': ['sum'],
-                'vol_mkt': ['sum']
-            }
-            if BACKTESTING:
-                agg_funcs['saved_timestamp'] = ['last']
-            mkt_data = mkt_data.groupby('pair').agg(agg_funcs)
-            mkt_data.columns = mkt_data.columns.droplevel(1)
-            self.compressed_tickers[mkt_name] = self.compressed_tickers[mkt_name].append(mkt_data, ignore_index=True)
-            self.tickers[mkt_name] = pd.DataFrame()
+        # bars are built as the tickers arrive, just move the finished ones over
+        new_bars = self.pending_bars
+        for mkt_name, bars in new_bars.items():
+            for bar in bars:
+                self.compressed_tickers[mkt_name].append(bar)
+        self.pending_bars = dict((mkt_name, []) for mkt_name in new_bars)
 
         # end = datetime.datetime.now()
         # log.info('COMPRESS TICKERS runtime :: ' + str(end - start))
+        return new_bars
 
     def get_compressed_balances(self):
-        balances = pd.merge(self.balances, self.cmc_coin_metadata, on='id')
-        balances = balances.rename(columns={'coin_x': 'coin'}).drop(columns=['coin_y'])
-        if 'address' in balances.columns:
-            balances.drop(columns=['address'], inplace=True)
-        agg_funcs = {
-            'balance': ['sum'],
-            'coin': ['last'],
-            'id': ['last'],
-            'exchange': lambda x: ','.join(x)
-        }
-        balances = balances.groupby('id').agg(agg_funcs)
-        balances.columns = balances.columns.droplevel(1)
-        balances.reset_index(drop=True, inplace=True)
-        # balances.rename(columns={'id': 'exchange_id'}, inplace=True)
-        return balances
+        return compress_balances(self.balances, self.cmc_coin_metadata)
 
     def enable_volume_threshold(self):
         log.info('* * * ! * * * VOLUME THRESHOLD ENABLED * * * ! * * *')
@@ -525,8 +586,7 @@ class CryptoBot:
             an InsufficientFundsError will be raised in the event that there is not enough of the desired
             base currency for a 'buy' order
         """
-        idx = len(self.compressed_tickers[pair['pair']].index)
-        rate = self.compressed_tickers[pair['pair']].loc[idx, 'last']
+        rate = self.compressed_tickers[pair['pair']].latest('last')
         if order_type == 'buy':
             base_coin = pair['base_coin']
             balance = self.get_balance(base_coin)
@@ -607,7 +667,7 @@ class CryptoBot:
         log.debug('{BOT} == CANCEL bid ==')
         try:
             trade_resp = self.cancel_order(order_id)
-            self.psql.save_trade('CANCEL', 'market', 0, 0, trade_resp['order_id'])
+            self.psql.save_trade('CANCEL', 'market', 0, 0, trade_resp['order_id'], datetime.datetime.now())
             return trade_resp
         except Exception as e:
             log.error("*** !!! TRADE FAILED !!! ***")
@@ -618,7 +678,8 @@ class CryptoBot:
         timestamp = datetime.datetime.now()
         if BACKTESTING:
             timestamp = self.get_current_timestamp()
-        trade_data = self.psql.save_trade(order_type, market, quantity, rate, order_id, timestamp)
+        trade_data = self.psql.build_trade(order_type, market, quantity, rate, order_id, timestamp)
+        self.writer.put('trades', [trade_data])
         if market in self.completed_trades:
             self.completed_trades[market] = self.completed_trades[market].append(pd.Series(trade_data), ignore_index=True)
         else:
@@ -835,7 +896,12 @@ class CryptoBot:
             hist_data['coin'] = coin['symbol']
             hist_data['id'] = coin['name']
             hist_data['website_slug'] = coin['website_slug']
-            self.psql.save_cmc_historical_data(hist_data)
+            try:
+                self.psql.save_cmc_historical_data(hist_data)
+            except Exception as e:
+                # bulk_insert raises, keep collecting the other coins like the old insert path did
+                log.error('*** POSTGRES ERROR *** cmc historical data ' + coin['name'])
+                log.error(e)
 
     def validate_cmc_data(self, cmc_data, min_date='2016-01-01', max_date='2018-07-15'):
         # used to prune data w/ long stretches of no readings
@@ -932,17 +998,18 @@ class CryptoBot:
 
     def plot_market_data(self):
         for market, trades in self.completed_trades.items():
-            self.plotter.plot_market(market, self.compressed_tickers[market], trades, self.strats)
+            self.plotter.plot_market(market, self.compressed_tickers[market].to_frame(), trades, self.strats)
 
     def generate_report(self):
         if SEND_REPORTS and self.major_tick >= 50:
-            self.reporter.generate_report(self.strats, self.exchange_pairs, self.compressed_tickers)
+            mkt_tickers = dict((mkt_name, mkt_data.to_frame()) for mkt_name, mkt_data in self.compressed_tickers.items())
+            self.reporter.generate_report(self.strats, self.exchange_pairs, mkt_tickers)
 
     def check_volume_threshold(self, mkt_data, mkt_name):
         base_currency = mkt_name.split('-')[0]
         vol_threshold = self.volume_thresholds[base_currency]
-        recent_volume = mkt_data.loc[len(mkt_data) - 1, 'volume']
-        recent_rate = mkt_data.loc[len(mkt_data) - 1, 'last']
+        recent_volume = mkt_data.latest('vol_mkt')
+        recent_rate = mkt_data.latest('last')
         recent_base_currency_trade_volume = calculate_base_currency_volume(recent_volume, recent_rate)
         return recent_base_currency_trade_volume >= vol_threshold
 
@@ -952,4 +1019,8 @@ class CryptoBot:
             df.rename(str.lower, axis='columns', inplace=True)
             df['coin'] = filename.upper()
             df['id'] = filename
-            self.psql.save_stock_historical_data(df)
+            try:
+                self.psql.save_stock_historical_data(df)
+            except Exception as e:
+                log.error('*** POSTGRES ERROR *** stock historical data ' + filename)
+                log.error(e)
@@ -0,0 +1,208 @@
+import os
+import datetime
+from multiprocessing import get_context
+import pandas as pd
+from src.utils.logger import Logger
+from src.utils.utils import is_day_of_the_month
+
+log = Logger(__name__)
+
+INDEX_BACKTEST_WORKERS = int(os.getenv('INDEX_BACKTEST_WORKERS', 0))  # 0 runs the configurations in process
+STARTING_BALANCE_USD = 1000000
+
+# the backtester the forked workers read, inherited instead of pickled
+_shared_backtester = None
+
+
+def is_rebalance_day(date, rebalance_frequency):
+    """
+    :param date: <datetime.date>
+    :param rebalance_frequency: <int> rebalances per month
+    """
+    if rebalance_frequency == 4:
+        return is_day_of_the_month(date, 1) or is_day_of_the_month(date, 7) or is_day_of_the_month(date, 15) or is_day_of_the_month(date, 22)
+    elif rebalance_frequency == 3:
+        return is_day_of_the_month(date, 1) or is_day_of_the_month(date, 10) or is_day_of_the_month(date, 20)
+    elif rebalance_frequency == 2:
+        return is_day_of_the_month(date, 1) or is_day_of_the_month(date, 15)
+    else:
+        return is_day_of_the_month(date, 1)
+
+
+def compress_balances(balances, coin_metadata):
+    """
+    :param balances: <DataFrame> columns = coin, id, balance, exchange (one row per exchange)
+    :param coin_metadata: <DataFrame> cmc_coin_metadata
+    :return: <DataFrame> one row per coin
+    """
+    balances = pd.merge(balances, coin_metadata, on='id')
+    balances = balances.rename(columns={'coin_x': 'coin'}).drop(columns=['coin_y'])
+    if 'address' in balances.columns:
+        balances.drop(columns=['address'], inplace=True)
+    agg_funcs = {
+        'balance': ['sum'],
+        'coin': ['last'],
+        'id': ['last'],
+        'exchange': lambda x: ','.join(x)
+    }
+    balances = balances.groupby('id').agg(agg_funcs)
+    balances.columns = balances.columns.droplevel(1)
+    balances.reset_index(drop=True, inplace=True)
+    return balances
+
+
+def rebalance_holdings(current_index):
+    """
+        trades the holdings to the index weights
+    :param current_index: <DataFrame> index with deltas, see handle_data_index
+    :return: (current_index, balances) after the trades
+    """
+    current_index['balance'] = current_index['balance'] + current_index['delta_coins']
+    current_index['balance_usd'] = current_index['balance'] * current_index['rate_usd']
+    balances = current_index[['coin', 'id', 'balance']].copy()
+    balances['exchange'] = 'test'
+    current_index.fillna({'exchange': 'test', 'exchange_id': 'test'}, inplace=True)
+    current_index.dropna(inplace=True)
+    balances.dropna(inplace=True)
+    return current_index, balances
+
+
+def run_shared(run_num):
+    """
+        worker entry point, runs one configuration against the backtester inherited from the parent
+    """
+    return _shared_backtester.run_index(run_num)
+
+
+class IndexRun:
+    def __init__(self, strat, rebalance_frequency=1, index_id=None):
+        """
+            one index configuration of a batch backtest, the per index state CryptoBot keeps for one run
+        :param strat: <IndexStrat2> or <EMAIndexStrat>
+        :param rebalance_frequency: <int> rebalances per month
+        :param index_id: <str> defaults to the strat name
+        """
+        self.strat = strat
+        self.rebalance_frequency = rebalance_frequency
+        self.index_id = strat.name if index_id is None else index_id
+        self.balances = None
+        self.current_index = None
+        self.current_index_coins = None
+        self.has_index = False
+        self.index_balances = []
+        self.index_metadata = []
+
+    def is_ema_index(self):
+        return hasattr(self.strat, 'handle_day_index')
+
+    def init_balances(self, day_data):
+        btc = day_data[day_data['id'] == 'Bitcoin']
+        btc_price = btc['close'].values[0] if len(btc) > 0 else 10000000
+        self.balances = pd.DataFrame([{'coin': 'BTC', 'exchange': 'gemini', 'balance': STARTING_BALANCE_USD / btc_price,
+                                       'address': '0x0', 'id': 'Bitcoin'}])
+
+    def step(self, date, date_index, coin_metadata):
+        """
+            one simulated day, same order of calc / rebalance / save as run_cmc_index_test and run_cmc_ema_index_test
+        :param date: <datetime.date>
+        :param date_index: <DateIndex> cmc history
+        :param coin_metadata: <DataFrame> cmc_coin_metadata
+        """
+        day_data = date_index.on_date(date)
+        if day_data.empty:
+            return
+        if self.balances is None:
+            self.init_balances(day_data)
+        should_rebalance = is_rebalance_day(date, self.rebalance_frequency)
+        if (self.is_ema_index() and should_rebalance) or (not self.is_ema_index() and is_day_of_the_month(date, 1)):
+            self.has_index = False
+            self.current_index_coins = None
+        balances = compress_balances(self.balances, coin_metadata)
+        if self.is_ema_index():
+            self.current_index = self.strat.handle_day_index(date_index, balances, self.current_index_coins, date,
+                                                             self.strat.ema_window)
+        else:
+            self.current_index = self.strat.handle_data_index(day_data, balances, self.current_index_coins)
+        if 'index_pct' not in self.current_index.columns:
+            # not enough history to score the index yet
+            return
+        if not self.has_index:
+            self.current_index_coins = self.current_index.head(self.strat.index_depth)['id'].values
+            self.has_index = True
+        if not self.is_ema_index():
+            self.snapshot(date)
+        if should_rebalance:
+            self.current_index, self.balances = rebalance_holdings(self.current_index)
+        if self.is_ema_index():
+            self.snapshot(date)
+
+    def snapshot(self, date):
+        index = self.current_index[self.current_index['id'].isin(self.current_index_coins)].head(self.strat.index_depth).copy()
+        index_date = date.strftime('%Y-%m-%d')
+        index['index_date'] = index_date
+        index['index_id'] = self.index_id
+        self.index_balances.append(index)
+        self.index_metadata.append({
+            'index_id': self.index_id,
+            'index_date': index_date,
+            'portfolio_balance_usd': index['balance_usd'].sum(),
+            'bitcoin_value_usd': index[index['id'] == 'Bitcoin']['balance_usd'].sum()
+        })
+
+
+class IndexBacktester:
+    def __init__(self, runs):
+        """
+            backtests many index configurations over one shared copy of the cmc history
+        :param runs: <List> <IndexRun>
+        """
+        self.runs = runs
+        self.date_index = None
+        self.coin_metadata = None
+        self.start_date = None
+        self.end_date = None
+
+    def load(self, date_index, coin_metadata):
+        """
+        :param date_index: <DateIndex> the whole cmc_historical_data table
+        :param coin_metadata: <DataFrame> cmc_coin_metadata
+        """
+        self.date_index = date_index
+        self.coin_metadata = coin_metadata
+
+    def run_index(self, run_num):
+        """
+        :return: (<DataFrame> index balances, <List> index metadata) of one configuration
+        """
+        run = self.runs[run_num]
+        date = self.start_date
+        while date <= self.end_date:
+            run.step(date, self.date_index, self.coin_metadata)
+            date += datetime.timedelta(days=1)
+        log.info('index backtest done :: ' + run.index_id)
+        index_balances = pd.concat(run.index_balances, ignore_index=True) if len(run.index_balances) > 0 else pd.DataFrame()
+        return index_balances, run.index_metadata
+
+    def run(self, start_date, end_date=None, workers=INDEX_BACKTEST_WORKERS):
+        """
+        :param start_date: <datetime.date>
+        :param end_date: <datetime.date> defaults to yesterday
+        :param workers: <int> processes to spread the configurations over, 0 runs them in process
+        :return: (<DataFrame> index balances, <List> index metadata) of every configuration
+        """
+        global _shared_backtester
+        self.start_date = start_date
+        self.end_date = datetime.date.today() - datetime.timedelta(days=1) if end_date is None else end_date
+        if workers > 0:
+            _shared_backtester = self
+            try:
+                with get_context('fork').Pool(min(workers, len(self.runs))) as pool:
+                    results = pool.map(run_shared, range(len(self.runs)))
+            finally:
+                _shared_backtester = None
+        else:
+            results = [self.run_index(run_num) for run_num in range(len(self.runs))]
+        balances = [r[0] for r in results if not r[0].empty]
+        index_balances = pd.concat(balances, ignore_index=True) if len(balances) > 0 else pd.DataFrame()
+        index_metadata = [metadata for r in results for metadata in r[1]]
+        return index_balances, index_metadata
@@ -63,8 +63,8 @@ class PortfolioReporter():
         return self.pg.get_full_report(get_past_date(7))
 
     def get_coin_rates(self):
-        for ex in self.exchanges:
-            self.coin_rates = self.coin_rates.append(pd.DataFrame(self.ex.get_current_tickers(ex, False)))
+        # raises PartialResultError when an exchange did not answer, a report missing one is wrong
+        self.coin_rates = self.ex.get_all_current_tickers(self.exchanges, False)
 
         btc_usd_rate = self.ex.get_btc_usd_rate()
 
@@ -73,7 +73,7 @@ class PortfolioReporter():
             {'base_coin': 'BTC', 'mkt_coin': 'BTC', 'last': 1.0},
             {'base_coin': 'BTC', 'mkt_coin': 'USD', 'last': 1 / btc_usd_rate}
         ])
-        self.coin_rates = self.coin_rates.append(extra_data)
+        self.coin_rates = pd.concat([self.coin_rates, extra_data], ignore_index=True)
 
         # normalize coins to uppercase
         self.coin_rates['base_coin'] = self.coin_rates['base_coin'].str.upper()
@@ -99,11 +99,9 @@ class PortfolioReporter():
 
     def load_aggregate_exchange_balances(self):
         log.debug('{PORTFOLIO REPORTER} == agg exchange balances ==')
-        self.aggregate_portfolio = pd.DataFrame()
-        for ex in self.exchanges:
-            self.aggregate_portfolio = self.aggregate_portfolio.append(
-                pd.DataFrame(self.ex.get_exchange_balances(exchange=ex)))
-        self.aggregate_portfolio.drop(columns='address', inplace=True)
+        # raises PartialResultError rather than total a portfolio missing an exchange
+        self.aggregate_portfolio = self.ex.get_all_exchange_balances(self.exchanges)
+        self.aggregate_portfolio.drop(columns='address', inplace=True, errors='ignore')
 
     def load_off_exchange_balances(self):
         log.debug('{PORTFOLIO REPORTER} == load off exchange balances ==')
@@ -179,6 +177,8 @@ class PortfolioReporter():
         rate_usd = defaultdict(int)
 
         self.trade_data.sort_values(by=['trade_time'], inplace=True)
+        pending = self.trade_data[~self.trade_data['analyzed'].astype(bool) & (self.trade_data['exchange_id'] != 'cryptopia')]
+        self.ex.prefetch_historical_rates(pending)
         for idx, trade_row in self.trade_data.iterrows():
             if trade_row['exchange_id'] == 'cryptopia':
                 continue
@@ -199,8 +199,7 @@ class PortfolioReporter():
             else:
                 num_new_coins = trade_row['quantity']
 
-                # calculate rates, needs to pull data from exchanges
-                # TODO: refactor to pull all data before this function?
+                # rates were prefetched above, these lookups hit the rate cache
                 base_currency_usd_rates = self.ex.get_historical_usd_vs_btc_eth_rates(trade_row['trade_time'])
                 self.ex.add_pair_rate(trade_row['trade_time'], 'USD', base_currency_usd_rates)
                 # can use upper() here for mkt_coin because gemini does not have historical endpoint (using gdax)
@@ -0,0 +1,127 @@
+from multiprocessing import Process, Pipe
+from src.data_structures.ring_buffer import RingBuffer
+from src.indicators.indicator_registry import IndicatorRegistry
+from src.utils.logger import Logger
+
+log = Logger(__name__)
+
+
+class MarketShard:
+    def __init__(self, strats, buffer_size):
+        """
+            the per market state one worker owns: its own bar buffers, indicator registry and strat copies
+        :param strats: <List> v1 strats
+        :param buffer_size: <int> RingBuffer capacity per market
+        """
+        self.strats = strats
+        self.buffer_size = buffer_size
+        self.indicators = IndicatorRegistry()
+        for strat in self.strats:
+            strat.use_indicator_registry(self.indicators)
+        self.mkt_data = {}
+
+    def init_markets(self, pairs):
+        """
+        :param pairs: {mkt_name: pair} the markets this shard evaluates
+        """
+        for strat in self.strats:
+            strat.init_market_positions(pairs)
+        for mkt_name in pairs:
+            self.mkt_data[mkt_name] = RingBuffer(self.buffer_size)
+
+    def step(self, new_bars):
+        """
+            appends the new bars and runs every strat on every market of the shard
+        :param new_bars: {mkt_name: [bar, ...]}
+        :return: {strat_name: {mkt_name: (buy, sell)}}
+        """
+        for mkt_name, bars in new_bars.items():
+            for bar in bars:
+                self.mkt_data[mkt_name].append(bar)
+        for mkt_name, mkt_data in self.mkt_data.items():
+            self.indicators.update(mkt_name, mkt_data)
+        positions = {}
+        for strat in self.strats:
+            for mkt_name, mkt_data in self.mkt_data.items():
+                strat.handle_data(mkt_data, mkt_name)
+            positions[strat.name] = dict((mkt_name, (strat.buy_positions[mkt_name], strat.sell_positions[mkt_name]))
+                                         for mkt_name in self.mkt_data)
+        return positions
+
+
+def run_shard(conn, strats, buffer_size):
+    """
+        worker process loop, serves ('init', pairs), ('step', new_bars) and ('stop', None) messages
+    """
+    shard = MarketShard(strats, buffer_size)
+    while True:
+        command, payload = conn.recv()
+        if command == 'init':
+            shard.init_markets(payload)
+            conn.send(True)
+        elif command == 'step':
+            conn.send(shard.step(payload))
+        elif command == 'stop':
+            break
+    conn.close()
+
+
+class StrategyPool:
+    def __init__(self, strats, num_workers, buffer_size):
+        """
+            runs the v1 strats across long lived worker processes, each owning a shard of the markets
+            only the new bars go to the workers and only the buy / sell positions come back
+        :param strats: <List> v1 strats, their positions are kept in sync with the workers
+        :param num_workers: <int>
+        :param buffer_size: <int> RingBuffer capacity per market
+        """
+        self.strats = strats
+        self.num_workers = num_workers
+        self.buffer_size = buffer_size
+        self.workers = []
+        self.shards = []    # [{mkt_name: pair}], one per worker
+
+    def start(self, pairs):
+        """
+            shards <pairs> round robin across the workers and starts them
+        :param pairs: {mkt_name: pair}
+        """
+        mkt_names = sorted(pairs)
+        num_workers = max(1, min(self.num_workers, len(mkt_names)))
+        self.shards = [dict((mkt_name, pairs[mkt_name]) for mkt_name in mkt_names[idx::num_workers])
+                       for idx in range(num_workers)]
+        for shard in self.shards:
+            conn, worker_conn = Pipe()
+            process = Process(target=run_shard, args=(worker_conn, self.strats, self.buffer_size))
+            process.daemon = True
+            process.start()
+            conn.send(('init', shard))
+            self.workers.append((process, conn))
+        for process, conn in self.workers:
+            conn.recv()
+        log.info('strategy pool started :: ' + str(len(self.workers)) + ' workers, ' + str(len(mkt_names)) + ' markets')
+
+    def step(self, new_bars):
+        """
+            runs every strat on every market, the shards run concurrently
+        :param new_bars: {mkt_name: [bar, ...]} bars finished since the last step
+        """
+        for shard, (process, conn) in zip(self.shards, self.workers):
+            conn.send(('step', dict((mkt_name, new_bars.get(mkt_name, [])) for mkt_name in shard)))
+        for process, conn in self.workers:
+            self.set_positions(conn.recv())
+
+    def set_positions(self, positions):
+        for strat in self.strats:
+            for mkt_name, (buy, sell) in positions[strat.name].items():
+                strat.buy_positions[mkt_name] = buy
+                strat.sell_positions[mkt_name] = sell
+
+    def stop(self):
+        for process, conn in self.workers:
+            conn.send(('stop', None))
+        for process, conn in self.workers:
+            process.join()
+            conn.close()
+        self.workers = []
+        self.shards = []
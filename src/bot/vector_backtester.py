@@ -0,0 +1,186 @@
+import itertools
+import numpy
+import pandas as pd
+from src.utils.logger import Logger
+
+log = Logger(__name__)
+
+BAR_COLUMNS = ['open', 'high', 'low', 'close', 'last', 'bid', 'ask', 'timestamp']
+
+
+def compress_summaries(summaries, major_tick_size):
+    """
+        turns the full fixture history into bars of <major_tick_size> tickers per market, the same bars
+        CryptoBot.compress_tickers hands the strats at each major tick
+    :param summaries: <DataFrame> one row per market per tick, columns = marketname, last, bid, ask, saved_timestamp
+                      (ticker_nonce orders the ticks when present)
+    :param major_tick_size: <int>
+    :return: {mkt_name: {column: <numpy.ndarray>}}
+    """
+    if 'ticker_nonce' in summaries:
+        summaries = summaries.sort_values('ticker_nonce', kind='mergesort')
+    markets = {}
+    for mkt_name, mkt_summaries in summaries.groupby('marketname', sort=False):
+        num_bars = len(mkt_summaries) // major_tick_size
+        num_ticks = num_bars * major_tick_size
+        last = mkt_summaries['last'].values[:num_ticks].astype(numpy.float64).reshape(num_bars, major_tick_size)
+        close_ticks = mkt_summaries.iloc[major_tick_size - 1:num_ticks:major_tick_size]
+        markets[mkt_name] = {
+            'open': last[:, 0],
+            'high': last.max(axis=1),
+            'low': last.min(axis=1),
+            'close': last[:, -1],
+            'last': last[:, -1],
+            'bid': close_ticks['bid'].values.astype(numpy.float64),
+            'ask': close_ticks['ask'].values.astype(numpy.float64),
+            'timestamp': close_ticks['saved_timestamp'].values
+        }
+    return markets
+
+
+class VectorBacktester:
+    def __init__(self, strats, pairs, balances, max_currency_per_buy, require_strat_consensus=False):
+        """
+            backtests the v1 strats over a whole history at once
+            signals come from each strat's calc_positions_series, then one pass over the bars that have a signal
+            applies CryptoBot.execute_trades' rules for fills and balances
+        :param strats: <List> v1 strats
+        :param pairs: {mkt_name: pair} in the order CryptoBot.execute_trades walks them
+        :param balances: {coin: <float>} starting balances
+        :param max_currency_per_buy: {base_coin: <float>} see crypto_bot.MAX_CURRENCY_PER_BUY
+        :param require_strat_consensus: <bool>
+        """
+        self.strats = strats
+        self.pairs = pairs
+        self.starting_balances = dict(balances)
+        self.balances = dict(balances)
+        self.max_currency_per_buy = max_currency_per_buy
+        self.require_strat_consensus = require_strat_consensus
+        self.markets = {}
+        self.trades = []
+
+    def load_bars(self, markets):
+        """
+        :param markets: {mkt_name: {column: <numpy.ndarray>}} see compress_summaries
+        """
+        self.markets = dict((mkt_name, markets[mkt_name]) for mkt_name in self.pairs if mkt_name in markets)
+
+    def calc_positions(self):
+        """
+        :return: {mkt_name: (buy, sell)} combined over the strats like CryptoBot.should_buy / should_sell
+        """
+        positions = {}
+        for mkt_name, bars in self.markets.items():
+            strat_positions = [strat.calc_positions_series(bars) for strat in self.strats]
+            if self.require_strat_consensus:
+                buy = numpy.logical_and.reduce([p[0] for p in strat_positions])
+                sell = numpy.logical_and.reduce([p[1] for p in strat_positions])
+            else:
+                buy = numpy.logical_or.reduce([p[0] for p in strat_positions])
+                sell = numpy.logical_or.reduce([p[1] for p in strat_positions])
+            positions[mkt_name] = (buy, sell)
+        return positions
+
+    def run(self):
+        """
+        :return: <DataFrame> the trades, in the order the tick loop would place them
+        """
+        self.balances = dict(self.starting_balances)
+        self.trades = []
+        positions = self.calc_positions()
+        if len(positions) == 0:
+            return pd.DataFrame(self.trades)
+        num_bars = min(len(bars['last']) for bars in self.markets.values())
+        signals = numpy.zeros(num_bars, dtype=bool)
+        for buy, sell in positions.values():
+            signals |= buy[:num_bars] | sell[:num_bars]
+
+        # only the bars where some market has a signal can change the balances
+        for bar_idx in numpy.flatnonzero(signals):
+            for mkt_name, (buy, sell) in positions.items():
+                # same branches as CryptoBot.execute_trades, a buy that can't be funded falls through to the sell
+                if buy[bar_idx] and self.can_spend(mkt_name):
+                    self.buy(mkt_name, bar_idx)
+                elif sell[bar_idx] and self.can_sell(mkt_name):
+                    self.sell(mkt_name, bar_idx)
+        log.info('vector backtest :: ' + str(num_bars) + ' bars, ' + str(len(self.trades)) + ' trades')
+        return pd.DataFrame(self.trades)
+
+    def can_spend(self, mkt_name):
+        return self.balances.get(self.pairs[mkt_name]['base_coin'], 0.0) > 0
+
+    def can_sell(self, mkt_name):
+        return self.balances.get(self.pairs[mkt_name]['mkt_coin'], 0.0) > 0
+
+    def buy(self, mkt_name, bar_idx):
+        pair = self.pairs[mkt_name]
+        bars = self.markets[mkt_name]
+        base_balance = self.balances.get(pair['base_coin'], 0.0)
+        quantity = self.max_currency_per_buy[pair['base_coin']]
+        # calculate_num_coins raises InsufficientFundsError in the tick loop, then can_buy
+        if base_balance < quantity:
+            return
+        num_mkt_coin = round(quantity / bars['last'][bar_idx], 8)
+        self.add_trade('buy', mkt_name, num_mkt_coin, bars['ask'][bar_idx], bar_idx)
+
+    def sell(self, mkt_name, bar_idx):
+        pair = self.pairs[mkt_name]
+        bars = self.markets[mkt_name]
+        num_mkt_coin = round(self.balances[pair['mkt_coin']], 8)
+        # trade_instant runs can_buy on sells too, so the base balance has to cover the sale value
+        if self.balances.get(pair['base_coin'], 0.0) < num_mkt_coin * bars['last'][bar_idx]:
+            return
+        self.add_trade('sell', mkt_name, num_mkt_coin, bars['bid'][bar_idx], bar_idx)
+
+    def add_trade(self, order_type, mkt_name, quantity, rate, bar_idx):
+        pair = self.pairs[mkt_name]
+        sign = 1 if order_type == 'buy' else -1
+        self.balances[pair['base_coin']] = self.balances.get(pair['base_coin'], 0.0) - sign * quantity * rate
+        self.balances[pair['mkt_coin']] = self.balances.get(pair['mkt_coin'], 0.0) + sign * quantity
+        self.trades.append({
+            'order_type': order_type,
+            'market': mkt_name,
+            'quantity': quantity,
+            'rate': rate,
+            'bar': bar_idx,
+            'timestamp': self.markets[mkt_name]['timestamp'][bar_idx]
+        })
+
+    def get_net_values(self):
+        """
+            values the balances in their base coins at the last bar
+        :return: {base_coin: <float>}
+        """
+        net_values = {}
+        for mkt_name, bars in self.markets.items():
+            pair = self.pairs[mkt_name]
+            base_coin = pair['base_coin']
+            if base_coin not in net_values:
+                net_values[base_coin] = self.balances.get(base_coin, 0.0)
+            net_values[base_coin] += self.balances.get(pair['mkt_coin'], 0.0) * bars['last'][-1]
+        return net_values
+
+    def sweep(self, strat_class, options, param_grid):
+        """
+            runs one backtest per combination of <param_grid>, reusing the loaded bars
+        :param strat_class: strat to test on its own, ex: BollingerBandsStrat
+        :param options: <dict> base options for the strat
+        :param param_grid: {option: [values]} ex: {'sma_window': [10, 20], 'num_standard_devs': [1, 2]}
+        :return: <DataFrame> one row per combination, the params + num_trades + net value per base coin
+        """
+        strats = self.strats
+        keys = list(param_grid)
+        results = []
+        for values in itertools.product(*[param_grid[key] for key in keys]):
+            params = dict(zip(keys, values))
+            strat_options = dict(options)
+            strat_options.update(params)
+            self.strats = [strat_class(strat_options)]
+            trades = self.run()
+            result = dict(params)
+            result['num_trades'] = len(trades)
+            for base_coin, net_value in self.get_net_values().items():
+                result[base_coin] = net_value
+            results.append(result)
+        self.strats = strats
+        return pd.DataFrame(results)
@@ -0,0 +1,156 @@
+import time
+from collections import defaultdict
+
+BAR_UNITS = {
+    't': None,  # ticks
+    's': 1000,  # second
+    'm': 1000 * 60,  # minute
+    'h': 1000 * 60 * 60,  # hour
+    'd': 1000 * 60 * 60 * 24  # day
+}
+
+# ms per unit of a ticker timestamp
+TIMESTAMP_UNITS = {
+    'ms': 1,
+    's': 1000
+}
+
+# unit of the timestamps in each exchange's normalized tickers, the rest stamp no time and get the arrival time
+EXCHANGE_TIMESTAMP_UNITS = {
+    'gemini': 'ms',
+    'gdax': 's',
+    'bittrex': 's'
+}
+
+NAN = float('nan')
+
+
+def parse_bar_size(bar_size):
+    """
+        parses a bar size string
+    :param bar_size: <num><unit> (5t, 1m, 1h)   * t = ticks, everything else is time based
+    :return: ('t', 5) or ('ms', 60000)
+    """
+    length = int(bar_size[:-1])
+    unit = bar_size[-1]
+    if unit not in BAR_UNITS or length <= 0:
+        raise ValueError('invalid bar size ' + bar_size)
+    if unit == 't':
+        return 't', length
+    return 'ms', length * BAR_UNITS[unit]
+
+
+class BarBuilder:
+    def __init__(self, bar_size, timestamp_unit='ms'):
+        """
+            builds OHLCV bars for a single pair, one ticker at a time
+        :param bar_size: <num><unit> (5t, 1m, 1h)
+        :param timestamp_unit: 'ms' or 's', unit of the tickers' timestamps (see EXCHANGE_TIMESTAMP_UNITS)
+        """
+        self.bar_size = bar_size
+        self.unit, self.length = parse_bar_size(bar_size)
+        if timestamp_unit not in TIMESTAMP_UNITS:
+            raise ValueError('invalid timestamp unit ' + str(timestamp_unit))
+        self.timestamp_unit = timestamp_unit
+        self.bar = None
+        self.num_ticks = 0
+        self.bucket = None
+
+    def update(self, ticker):
+        """
+            folds a ticker into the bar being built
+        :param ticker: normalized ticker (see ExchangeAdaptor.get_current_tickers)
+        :return: <dict> the finished bar if this ticker closed one, else None
+        """
+        finished = None
+        timestamp = ticker.get('timestamp')
+        if timestamp is None:
+            timestamp = time.time() * 1000 / TIMESTAMP_UNITS[self.timestamp_unit]
+        if self.unit == 'ms':
+            # time based bars close on the first ticker of the next bucket
+            bucket = int(float(timestamp) * TIMESTAMP_UNITS[self.timestamp_unit] // self.length)
+            if self.bar is not None and bucket != self.bucket:
+                finished = self.flush()
+            self.bucket = bucket
+
+        self.add_ticker(ticker, timestamp)
+
+        if self.unit == 't' and self.num_ticks >= self.length:
+            finished = self.flush()
+        return finished
+
+    def add_ticker(self, ticker, timestamp):
+        last = float(ticker['last'])
+        high = float(ticker.get('high', last))
+        low = float(ticker.get('low', last))
+        if self.bar is None:
+            self.bar = {
+                'open': float(ticker.get('open', last)),
+                'high': high,
+                'low': low,
+                'vol_base': 0.0,
+                'vol_mkt': 0.0
+            }
+        else:
+            self.bar['high'] = max(self.bar['high'], high)
+            self.bar['low'] = min(self.bar['low'], low)
+        self.bar['close'] = float(ticker.get('close', last))
+        # some exchanges' tickers only carry the last price
+        self.bar['bid'] = float(ticker.get('bid', NAN))
+        self.bar['ask'] = float(ticker.get('ask', NAN))
+        self.bar['last'] = last
+        self.bar['vol_base'] += float(ticker.get('vol_base', 0.0))
+        self.bar['vol_mkt'] += float(ticker.get('vol_mkt', 0.0))
+        self.bar['timestamp'] = timestamp
+        self.num_ticks += 1
+
+    def flush(self):
+        """
+            closes the bar being built
+        :return: <dict> the bar, None if no tickers were received
+        """
+        bar = self.bar
+        self.bar = None
+        self.num_ticks = 0
+        return bar
+
+
+class BarAggregator:
+    def __init__(self, bar_sizes, timestamp_unit='ms'):
+        """
+            builds bars of several sizes per pair from the same ticker feed
+        :param bar_sizes: <List> ['5t', '1m', '1h']
+        :param timestamp_unit: 'ms' or 's', see BarBuilder
+        """
+        self.bar_sizes = list(bar_sizes)
+        for bar_size in self.bar_sizes:
+            parse_bar_size(bar_size)
+        if timestamp_unit not in TIMESTAMP_UNITS:
+            raise ValueError('invalid timestamp unit ' + str(timestamp_unit))
+        self.timestamp_unit = timestamp_unit
+        self.builders = defaultdict(self.init_builders)
+
+    @staticmethod
+    def for_exchange(bar_sizes, exchange):
+        """
+        :return: <BarAggregator> reading <exchange>'s ticker timestamps in their own unit
+        """
+        return BarAggregator(bar_sizes, EXCHANGE_TIMESTAMP_UNITS.get(exchange, 'ms'))
+
+    def init_builders(self):
+        return dict((bar_size, BarBuilder(bar_size, self.timestamp_unit)) for bar_size in self.bar_sizes)
+
+    def update(self, pair, ticker):
+        """
+            folds a ticker into every bar size for <pair>
+        :return: {'5t': <bar>, ...} for each bar size that finished on this ticker
+        """
+        finished = {}
+        for bar_size, builder in self.builders[pair].items():
+            bar = builder.update(ticker)
+            if bar is not None:
+                finished[bar_size] = bar
+        return finished
+
+    def flush(self, pair, bar_size):
+        return self.builders[pair][bar_size].flush()
@@ -0,0 +1,104 @@
+import numpy
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.indicators.ema import ema_alpha
+
+
+def rolling_mean(values, window):
+    """
+        rolling(window).mean() along the rows of a 2-D array, NaN until a row has <window> values
+        and wherever a NaN is inside the window
+    :param values: <numpy.ndarray> (coins, rows)
+    :param window: <int>
+    :return: <numpy.ndarray> same shape as values
+    """
+    result = numpy.full(values.shape, numpy.nan)
+    if values.shape[1] >= window:
+        result[:, window - 1:] = sliding_window_view(values, window, axis=1).mean(axis=-1)
+    return result
+
+
+def ewm_mean(values, span):
+    """
+        ewm(span=span).mean() (adjust=True, ignore_na=False) along the rows of a 2-D array,
+        one vectorized step per column
+    :param values: <numpy.ndarray> (coins, rows)
+    :param span: <int>
+    :return: <numpy.ndarray> same shape as values
+    """
+    decay = 1.0 - ema_alpha(span)
+    num = numpy.zeros(values.shape[0])
+    den = numpy.zeros(values.shape[0])
+    result = numpy.empty(values.shape)
+    for col in range(values.shape[1]):
+        observed = ~numpy.isnan(values[:, col])
+        num = decay * num + numpy.where(observed, values[:, col], 0.0)
+        den = decay * den + observed
+        with numpy.errstate(invalid='ignore', divide='ignore'):
+            result[:, col] = num / den
+    return result
+
+
+class CoinPanel:
+    def __init__(self, data, id_column='id', date_column='date'):
+        """
+            the long cmc frame pivoted once to a (coin x date) grid of row positions, so per coin
+            calculations become array operations along the time axis instead of groupby('id').apply
+
+            pandas runs those per coin calculations over a coin's rows, not over calendar days, so they
+            are taken on the compact layout (coin x k-th row of the coin) and mapped back to the frame
+            (id, date) pairs are expected to be unique, and data is not to be reordered in place while
+            the panel is in use - results are aligned to its index by row position
+        :param data: <DataFrame> cmc rows, any order
+        """
+        self.data = data
+        self.ids, coins = numpy.unique(data[id_column].values, return_inverse=True)
+        days = pd.to_datetime(data[date_column]).values.astype('datetime64[D]').astype(numpy.int64)
+        self.days, cols = numpy.unique(days, return_inverse=True)
+        self.rows = numpy.full((len(self.ids), len(self.days)), -1, dtype=numpy.int64)
+        self.rows[coins, cols] = numpy.arange(len(data))
+        self.present = self.rows >= 0
+        # rank of every cell among its coin's rows in date order
+        self.ranks = numpy.cumsum(self.present, axis=1) - 1
+        self.cell_coins, self.cell_days = numpy.nonzero(self.present)
+        self.cell_ranks = self.ranks[self.cell_coins, self.cell_days]
+        self.cell_rows = self.rows[self.cell_coins, self.cell_days]
+        self.num_ranks = int(self.ranks[:, -1].max()) + 1 if len(data) > 0 else 0
+
+    def values(self, column):
+        """
+        :return: <numpy.ndarray> (coin x date) grid of <column>, NaN where a coin has no row
+        """
+        grid = numpy.full(self.rows.shape, numpy.nan)
+        grid[self.cell_coins, self.cell_days] = self.data[column].values[self.cell_rows]
+        return grid
+
+    def compact(self, column):
+        """
+        :return: <numpy.ndarray> (coin x k-th row) of <column>, NaN padded after each coin's last row
+        """
+        compact = numpy.full((len(self.ids), self.num_ranks), numpy.nan)
+        compact[self.cell_coins, self.cell_ranks] = self.data[column].values[self.cell_rows]
+        return compact
+
+    def to_series(self, compact):
+        """
+        :param compact: <numpy.ndarray> (coin x k-th row) result
+        :return: <Series> aligned with the index of self.data
+        """
+        values = numpy.empty(len(self.data))
+        values[self.cell_rows] = compact[self.cell_coins, self.cell_ranks]
+        return pd.Series(values, index=self.data.index)
+
+    def rolling_mean(self, column, window):
+        """
+            same values as data.sort_values('date').groupby('id')[column].rolling(window).mean()
+        """
+        return self.to_series(rolling_mean(self.compact(column), window))
+
+    def ewm_mean(self, column, span):
+        """
+            same values as data.sort_values('date').groupby('id')[column].ewm(span=span).mean()
+        """
+        return self.to_series(ewm_mean(self.compact(column), span))
@@ -0,0 +1,56 @@
+import numpy
+import pandas as pd
+
+
+def day_number(date):
+    """
+    :param date: '2018-01-31', <datetime.date>, <Timestamp> ...
+    :return: <int> days since 1970-01-01
+    """
+    return int(numpy.datetime64(pd.Timestamp(date).date(), 'D').astype(numpy.int64))
+
+
+class DateIndex:
+    def __init__(self, data, date_column='date'):
+        """
+            rows sorted by day once, so any [start_date, end_date] window is a slice found with searchsorted
+            instead of a scan over every row. rows keep their original order within a day
+        :param data: <DataFrame>
+        :param date_column: <str>
+        """
+        days = pd.to_datetime(data[date_column]).values.astype('datetime64[D]').astype(numpy.int64)
+        order = numpy.argsort(days, kind='mergesort')
+        self.data = data.iloc[order].reset_index(drop=True)
+        self.days = days[order]
+
+    def __len__(self):
+        return len(self.data)
+
+    def bounds(self, start_date=None, end_date=None):
+        """
+        :return: (first row, last row + 1) of the days in [start_date, end_date], both inclusive
+        """
+        start = 0 if start_date is None else numpy.searchsorted(self.days, day_number(start_date), side='left')
+        end = len(self.days) if end_date is None else numpy.searchsorted(self.days, day_number(end_date), side='right')
+        return start, max(start, end)
+
+    def slice(self, start_date=None, end_date=None):
+        """
+        :return: <DataFrame> a slice of the sorted rows, not a copy
+        """
+        start, end = self.bounds(start_date, end_date)
+        return self.data.iloc[start:end]
+
+    def on_date(self, date):
+        return self.slice(date, date)
+
+    def day_slices(self, start_date=None, end_date=None):
+        """
+            walks [start_date, end_date] one day at a time, days without rows are skipped
+        :return: generator of (day number, <DataFrame> rows of that day)
+        """
+        start, end = self.bounds(start_date, end_date)
+        days, firsts = numpy.unique(self.days[start:end], return_index=True)
+        lasts = numpy.append(firsts[1:], end - start)
+        for day, first, last in zip(days, firsts, lasts):
+            yield int(day), self.data.iloc[start + first:start + last]
@@ -0,0 +1,106 @@
+import numpy
+import pandas as pd
+
+TICKER_COLUMNS = ['open', 'high', 'low', 'close', 'bid', 'ask', 'last', 'vol_base', 'vol_mkt', 'timestamp']
+
+
+class RingBuffer:
+    def __init__(self, capacity, columns=None):
+        """
+            fixed size, columnar float64 store for one market's tickers
+
+            every row is written twice (at pos and pos + capacity) so the most recent n rows are always one
+            contiguous slice of the backing array, which lets window() hand out views instead of copies
+        :param capacity: <int> max number of rows held, oldest rows are overwritten
+        :param columns: <List> column names, defaults to TICKER_COLUMNS
+        """
+        if columns is None:
+            columns = TICKER_COLUMNS
+        self.capacity = capacity
+        self.columns = list(columns)
+        self.column_idx = dict((col, idx) for idx, col in enumerate(self.columns))
+        self.data = numpy.full((len(self.columns), 2 * capacity), numpy.nan)
+        self.head = 0   # next write position, in [0, capacity)
+        self.size = 0   # number of valid rows, <= capacity
+        self.count = 0  # total number of rows appended since the last clear
+        self.clears = 0  # number of times the buffer was cleared, tells readers of count it started over
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, column):
+        return column in self.column_idx
+
+    def __getitem__(self, column):
+        return self.window(column)
+
+    def add_columns(self, columns):
+        """
+            adds (NaN filled) columns that aren't held yet, used by strategies to store their indicators
+        :param columns: <List> column names
+        """
+        new_columns = [col for col in columns if col not in self.column_idx]
+        if len(new_columns) == 0:
+            return
+        for col in new_columns:
+            self.column_idx[col] = len(self.columns)
+            self.columns.append(col)
+        self.data = numpy.vstack([self.data, numpy.full((len(new_columns), 2 * self.capacity), numpy.nan)])
+
+    def append(self, row):
+        """
+            writes a row in O(1), missing columns are stored as NaN
+        :param row: <dict> or <Series> keyed by column name
+        """
+        values = numpy.array([row.get(col, None) for col in self.columns], dtype=numpy.float64)
+        self.data[:, self.head] = values
+        self.data[:, self.head + self.capacity] = values
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        self.count += 1
+
+    def set_latest(self, column, value):
+        """
+            overwrites <column> on the most recent row
+        """
+        pos = (self.head - 1) % self.capacity
+        idx = self.column_idx[column]
+        self.data[idx, pos] = value
+        self.data[idx, pos + self.capacity] = value
+
+    def latest(self, column):
+        return self.data[self.column_idx[column], self.head - 1 + self.capacity]
+
+    def window(self, column, n=None):
+        """
+            zero-copy view of the most recent <n> values of <column>, oldest first
+        :param column: <str>
+        :param n: <int> defaults to every held row
+        :return: <numpy.ndarray>
+        """
+        if n is None or n > self.size:
+            n = self.size
+        end = self.head + self.capacity
+        return self.data[self.column_idx[column], end - n:end]
+
+    def rows(self, n=None):
+        """
+            zero-copy 2-D view (columns x rows) of the most recent <n> rows
+        """
+        if n is None or n > self.size:
+            n = self.size
+        end = self.head + self.capacity
+        return self.data[:, end - n:end]
+
+    def to_frame(self, n=None):
+        """
+            copies the most recent <n> rows into a DataFrame, for reporting / plotting only
+        """
+        return pd.DataFrame(self.rows(n).T.copy(), columns=self.columns)
+
+    def clear(self):
+        self.data.fill(numpy.nan)
+        self.head = 0
+        self.size = 0
+        self.count = 0
+        self.clears += 1
@@ -0,0 +1,84 @@
+import io
+import os
+import itertools
+import pandas as pd
+from src.db.connection_pool import pooled_connection
+from src.utils.logger import Logger
+
+log = Logger(__name__)
+
+# rows per COPY, each chunk is its own transaction
+COPY_CHUNK_ROWS = int(os.getenv('COPY_CHUNK_ROWS', 50000))
+COPY_NULL = '\\N'
+
+
+def iter_chunks(rows, columns, chunk_rows=COPY_CHUNK_ROWS):
+    """
+        splits a DataFrame or an iterable of dicts into DataFrames of at most <chunk_rows> rows
+        iterables are consumed lazily, so generators never have to fit in memory at once
+    :param rows: <DataFrame> or iterable of <dict>
+    :param columns: <List> columns to keep, in table order
+    :return: generator of <DataFrame>
+    """
+    if isinstance(rows, pd.DataFrame):
+        for start in range(0, len(rows), chunk_rows):
+            yield rows.iloc[start:start + chunk_rows][columns]
+        return
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_rows))
+        if len(chunk) == 0:
+            return
+        yield pd.DataFrame(chunk, columns=columns)
+
+
+def to_copy_buffer(chunk):
+    buf = io.StringIO()
+    chunk.to_csv(buf, header=False, index=False, na_rep=COPY_NULL)
+    buf.seek(0)
+    return buf
+
+
+def copy_chunk(cur, table_name, columns, chunk):
+    query = "COPY " + table_name + " (" + ','.join(columns) + ") FROM STDIN WITH (FORMAT csv, NULL '" + COPY_NULL + "')"
+    cur.copy_expert(query, to_copy_buffer(chunk))
+
+
+def upsert_query(table_name, staging_table, columns, upsert_keys):
+    update_columns = [col for col in columns if col not in upsert_keys]
+    if len(update_columns) > 0:
+        on_conflict = "DO UPDATE SET " + ','.join(col + " = EXCLUDED." + col for col in update_columns)
+    else:
+        on_conflict = "DO NOTHING"
+    return """ INSERT INTO """ + table_name + """ (""" + ','.join(columns) + """)
+        SELECT """ + ','.join(columns) + """ FROM """ + staging_table + """
+        ON CONFLICT (""" + ','.join(upsert_keys) + """) """ + on_conflict + """ ; """
+
+
+def bulk_insert(table_name, rows, columns, upsert_keys=None, chunk_rows=COPY_CHUNK_ROWS):
+    """
+        streams rows into <table_name> with COPY FROM STDIN, <chunk_rows> rows per COPY
+        with <upsert_keys> each chunk is copied into a temp staging table first and merged with
+        INSERT ... ON CONFLICT (<upsert_keys>) DO UPDATE, which needs a unique index on those keys
+    :param table_name: <str>
+    :param rows: <DataFrame> or iterable of <dict>
+    :param columns: <List> columns to write
+    :param upsert_keys: <List> conflict target, plain COPY when None
+    :param chunk_rows: <int>
+    :return: <int> number of rows sent
+    """
+    num_rows = 0
+    staging_table = table_name.replace('.', '_') + '_staging'
+    for chunk in iter_chunks(rows, columns, chunk_rows):
+        with pooled_connection() as conn:
+            with conn.cursor() as cur:
+                if upsert_keys is None:
+                    copy_chunk(cur, table_name, columns, chunk)
+                else:
+                    cur.execute(""" CREATE TEMP TABLE """ + staging_table + """ (LIKE """ + table_name +
+                                """ INCLUDING DEFAULTS) ON COMMIT DROP ; """)
+                    copy_chunk(cur, staging_table, columns, chunk)
+                    cur.execute(upsert_query(table_name, staging_table, columns, upsert_keys))
+        num_rows += len(chunk)
+    log.debug('{PSQL} == COPY ' + str(num_rows) + ' rows into ' + table_name + ' ==')
+    return num_rows
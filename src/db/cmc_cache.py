@@ -0,0 +1,143 @@
+import os
+import glob
+import json
+import tempfile
+import pandas as pd
+from src.utils.logger import Logger
+
+try:
+    from pyarrow import feather
+except ImportError:
+    feather = None
+
+log = Logger(__name__)
+
+CMC_CACHE = os.getenv('CMC_CACHE', 'TRUE') == 'TRUE'
+CMC_CACHE_DIR = os.getenv('CMC_CACHE_DIR', os.path.expanduser('~/.cryptobot/cmc_cache'))
+PARTITION_PREFIX = 'cmc_historical_data-'
+METADATA_FILE = 'metadata.json'
+
+
+def month_key(dates):
+    return pd.to_datetime(pd.Series(dates)).dt.strftime('%Y-%m').values
+
+
+def filter_history(data, date=None, coin=None, start_date=None):
+    # same rows PostgresConnection.cmc_historical_query selects
+    dates = pd.to_datetime(data['date'])
+    mask = pd.Series(True, index=data.index)
+    if start_date is not None:
+        mask &= dates >= pd.Timestamp(start_date)
+        if date is not None:
+            mask &= dates <= pd.Timestamp(date)
+    elif date is not None:
+        mask &= dates == pd.Timestamp(date)
+    if coin is not None:
+        mask &= data['coin'] == coin
+    return data[mask]
+
+
+class CmcHistoryCache:
+    def __init__(self, psql, cache_dir=CMC_CACHE_DIR):
+        """
+            local feather copy of cmc_historical_data, one file per month, a read loads only the months
+            covering the requested dates
+            the first read in a process pulls whatever postgres has from the cached max date on
+        :param psql: <PostgresConnection> the cache is refreshed from
+        :param cache_dir: <str>
+        """
+        self.psql = psql
+        self.cache_dir = cache_dir
+        self.refreshed = False
+
+    @staticmethod
+    def is_available():
+        return feather is not None
+
+    def partition_path(self, month):
+        return os.path.join(self.cache_dir, PARTITION_PREFIX + month + '.feather')
+
+    def cached_months(self):
+        paths = glob.glob(os.path.join(self.cache_dir, PARTITION_PREFIX + '*.feather'))
+        return sorted(os.path.basename(path)[len(PARTITION_PREFIX):-len('.feather')] for path in paths)
+
+    def get_max_date(self):
+        path = os.path.join(self.cache_dir, METADATA_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)['max_date']
+
+    def set_max_date(self, max_date):
+        def write_metadata(path):
+            with open(path, 'w') as f:
+                json.dump({'max_date': max_date}, f)
+        self.write_atomic(os.path.join(self.cache_dir, METADATA_FILE), write_metadata)
+
+    @staticmethod
+    def write_atomic(path, write):
+        """
+            writes to a temp file of its own in the same directory, then moves it over <path>, so
+            concurrent refreshes never write to the same file and readers never see a partial one
+        :param write: fn(tmp_path)
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + '.', suffix='.tmp')
+        os.close(fd)
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+    def read_partition(self, month):
+        path = self.partition_path(month)
+        if not os.path.exists(path):
+            return None
+        return feather.read_feather(path)
+
+    def refresh(self):
+        """
+            pulls the rows from the cached max date on (that day is re-read in case it was partial)
+            and rewrites only the months they fall in
+        """
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir)
+        max_date = self.get_max_date()
+        chunks = list(self.psql.stream_cmc_historical_data(start_date=max_date))
+        self.refreshed = True
+        if len(chunks) == 0:
+            return
+        new_data = pd.concat(chunks, ignore_index=True)
+        new_months = month_key(new_data['date'])
+        for month in sorted(set(new_months)):
+            month_data = new_data[new_months == month]
+            cached = self.read_partition(month)
+            if cached is not None and max_date is not None:
+                cached = cached[pd.to_datetime(cached['date']) < pd.Timestamp(max_date)]
+                month_data = pd.concat([cached, month_data], ignore_index=True)
+            self.write_atomic(self.partition_path(month),
+                              lambda path: feather.write_feather(month_data.reset_index(drop=True), path))
+        self.set_max_date(pd.to_datetime(new_data['date']).max().strftime('%Y-%m-%d'))
+        log.info('cmc cache refreshed :: ' + str(len(new_data)) + ' rows from ' + str(max_date))
+
+    def get(self, date=None, coin=None, start_date=None):
+        """
+            same arguments and rows as PostgresConnection.get_cmc_historical_data, only the months
+            covering the requested dates are read
+        :return: <DataFrame>
+        """
+        if not self.refreshed:
+            self.refresh()
+        months = self.cached_months()
+        if start_date is not None:
+            months = [m for m in months if m >= month_key([start_date])[0]]
+            if date is not None:
+                months = [m for m in months if m <= month_key([date])[0]]
+        elif date is not None:
+            months = [m for m in months if m == month_key([date])[0]]
+        partitions = [self.read_partition(month) for month in months]
+        if len(partitions) == 0:
+            return pd.DataFrame()
+        data = pd.concat(partitions, ignore_index=True)
+        return filter_history(data, date, coin, start_date).reset_index(drop=True)
@@ -0,0 +1,93 @@
+import os
+import threading
+from contextlib import contextmanager
+from psycopg2.pool import ThreadedConnectionPool
+from src.utils.logger import Logger
+
+log = Logger(__name__)
+
+PSQL_DSN = os.getenv('PSQL_DSN', 'dbname=cryptobot user=patrickmckelvy')
+PSQL_POOL_MIN = int(os.getenv('PSQL_POOL_MIN', 1))
+PSQL_POOL_MAX = int(os.getenv('PSQL_POOL_MAX', 10))
+
+_pool = None
+_pool_pid = None
+_pool_slots = None
+_pool_lock = threading.Lock()
+_prepared = {}  # backend pid -> names of the statements prepared on it, for every PostgresConnection
+
+
+def prepared_statements(backend_pid):
+    """
+        the statements prepared on a pooled backend, kept per process like the pool itself since every
+        PostgresConnection borrows the same backends. only the thread holding the connection touches the set
+    :param backend_pid: <int> conn.get_backend_pid()
+    :return: <set>
+    """
+    with _pool_lock:
+        return _prepared.setdefault(backend_pid, set())
+
+
+def forget_prepared(backend_pid):
+    with _pool_lock:
+        _prepared.pop(backend_pid, None)
+
+
+def get_pool():
+    """
+        the process wide pool every PostgresConnection borrows from, created on first use
+        a forked child gets a fresh pool instead of sharing its parent's sockets
+    :return: <ThreadedConnectionPool>
+    """
+    global _pool, _pool_pid, _pool_slots
+    if _pool is None or _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool_pid != os.getpid():
+                log.info('opening postgres pool :: min ' + str(PSQL_POOL_MIN) + ', max ' + str(PSQL_POOL_MAX))
+                _pool = ThreadedConnectionPool(PSQL_POOL_MIN, PSQL_POOL_MAX, PSQL_DSN)
+                # ThreadedConnectionPool raises once maxconn are out, make extra borrowers wait instead
+                _pool_slots = threading.BoundedSemaphore(PSQL_POOL_MAX)
+                _pool_pid = os.getpid()
+                # a forked child inherits the record of its parent's backends, none of them are its own
+                _prepared.clear()
+    return _pool
+
+
+def close_pool():
+    global _pool, _pool_pid, _pool_slots
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.closeall()
+        _pool = None
+        _pool_pid = None
+        _pool_slots = None
+        _prepared.clear()
+
+
+@contextmanager
+def pooled_connection():
+    """
+        borrows a connection for one unit of work, commits on success and rolls back on error
+        broken connections are dropped from the pool instead of being handed out again
+    """
+    pool = get_pool()
+    slots = _pool_slots
+    slots.acquire()
+    try:
+        conn = pool.getconn()
+        # kept to forget what was prepared on the backend if it goes away, a closed connection no longer reports it
+        backend_pid = None if conn.closed else conn.get_backend_pid()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            broken = bool(conn.closed)
+            pool.putconn(conn, close=broken)
+            if broken:
+                forget_prepared(backend_pid)
+    finally:
+        slots.release()
@@ -0,0 +1,125 @@
+import threading
+import time
+import pandas as pd
+from psycopg2 import errorcodes
+from src.db.connection_pool import pooled_connection, prepared_statements
+from src.utils.logger import Logger
+
+log = Logger(__name__)
+
+# name -> (table type, param types, query), {table} is filled with PostgresConnection.table_name(table type)
+# param types left empty are inferred by postgres from the columns they are compared to
+PREPARED_QUERIES = {
+    'market_summaries_by_ticker': ('fixture_market_summaries', ['integer', 'text[]'], """
+        SELECT marketname, last, bid, ask, saved_timestamp, volume FROM {table}
+        WHERE ticker_nonce = $1 AND marketname = ANY($2)
+    """),
+    'cmc_tickers_by_nonce': ('save_cmc_tickers', ['integer'], """
+        SELECT * FROM {table} WHERE nonce = $1
+    """),
+    'stock_historical_data_by_date': ('stock_historical_data', [], """
+        SELECT * FROM {table} WHERE date = $1
+    """),
+    'stock_historical_data_by_date_and_coin': ('stock_historical_data', [], """
+        SELECT * FROM {table} WHERE date = $1 AND coin = $2
+    """),
+    'index_balances_by_date': ('index_balances', [], """
+        SELECT * FROM {table} WHERE index_date = $1
+    """)
+}
+
+
+class QueryStats:
+    def __init__(self):
+        self.calls = 0
+        self.rows = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def add(self, seconds, rows):
+        self.calls += 1
+        self.rows += rows
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def to_dict(self):
+        return {
+            'calls': self.calls,
+            'rows': self.rows,
+            'total_ms': 1000 * self.total_seconds,
+            'avg_ms': 1000 * self.total_seconds / self.calls if self.calls > 0 else 0.0,
+            'max_ms': 1000 * self.max_seconds
+        }
+
+
+class PreparedQueries:
+    def __init__(self, table_name):
+        """
+            prepares the hot read queries once per pooled connection and runs them with EXECUTE, so postgres
+            parses and plans them once instead of on every call
+            what each backend has prepared is recorded in connection_pool, shared with every other instance
+        :param table_name: PostgresConnection.table_name, resolves the table of each query for the run type
+        """
+        self.table_name = table_name
+        self.stats = {}         # query name -> QueryStats
+        self.lock = threading.Lock()
+
+    def statement_name(self, name):
+        return name + '__' + self.table_name(PREPARED_QUERIES[name][0])
+
+    def prepare_query(self, name):
+        table_type, param_types, query = PREPARED_QUERIES[name]
+        types = ' (' + ','.join(param_types) + ')' if len(param_types) > 0 else ''
+        return 'PREPARE ' + self.statement_name(name) + types + ' AS ' + \
+               query.format(table=self.table_name(table_type))
+
+    def ensure_prepared(self, conn, cur, name):
+        statement = self.statement_name(name)
+        prepared = prepared_statements(conn.get_backend_pid())
+        if statement in prepared:
+            return
+        cur.execute(self.prepare_query(name))
+        prepared.add(statement)
+
+    def execute(self, conn, cur, name, params):
+        self.ensure_prepared(conn, cur, name)
+        statement = self.statement_name(name)
+        placeholders = ' (' + ','.join(['%s'] * len(params)) + ')' if len(params) > 0 else ''
+        try:
+            cur.execute('EXECUTE ' + statement + placeholders, params)
+        except Exception as e:
+            if getattr(e, 'pgcode', None) != errorcodes.INVALID_SQL_STATEMENT_NAME:
+                raise
+            # a new backend reused a pid we had prepared on, the read only transaction can just be dropped
+            conn.rollback()
+            prepared_statements(conn.get_backend_pid()).discard(statement)
+            self.ensure_prepared(conn, cur, name)
+            cur.execute('EXECUTE ' + statement + placeholders, params)
+
+    def fetch(self, name, params):
+        """
+        :param name: one of PREPARED_QUERIES
+        :param params: <List> bound to $1, $2, ... in order, lists bind as arrays
+        :return: <DataFrame>, None on error like PostgresConnection._fetch_query
+        """
+        start = time.time()
+        result = None
+        try:
+            with pooled_connection() as conn:
+                with conn.cursor() as cur:
+                    self.execute(conn, cur, name, list(params))
+                    column_names = [desc[0] for desc in cur.description]
+                    result = pd.DataFrame(cur.fetchall(), columns=column_names)
+        except Exception as e:
+            log.error('*** POSTGRES ERROR *** ' + name)
+            log.error(e)
+        with self.lock:
+            self.stats.setdefault(name, QueryStats()).add(time.time() - start, 0 if result is None else len(result))
+        return result
+
+    def get_stats(self):
+        """
+        :return: <DataFrame> calls, rows, total_ms, avg_ms, max_ms per query
+        """
+        with self.lock:
+            return pd.DataFrame(dict((name, stats.to_dict()) for name, stats in self.stats.items())).T
@@ -2,29 +2,47 @@ import datetime
 from time import mktime
 
 import pandas as pd
-import psycopg2
 from psycopg2.extensions import AsIs
 import os
+import uuid
 import numpy
 
 from src.utils.logger import Logger
 from src.db.table_names import TABLE_NAMES
+from src.db.connection_pool import pooled_connection
 from src.db.queries.save_portfolio_assets import save_portfolio_assets
 from src.db.queries.save_portfolio_report import save_portfolio_report
 from src.db.queries.save_order_data import save_order_data
-from src.db.queries.save_trade_data import save_trade_data
-from src.db.queries.save_tickers import save_tickers
-from src.db.queries.save_index_balances import save_index_balances, save_index_metadata
+from src.db.queries.save_trade_data import SAVE_TRADE_DATA_COLUMNS
+from src.db.queries.save_tickers import SAVE_TICKERS_COLUMNS
+from src.db.queries.save_index_balances import SAVE_INDEX_BALANCES_COLUMNS, SAVE_INDEX_METADATA_COLUMNS
+from src.db.bulk_writer import bulk_insert
+from src.db.cmc_cache import CmcHistoryCache, CMC_CACHE
+from src.db.prepared_queries import PreparedQueries
 from src.exceptions import DatabaseError
 
 log = Logger(__name__)
 
+CMC_TICKER_COLUMNS = ['id', 'name', 'symbol', 'rank', 'price_btc', 'price_usd', 'daily_volume_usd', 'market_cap_usd',
+                      'available_supply', 'total_supply', 'percent_change_1h', 'percent_change_24h',
+                      'percent_change_7d', 'last_updated', 'nonce']
+CMC_HISTORICAL_COLUMNS = ['coin', 'website_slug', 'id', 'date', 'open', 'high', 'low', 'close', 'market_cap', 'volume',
+                          'average']
+# rows per round trip for server side cursors
+PSQL_FETCH_ITERSIZE = int(os.getenv('PSQL_FETCH_ITERSIZE', 20000))
+NUMERIC_OID = 1700  # psycopg2 hands NUMERIC back as Decimal objects
+TRADE_COLUMNS = ['order_type', 'market', 'quantity', 'rate', 'uuid', 'base_currency', 'market_currency', 'timestamp']
+STOCK_HISTORICAL_COLUMNS = ['coin', 'date', 'id', 'open', 'high', 'low', 'close', 'volume']
+
 
 class PostgresConnection:
     def __init__(self):
-        self.conn = None
-        self.cur = None
+        # connections come from the shared pool in src.db.connection_pool, one per query
         self.run_type = os.getenv('RUN_TYPE', 'BACKTEST')
+        self.prepared = PreparedQueries(self.table_name)
+        self.cmc_cache = None
+        if CMC_CACHE and CmcHistoryCache.is_available():
+            self.cmc_cache = CmcHistoryCache(self)
 
     def table_name(self, table_type):
         return TABLE_NAMES[table_type][self.run_type]
@@ -33,45 +51,66 @@ class PostgresConnection:
         ###
         # EXECUTES A QUERY ON THE DATABASE, RETURNS NO DATA
         ###
-        self.conn = psycopg2.connect("dbname=cryptobot user=patrickmckelvy")
-        self.cur = self.conn.cursor()
         try:
-            self.cur.execute(query, params)
+            with pooled_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(query, params)
         except Exception as e:
             log.error('*** POSTGRES ERROR ***')
             log.error(e)
             # raise DatabaseError(e.pgerror)
 
-        self.conn.commit()
-        self.cur.close()
-        self.conn.close()
-
     def _fetch_query(self, query, params):
         ###
         # EXECUTES A FETCHING QUERY ON THE DATABASE, RETURNS A DATAFRAME
         ###
-        self.conn = psycopg2.connect("dbname=cryptobot user=patrickmckelvy")
-        self.cur = self.conn.cursor()
         result = None
         try:
-            self.cur.execute(query, params)
-            column_names = [desc[0] for desc in self.cur.description]
-            result = pd.DataFrame(self.cur.fetchall(), columns=column_names)
+            with pooled_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(query, params)
+                    column_names = [desc[0] for desc in cur.description]
+                    result = pd.DataFrame(cur.fetchall(), columns=column_names)
         except Exception as e:
             log.error('*** POSTGRES ERROR ***')
             log.error(e)
-
-        self.conn.commit()
-        self.cur.close()
-        self.conn.close()
         return result
 
-    def save_trade(self, order_type, market, quantity, rate, uuid, timestamp):
-        log.debug('{PSQL} == SAVE trade ==')
-        fmt_str = "('{order_type}','{market}',{quantity},{rate},'{uuid}','{base_currency}','{market_currency}','{timestamp}')"
-        columns = "order_type, market, quantity, rate, uuid, base_currency, market_currency, timestamp"
+    def _stream_query(self, query, params, itersize=PSQL_FETCH_ITERSIZE, dtypes=None):
+        """
+            runs a fetching query on a named (server side) cursor and yields the result <itersize> rows at a time,
+            so only one chunk of python tuples is alive at once
+            NUMERIC columns come back as float64 instead of Decimal objects
+            errors are raised, a half read result shouldn't pass for a complete one
+        :param query: <str>
+        :param params: <dict>
+        :param itersize: <int> rows per chunk
+        :param dtypes: {column: dtype} extra casts for each chunk
+        :return: generator of <DataFrame>
+        """
+        with pooled_connection() as conn:
+            with conn.cursor(name='stream_' + uuid.uuid4().hex) as cur:
+                cur.itersize = itersize
+                cur.execute(query, params)
+                column_names = None
+                casts = None
+                while True:
+                    rows = cur.fetchmany(itersize)
+                    if column_names is None:
+                        # named cursors only know their columns after the first fetch
+                        column_names = [desc[0] for desc in cur.description]
+                        casts = dict((desc[0], numpy.float64) for desc in cur.description
+                                     if desc[1] == NUMERIC_OID)
+                        casts.update(dtypes or {})
+                    if len(rows) == 0:
+                        return
+                    chunk = pd.DataFrame(rows, columns=column_names)
+                    yield chunk.astype(casts) if casts else chunk
+
+    @staticmethod
+    def build_trade(order_type, market, quantity, rate, uuid, timestamp):
         market_currencies = market.split('-')
-        values = {
+        return {
             "order_type": order_type,
             "market": market,
             "quantity": quantity,
@@ -81,12 +120,15 @@ class PostgresConnection:
             "market_currency": market_currencies[1],
             "timestamp": timestamp
         }
-        params = {
-            "columns": AsIs(columns),
-            "values": AsIs(fmt_str.format(**values))
-        }
-        query = """ INSERT INTO """ + self.table_name('save_trade') + """ (%(columns)s) VALUES %(values)s; """
-        self._exec_query(query, params)
+
+    def save_trades(self, trades):
+        log.debug('{PSQL} == SAVE trades ==')
+        bulk_insert(self.table_name('save_trade'), trades, TRADE_COLUMNS)
+
+    def save_trade(self, order_type, market, quantity, rate, uuid, timestamp):
+        log.debug('{PSQL} == SAVE trade ==')
+        values = self.build_trade(order_type, market, quantity, rate, uuid, timestamp)
+        self.save_trades([values])
         return values
 
     def save_summaries(self, summaries):
@@ -163,13 +205,17 @@ class PostgresConnection:
 
     def get_market_summaries_by_ticker(self, tick, market_names):
         log.debug('{PSQL} == GET market summaries by ticker ==')
+        return self.prepared.fetch('market_summaries_by_ticker', [tick, list(market_names)])
+
+    def get_all_market_summaries(self, market_names):
+        log.debug('{PSQL} == GET all market summaries ==')
         params = {
-            'ticker_nonce': tick,
             'market_names': market_names
         }
         query = """
-            SELECT marketname, last, bid, ask, saved_timestamp, volume FROM fixture_market_summaries
-            WHERE ticker_nonce = %(ticker_nonce)s AND marketname IN %(market_names)s
+            SELECT ticker_nonce, marketname, last, bid, ask, saved_timestamp, volume FROM fixture_market_summaries
+            WHERE marketname IN %(market_names)s
+            ORDER BY ticker_nonce ASC, marketname ASC
             ;
         """
         return self._fetch_query(query, params)
@@ -244,170 +290,94 @@ class PostgresConnection:
 
     # REFACTORING TABLES #
 
-    def save_cmc_tickers(self, tickers, extra_columns):
+    def save_cmc_tickers(self, tickers, extra_columns, upsert_keys=None):
         log.debug('{PSQL} == SAVE tickers ==')
-        add_fmt_str = ''
-        add_columns = ''
-        for col in extra_columns:
-            add_fmt_str += ',{' + col + '}'
-            add_columns += ',' + col
-        fmt_str = """
-                (
-                    '{id}',
-                    '{name}',
-                    '{symbol}',
-                    '{rank}',
-                    {price_btc},
-                    {price_usd},
-                    {daily_volume_usd},
-                    {market_cap_usd},
-                    {available_supply},
-                    {total_supply},
-                    {percent_change_1h},
-                    {percent_change_24h},
-                    {percent_change_7d},
-                    {last_updated},
-                    {nonce}""" + add_fmt_str + """
-                )
-                """
-        columns = """
-                    id,
-                    name,
-                    symbol,
-                    rank,
-                    price_btc,
-                    price_usd,
-                    daily_volume_usd,
-                    market_cap_usd,
-                    available_supply,
-                    total_supply,
-                    percent_change_1h,
-                    percent_change_24h,
-                    percent_change_7d,
-                    last_updated,
-                    nonce""" + add_columns + """
-                """
-        tickers = tickers.where(pd.notna(tickers), tickers.mean(), axis='columns')
-        values = AsIs(','.join(fmt_str.format(**ticker) for idx, ticker in tickers.iterrows()))
-        params = {
-            "columns": AsIs(columns),
-            "values": values
-        }
-        query = """ INSERT INTO """ + self.table_name('save_cmc_tickers') + """ (%(columns)s) VALUES %(values)s ; """
-        self._exec_query(query, params)
+        tickers = tickers.where(pd.notna(tickers), tickers.mean(numeric_only=True), axis='columns')
+        bulk_insert(self.table_name('save_cmc_tickers'), tickers, CMC_TICKER_COLUMNS + list(extra_columns), upsert_keys)
 
     def pull_cmc_tickers(self, nonce):
         log.debug('{PSQL} == GET BACKTEST cmc tickers ==')
-        params = {
-            'nonce': nonce
-        }
-        query = """
-            SELECT * FROM """ + self.table_name('save_cmc_tickers') + """
-            WHERE nonce = %(nonce)s;
-        """
-        return self._fetch_query(query, params)
+        return self.prepared.fetch('cmc_tickers_by_nonce', [nonce])
 
-    def save_cmc_historical_data(self, tickers):
+    def save_cmc_historical_data(self, tickers, upsert_keys=None):
+        """
+        :param tickers: <DataFrame> or iterable of <dict>, streamed in chunks with COPY
+        :param upsert_keys: ex: ['id', 'date'] to overwrite days that were already collected
+        """
         log.debug('{PSQL} == SAVE historical cmc data ==')
-        fmt_str = """
-                (
-                    '{coin}',
-                    '{website_slug}',
-                    '{id}',
-                    '{date}',
-                    {open},
-                    {high},
-                    {low},
-                    {close},
-                    {market_cap},
-                    {volume},
-                    {average}
-                )
-                """
-        columns = """
-                    coin,
-                    website_slug,
-                    id,
-                    date,
-                    open,
-                    high,
-                    low,
-                    close,
-                    market_cap,
-                    volume,
-                    average
-                """
-        # tickers = tickers.where(pd.notna(tickers), tickers.mean(), axis='columns')
-        values = AsIs(','.join(fmt_str.format(**ticker) for idx, ticker in tickers.iterrows()))
-        params = {
-            "columns": AsIs(columns),
-            "values": values
-        }
-        query = """ INSERT INTO """ + self.table_name('cmc_historical_data') + """ (%(columns)s) VALUES %(values)s ; """
-        self._exec_query(query, params)
+        bulk_insert(self.table_name('cmc_historical_data'), tickers, CMC_HISTORICAL_COLUMNS, upsert_keys)
 
-    def save_stock_historical_data(self, stock_data):
-        log.debug('{PSQL} == SAVE historical cmc data ==')
-        fmt_str = """
-                (
-                    '{coin}',
-                    '{date}',
-                    '{id}',
-                    {open},
-                    {high},
-                    {low},
-                    {close},
-                    {volume}
-                )
-                """
-        columns = """
-                    coin,
-                    date,
-                    id,
-                    open,
-                    high,
-                    low,
-                    close,
-                    volume
-                """
-        tickers = stock_data.where(pd.notna(stock_data), stock_data.mean(), axis='columns')
-        values = AsIs(','.join(fmt_str.format(**ticker) for idx, ticker in tickers.iterrows()))
-        params = {
-            "columns": AsIs(columns),
-            "values": values
-        }
-        query = """ INSERT INTO """ + self.table_name('stock_historical_data') + """ (%(columns)s) VALUES %(values)s ; """
-        self._exec_query(query, params)
+    def save_stock_historical_data(self, stock_data, upsert_keys=None):
+        log.debug('{PSQL} == SAVE historical stock data ==')
+        tickers = stock_data.where(pd.notna(stock_data), stock_data.mean(numeric_only=True), axis='columns')
+        bulk_insert(self.table_name('stock_historical_data'), tickers, STOCK_HISTORICAL_COLUMNS, upsert_keys)
 
     def get_stock_historical_data(self, date, coin=None):
         log.debug('{PSQL} == GET BACKTEST stock historical data ==')
-        query = """SELECT * FROM """ + self.table_name('stock_historical_data') + """ WHERE date = '""" + date + """'"""
         if coin is not None:
-            query += """ AND coin = '""" + coin + """'"""
-        query += """;"""
-        return self._fetch_query(query, {})
+            return self.prepared.fetch('stock_historical_data_by_date_and_coin', [date, coin])
+        return self.prepared.fetch('stock_historical_data_by_date', [date])
 
     def get_stock_metadata(self):
         log.debug('{PSQL} == GET BACKTEST stock historical data ==')
         query = """SELECT * FROM """ + self.table_name('stock_metadata')
         return self._fetch_query(query, {})
 
-    def get_cmc_historical_data(self, date, coin=None, start_date=None):
-        log.debug('{PSQL} == GET BACKTEST cmc historical data ==')
-        query = """SELECT * FROM """ + self.table_name('cmc_historical_data')
-
+    def cmc_historical_query(self, date, coin=None, start_date=None, columns=None):
+        """
+            date alone selects that day, with start_date it's the upper bound of the range
+        :param columns: <List> column projection, all columns when None
+        :return: query, params
+        """
+        conditions = []
+        params = {}
         if start_date is not None:
-            query += """ WHERE date >= '""" + start_date + """'"""
+            conditions.append('date >= %(start_date)s')
+            params['start_date'] = start_date
             if date is not None:
-                query += """ AND date <= '""" + date + """'"""
+                conditions.append('date <= %(date)s')
+                params['date'] = date
         elif date is not None:
-            query += """ WHERE date = '""" + date + """'"""
-
+            conditions.append('date = %(date)s')
+            params['date'] = date
         if coin is not None:
-            query += """ AND coin = '""" + coin + """'"""
+            conditions.append('coin = %(coin)s')
+            params['coin'] = coin
 
-        query += """;"""
-        return self._fetch_query(query, {})
+        projection = '*' if columns is None else ','.join(columns)
+        query = """SELECT """ + projection + """ FROM """ + self.table_name('cmc_historical_data')
+        if len(conditions) > 0:
+            query += """ WHERE """ + """ AND """.join(conditions)
+        return query, params
+
+    def get_cmc_historical_data(self, date, coin=None, start_date=None):
+        log.debug('{PSQL} == GET BACKTEST cmc historical data ==')
+        if self.cmc_cache is not None:
+            return self.cmc_cache.get(date, coin, start_date)
+        query, params = self.cmc_historical_query(date, coin, start_date)
+        return self._fetch_query(query + """;""", params)
+
+    def get_all_cmc_historical_data(self):
+        """
+            the whole cmc_historical_data table, from the local cache when there is one, otherwise streamed
+        :return: <DataFrame>
+        """
+        if self.cmc_cache is not None:
+            return self.cmc_cache.get()
+        chunks = list(self.stream_cmc_historical_data())
+        if len(chunks) == 0:
+            return pd.DataFrame(columns=CMC_HISTORICAL_COLUMNS)
+        return pd.concat(chunks, ignore_index=True)
+
+    def stream_cmc_historical_data(self, date=None, coin=None, start_date=None, columns=None,
+                                   itersize=PSQL_FETCH_ITERSIZE):
+        """
+            same rows as get_cmc_historical_data, ordered by date and yielded in chunks from a server side cursor
+        :return: generator of <DataFrame>
+        """
+        log.debug('{PSQL} == STREAM cmc historical data ==')
+        query, params = self.cmc_historical_query(date, coin, start_date, columns)
+        return self._stream_query(query + """ ORDER BY date ;""", params, itersize)
 
     def save_cmc_coin_metadata(self, metadata):
         log.debug('{PSQL} == SAVE cmc coin meta data ==')
@@ -438,9 +408,7 @@ class PostgresConnection:
 
     def save_tickers(self, tickers):
         log.debug('{PSQL} == SAVE tickers ==')
-        query, columns, values = save_tickers(tickers, self.table_name('save_tickers'))
-        params = {"columns": AsIs(columns), "values": AsIs(values)}
-        self._exec_query(query, params)
+        bulk_insert(self.table_name('save_tickers'), tickers, SAVE_TICKERS_COLUMNS)
 
     def save_collected_trade_data(self, trade_data):
         self.save_trade_data(trade_data, 'cc_trades')
@@ -450,9 +418,7 @@ class PostgresConnection:
 
     def save_trade_data(self, trade_data, table_name):
         log.debug('{PSQL} == SAVE historical_trade_data ==')
-        query, columns, values = save_trade_data(trade_data, table_name)
-        params = {"columns": AsIs(columns), "values": AsIs(values)}
-        self._exec_query(query, params)
+        bulk_insert(table_name, trade_data, SAVE_TRADE_DATA_COLUMNS)
 
     def save_order_data(self, trade_data):
         log.debug('{PSQL} == SAVE historical_trade_data ==')
@@ -474,15 +440,13 @@ class PostgresConnection:
 
     def save_index_balances(self, index_balances):
         log.debug('{PSQL} == SAVE index balances ==')
-        query, columns, values = save_index_balances(index_balances, self.table_name('index_balances'))
-        params = {"columns": AsIs(columns), "values": AsIs(values)}
-        self._exec_query(query, params)
+        bulk_insert(self.table_name('index_balances'), index_balances, SAVE_INDEX_BALANCES_COLUMNS)
 
     def save_index_metadata(self, index_metadata):
         log.debug('{PSQL} == SAVE index metadata ==')
-        query, columns, values = save_index_metadata(index_metadata, self.table_name('index_metadata'))
-        params = {"columns": AsIs(columns), "values": AsIs(values)}
-        self._exec_query(query, params)
+        if isinstance(index_metadata, dict):
+            index_metadata = [index_metadata]
+        bulk_insert(self.table_name('index_metadata'), index_metadata, SAVE_INDEX_METADATA_COLUMNS)
 
     def save_index(self, index_balances, index_metadata):
         self.save_index_balances(index_balances)
@@ -490,9 +454,7 @@ class PostgresConnection:
 
     def get_index_balances(self, index_date):
         log.debug('{PSQL} == GET index balances ==')
-        query = """SELECT * FROM """ + self.table_name('index_balances') + """
-            WHERE index_date = '""" + index_date + """'"""
-        return self._fetch_query(query, {})
+        return self.prepared.fetch('index_balances_by_date', [index_date])
 
     def pull_all_index_balance_data(self, index_id_list):
         log.debug('{PSQL} == GET all index balance data ==')
@@ -10,6 +10,12 @@ TABLE_NAMES = {
         'BACKTEST': 'fixture_market_summaries',
         'COLLECT_FIXTURES': 'fixture_market_summaries'
     },
+    'fixture_market_summaries': {
+        'PROD': 'fixture_market_summaries',
+        'PROD_TEST': 'fixture_market_summaries',
+        'BACKTEST': 'fixture_market_summaries',
+        'COLLECT_FIXTURES': 'fixture_market_summaries'
+    },
     'save_markets': {
         'PROD': 'prod_markets',
         'PROD_TEST': 'prod_test_markets',
@@ -0,0 +1,132 @@
+import os
+import time
+import atexit
+import threading
+import pandas as pd
+from queue import Queue, Empty
+from src.utils.logger import Logger
+
+log = Logger(__name__)
+
+WRITE_QUEUE_SIZE = int(os.getenv('WRITE_QUEUE_SIZE', 10000))
+WRITE_BATCH_SIZE = int(os.getenv('WRITE_BATCH_SIZE', 500))
+WRITE_FLUSH_SECONDS = float(os.getenv('WRITE_FLUSH_SECONDS', 2))
+WRITE_MAX_RETRIES = int(os.getenv('WRITE_MAX_RETRIES', 5))
+WRITE_RETRY_SECONDS = float(os.getenv('WRITE_RETRY_SECONDS', 1))
+
+_STOP = object()
+
+
+def merge_rows(batch):
+    # a batch is the rows of every put() for one writer, lists of dicts or DataFrames
+    if all(isinstance(rows, pd.DataFrame) for rows in batch):
+        return pd.concat(batch, ignore_index=True)
+    merged = []
+    for rows in batch:
+        merged += rows.to_dict('records') if isinstance(rows, pd.DataFrame) else list(rows)
+    return merged
+
+
+class WriteBehindQueue:
+    def __init__(self, max_size=WRITE_QUEUE_SIZE, batch_size=WRITE_BATCH_SIZE, flush_seconds=WRITE_FLUSH_SECONDS,
+                 max_retries=WRITE_MAX_RETRIES, retry_seconds=WRITE_RETRY_SECONDS):
+        """
+            persists rows from a background thread so the trading loop never waits on postgres
+
+            writers are registered by name, put(name, rows) queues rows for them, and the thread calls each
+            writer once per flush with everything queued for it. flushes happen every <batch_size> puts or
+            <flush_seconds>, whichever comes first. a failing write is retried with backoff <max_retries> times
+            before the batch is logged and dropped. put() blocks once <max_size> puts are waiting
+            the thread starts on the first put, and whatever is still queued at interpreter exit is written
+            before the process ends
+        """
+        self.queue = Queue(maxsize=max_size)
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_retries = max_retries
+        self.retry_seconds = retry_seconds
+        self.writers = {}
+        self.thread = None
+        self.lock = threading.Lock()
+        self.exit_registered = False
+        self.num_dropped = 0
+
+    def register(self, name, writer):
+        """
+        :param name: <str>
+        :param writer: called with a list of dicts or a DataFrame holding every queued row
+        """
+        self.writers[name] = writer
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                if not self.exit_registered:
+                    atexit.register(self.stop)
+                    self.exit_registered = True
+                self.thread = threading.Thread(target=self.run, name='write-behind')
+                self.thread.daemon = True
+                self.thread.start()
+
+    def put(self, name, rows):
+        """
+        :param name: a registered writer
+        :param rows: <List> of dicts or <DataFrame>
+        """
+        if name not in self.writers:
+            raise KeyError('no writer registered for ' + name)
+        self.start()
+        self.queue.put((name, rows))
+
+    def stop(self):
+        """
+            flushes everything that was queued and stops the thread
+        """
+        with self.lock:
+            if self.thread is not None:
+                self.queue.put(_STOP)
+                self.thread.join()
+                self.thread = None
+
+    def run(self):
+        pending = {}
+        num_pending = 0
+        deadline = time.time() + self.flush_seconds
+        while True:
+            try:
+                item = self.queue.get(timeout=max(0.0, deadline - time.time()))
+            except Empty:
+                item = None
+            if item is _STOP:
+                self.flush(pending)
+                self.queue.task_done()
+                return
+            if item is not None:
+                name, rows = item
+                pending.setdefault(name, []).append(rows)
+                num_pending += 1
+            if num_pending >= self.batch_size or time.time() >= deadline:
+                self.flush(pending)
+                for i in range(num_pending):
+                    self.queue.task_done()
+                pending = {}
+                num_pending = 0
+                deadline = time.time() + self.flush_seconds
+
+    def flush(self, pending):
+        for name, batch in pending.items():
+            self.write(name, merge_rows(batch))
+
+    def write(self, name, rows):
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.writers[name](rows)
+                return True
+            except Exception as e:
+                log.error('*** WRITE BEHIND ERROR *** ' + name + ' attempt ' + str(attempt + 1))
+                log.error(e)
+                if attempt < self.max_retries:
+                    time.sleep(self.retry_seconds * 2 ** attempt)
+        self.num_dropped += len(rows)
+        log.error('*** WRITE BEHIND DROPPED *** ' + str(len(rows)) + ' rows for ' + name)
+        return False
@@ -116,3 +116,19 @@ class DatabaseError(BotError):
     def __init__(self, msg):
         super(DatabaseError, self).__init__("DB error :: " + msg)
         self.msg = msg
+
+
+class RateLimitError(BotError):
+    """Raise when a request weighs more than a rate limit window can ever hold"""
+    def __init__(self, name, weight):
+        super(RateLimitError, self).__init__("Rate limit " + name + " :: request weight " + str(weight) + " exceeds a window's capacity")
+        self.name = name
+        self.weight = weight
+
+
+class PartialResultError(BotError):
+    """Raise when a request fanned out to several exchanges failed on some of them"""
+    def __init__(self, fn, failed):
+        super(PartialResultError, self).__init__(fn + " :: no result from " + ', '.join(failed))
+        self.fn = fn
+        self.failed = failed
@@ -0,0 +1,69 @@
+import os
+import asyncio
+import aiohttp
+from src.exceptions import APIRequestError
+from src.exchange.exchange_limits import new_rate_limiter
+from src.utils.logger import Logger
+
+log = Logger(__name__)
+
+ASYNC_POOL_SIZE = int(os.getenv('ASYNC_POOL_SIZE', 100))  # open connections per client
+ASYNC_TIMEOUT = int(os.getenv('ASYNC_TIMEOUT', 10))
+
+
+class AsyncExchangeClient:
+    def __init__(self, name, limiter=None, pool_size=ASYNC_POOL_SIZE):
+        """
+            base of the asyncio exchange clients, every request of a client goes through one pooled
+            aiohttp session, so hundreds of pair requests can be in flight on reused connections
+            subclasses implement the same normalized routes as the blocking clients, as coroutines
+        :param name: <str> exchange name, used in errors
+        :param limiter: <TokenBucketLimiter> awaited before every request, defaults to the exchange's
+                        published limits from exchange_limits
+        :param pool_size: <int> open connections the session keeps
+        """
+        self.name = name
+        self.limiter = new_rate_limiter(name) if limiter is None else limiter
+        self.pool_size = pool_size
+        self.session = None
+
+    async def get_session(self):
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            self.session = aiohttp.ClientSession(connector=connector,
+                                                 timeout=aiohttp.ClientTimeout(total=ASYNC_TIMEOUT))
+        return self.session
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self):
+        await self.get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def request(self, fn, method, url, endpoint=None, params=None, data=None, headers=None):
+        """
+        :param fn: <str> normalized route the request is made for, used in errors
+        :param endpoint: <str> rate limiter endpoint, weighs the request
+        :return: (<int> status, parsed json body)
+        """
+        await self.limiter.acquire(endpoint)
+        session = await self.get_session()
+        try:
+            async with session.request(method, url, params=params, data=data, headers=headers) as res:
+                return res.status, await res.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise APIRequestError(self.name, fn, self.name + ' :: ' + (str(e) or type(e).__name__))
+
+    async def gather(self, calls):
+        """
+            runs the coroutines at the same time
+        :param calls: <List> coroutines
+        :return: <List> results in the order of calls
+        """
+        return await asyncio.gather(*calls)
@@ -1,3 +1,5 @@
+import os
+import numpy
 import pandas as pd
 from time import mktime
 import datetime
@@ -8,6 +10,11 @@ from src.utils.utils import get_coins_from_market, normalize_inf_rows, normalize
 
 log = Logger(__name__)
 
+# TRUE loads every fixture summary up front and replays the ticks from memory
+BACKTEST_REPLAY = os.getenv('BACKTEST_REPLAY', 'FALSE') == 'TRUE'
+# optional local copy of fixture_market_summaries (.csv or pickle), see save_market_summaries
+BACKTEST_FIXTURE_FILE = os.getenv('BACKTEST_FIXTURE_FILE', '')
+
 
 class BacktestExchange:
     def __init__(self, start_date, end_date):
@@ -23,6 +30,9 @@ class BacktestExchange:
         self.current_summaries = None
         self.markets = None
         self.tradeable_markets = None
+        self.replay_summaries = None    # every fixture summary, sorted by ticker_nonce
+        self.replay_ticks = {}          # ticker_nonce -> (first row, last row + 1) in replay_summaries
+        self.current_rows = {}          # marketname -> row of current_summaries
         # self.market_summaries = self.load_market_summaries()
         log.info('backtest exchange successfully initialized')
 
@@ -57,6 +67,37 @@ class BacktestExchange:
         summary = {'USD-BTC': data}
         return summary
 
+    def preload_market_summaries(self, fixture_file=BACKTEST_FIXTURE_FILE):
+        """
+            loads the fixture summaries of every tick in one go, getmarketsummaries then serves them from memory
+        :param fixture_file: local copy of the fixture (.csv or pickle), queried from the db when empty
+        """
+        markets = tuple(self.markets['marketname'].values)
+        if fixture_file:
+            if fixture_file.endswith('.csv'):
+                summaries = pd.read_csv(fixture_file)
+            else:
+                summaries = pd.read_pickle(fixture_file)
+            summaries = summaries[summaries['marketname'].isin(markets)]
+        else:
+            summaries = self.psql.get_all_market_summaries(markets)
+        summaries = summaries.sort_values(['ticker_nonce', 'marketname'], kind='mergesort').reset_index(drop=True)
+        ticks, starts = numpy.unique(summaries['ticker_nonce'].values, return_index=True)
+        ends = numpy.append(starts[1:], len(summaries))
+        self.replay_ticks = dict((int(tick), (start, end)) for tick, start, end in zip(ticks, starts, ends))
+        self.replay_summaries = summaries.drop('ticker_nonce', axis=1)
+        log.info('preloaded ' + str(len(summaries)) + ' market summaries over ' + str(len(ticks)) + ' ticks')
+
+    def save_market_summaries(self, fixture_file):
+        """
+            writes the fixture summaries of the tradeable markets to a local file for BACKTEST_FIXTURE_FILE
+        """
+        summaries = self.psql.get_all_market_summaries(tuple(self.markets['marketname'].values))
+        if fixture_file.endswith('.csv'):
+            summaries.to_csv(fixture_file, index=False)
+        else:
+            summaries.to_pickle(fixture_file)
+
     def update_buy_balances(self, market, quantity, rate):
         base_coin, mkt_coin = get_coins_from_market(market)
         self.balances[base_coin]['balance'] -= (quantity * rate)
@@ -76,14 +117,18 @@ class BacktestExchange:
             self.markets = mkts[mkts['marketname'].isin(self.tradeable_markets)]
         else:
             self.markets = mkts
+        if BACKTEST_REPLAY and self.replay_summaries is None:
+            self.preload_market_summaries()
         return self.markets
 
     def getcurrencies(self):
         return self.psql.get_fixture_currencies()
 
+    def get_current_summary(self, market):
+        return self.current_summaries.iloc[self.current_rows[market]]
+
     def getticker(self, market):
-        market_summary = self.current_summaries[self.current_summaries['marketname'] == market].iloc[0]
-        return capitalize_index(market_summary).to_dict()
+        return capitalize_index(self.get_current_summary(market)).to_dict()
 
     # def getmarketsummaries(self):
     #     self.tick += 1
@@ -93,23 +138,24 @@ class BacktestExchange:
     def getmarketsummaries(self):
         """Returns a <LIST> of <PANDAS.SERIES>"""
         self.tick += 1
-        markets = tuple(self.markets['marketname'].values)
-        summaries = self.psql.get_market_summaries_by_ticker(self.tick, markets)
+        if self.replay_summaries is not None:
+            start, end = self.replay_ticks[self.tick]
+            summaries = self.replay_summaries.iloc[start:end].reset_index(drop=True)
+        else:
+            markets = tuple(self.markets['marketname'].values)
+            summaries = self.psql.get_market_summaries_by_ticker(self.tick, markets)
         self.current_summaries = summaries
-        results = []
+        self.current_rows = dict((market, idx) for idx, market in enumerate(summaries['marketname'].values))
         self.current_timestamp = summaries.loc[0, 'saved_timestamp']
-        # TODO remove this loop
-        for idx, summary in summaries.iterrows():
-            results.append(summary)
-        return results
+        return [summary for idx, summary in summaries.iterrows()]
 
     # def getmarketsummary(self, market):
     #     return self.query('getmarketsummary', {'market': market})
 
     def getorderbook(self, market, order_type, depth=20):
-        mkt_summary = self.current_summaries.loc[self.current_summaries['marketname'] == market]
-        buy = [{'Quantity': 999999999, 'Rate': mkt_summary['bid'].iloc[0]}]
-        sell = [{'Quantity': 999999999, 'Rate': mkt_summary['ask'].iloc[0]}]
+        mkt_summary = self.get_current_summary(market)
+        buy = [{'Quantity': 999999999, 'Rate': mkt_summary['bid']}]
+        sell = [{'Quantity': 999999999, 'Rate': mkt_summary['ask']}]
         if order_type == 'buy':
             order_book = {'buy': buy}
         elif order_type == 'sell':
@@ -3,13 +3,13 @@
 
 import hashlib
 import hmac
-import requests
 import time
 from operator import itemgetter
 from .helpers import date_to_milliseconds, interval_to_milliseconds
 from .exceptions import BinanceAPIException, BinanceRequestException, BinanceWithdrawException
 import os
 
+from src.utils.http_session import new_session
 from src.exceptions import APIDoesNotExistError, APIRequestError
 
 
@@ -89,11 +89,9 @@ class BinanceAPI(object):
 
     def _init_session(self):
 
-        session = requests.session()
-        session.headers.update({'Accept': 'application/json',
-                                'User-Agent': 'binance/python',
-                                'X-MBX-APIKEY': self.API_KEY})
-        return session
+        return new_session({'Accept': 'application/json',
+                            'User-Agent': 'binance/python',
+                            'X-MBX-APIKEY': self.API_KEY})
 
     def _create_api_uri(self, path, signed=True, version=PUBLIC_API_VERSION):
         v = self.PRIVATE_API_VERSION if signed else version
@@ -1906,6 +1904,16 @@ class BinanceAPI(object):
         klines = self.get_klines(symbol=pair, limit=1, startTime=start, interval=interval)
         return klines[0][4]
 
+    def get_historical_candles(self, pair=None, start=None, end=None, interval='1m'):
+        """
+        :param pair: 'ETHBTC'
+        :param start: <int> ms start time
+        :param end: <int> ms end time, at most 1000 candles after start
+        :return: [{'timestamp': <ms>, 'close': 0.071}, ...] oldest first
+        """
+        klines = self.get_klines(symbol=pair, limit=1000, startTime=start, endTime=end, interval=interval)
+        return [{'timestamp': kline[0], 'close': float(kline[4])} for kline in klines]
+
     #
     # def get_account_info(self):
     #     raise APIDoesNotExistError('binance', 'get_account_info')
@@ -3,8 +3,8 @@ import hashlib
 import hmac
 import json
 import time
-import requests
 import os
+from src.utils.http_session import new_session
 import pandas as pd
 import datetime
 from src.utils.utils import normalize_index, normalize_columns
@@ -25,6 +25,7 @@ class BitfinexAPI(object):
         self.BACKTESTING = os.getenv('BACKTESTING', 'FALSE')
         self.PROD_TESTING = os.getenv('PROD_TESTING', 'TRUE')
         self.base_url = "https://api.bitfinex.com/v2"
+        self.session = new_session()
 
     def get_historical_tickers(self, pair, start_time=0, end_time=0, interval='1h'):
         try:
@@ -35,7 +36,7 @@ class BitfinexAPI(object):
                 'end': end_time,
                 'sort': 1
             }
-            resp = requests.get(url, json.dumps(data))
+            resp = self.session.get(url, json.dumps(data))
             ticks = resp.json()
 
             if 'error' in ticks:
@@ -0,0 +1,52 @@
+import os
+import threading
+from src.utils.logger import Logger
+
+log = Logger(__name__)
+
+
+class ClientRegistry:
+    def __init__(self):
+        """
+            one long lived client per exchange for the whole process, so every call reuses the client's
+            http session and its keep-alive connections instead of building a new client per request
+            clients are created at most once even when several threads ask for one at the same time,
+            a forked child starts with its own clients rather than sharing the parent's sockets
+        """
+        self.clients = {}
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+
+    def get(self, exchange, client_class):
+        """
+        :param exchange: <str> exchange name
+        :param client_class: class the client is built from, called without arguments
+        :return: the exchange's client
+        """
+        if self.pid != os.getpid():
+            self.reset()
+        client = self.clients.get(exchange)
+        if client is None:
+            with self.lock:
+                client = self.clients.get(exchange)
+                if client is None:
+                    log.info('creating ' + exchange + ' client')
+                    client = client_class()
+                    self.clients[exchange] = client
+        return client
+
+    def reset(self):
+        with self.lock:
+            self.clients = {}
+            self.pid = os.getpid()
+
+
+_registry = ClientRegistry()
+
+
+def get_client(exchange, client_class):
+    return _registry.get(exchange, client_class)
+
+
+def reset_clients():
+    _registry.reset()
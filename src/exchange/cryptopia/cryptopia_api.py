@@ -8,6 +8,7 @@ import hashlib
 import base64
 import requests
 import os
+from src.utils.http_session import new_session
 from src.exceptions import APIRequestError, APIDoesNotExistError
 import dateutil.parser as dp
 
@@ -26,6 +27,7 @@ class CryptopiaAPI(object):
         self.private = ['GetBalance', 'GetDepositAddress', 'GetOpenOrders',
                         'GetTradeHistory', 'GetTransactions', 'SubmitTrade',
                         'CancelTrade', 'SubmitTip', 'SubmitWithdraw', 'SubmitTransfer']
+        self.session = new_session()
 
     def api_query(self, feature_requested, get_parameters=None, post_parameters=None):
         """ Performs a generic api request """
@@ -34,7 +36,7 @@ class CryptopiaAPI(object):
             url = "https://www.cryptopia.co.nz/Api/" + feature_requested
             post_data = json.dumps(post_parameters)
             headers = self.secure_headers(url=url, post_data=post_data)
-            req = requests.post(url, data=post_data, headers=headers)
+            req = self.session.post(url, data=post_data, headers=headers)
             if req.status_code != 200:
                 try:
                     req.raise_for_status()
@@ -52,7 +54,7 @@ class CryptopiaAPI(object):
             url = "https://www.cryptopia.co.nz/Api/" + feature_requested + "/" + \
                   ('/'.join(i for i in get_parameters.values()
                            ) if get_parameters is not None else "")
-            req = requests.get(url, params=get_parameters)
+            req = self.session.get(url, params=get_parameters)
             if req.status_code != 200:
                 try:
                     req.raise_for_status()
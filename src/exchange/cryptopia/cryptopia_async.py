@@ -0,0 +1,148 @@
+import os
+import json
+from src.exchange.async_client import AsyncExchangeClient
+from src.exchange.cryptopia.cryptopia_api import CryptopiaAPI
+from src.exceptions import APIRequestError, InvalidCoinError
+
+
+class AsyncCryptopiaAPI(AsyncExchangeClient):
+    def __init__(self, base_url='https://www.cryptopia.co.nz', limiter=None, **kwargs):
+        """
+            asyncio version of the normalized CryptopiaAPI routes, on one pooled session instead of
+            a blocking request and a one second sleep per call
+        :param base_url: <str> live or a local stub
+        """
+        super(AsyncCryptopiaAPI, self).__init__('cryptopia', limiter, **kwargs)
+        self.base_url = base_url
+        self.key = os.getenv('CRYPTOPIA_API_KEY', '')
+        self.secret = os.getenv('CRYPTOPIA_API_SECRET', '')
+        self.pairs = None
+
+    @staticmethod
+    def throw_error(fn, err):
+        raise APIRequestError('cryptopia', fn, 'cryptopia :: ' + str(err))
+
+    def check_response(self, fn, status, res_json):
+        if status != 200 or not isinstance(res_json, dict) or res_json.get('Success') is not True:
+            self.throw_error(fn, res_json.get('Error', res_json) if isinstance(res_json, dict) else res_json)
+        return res_json['Data']
+
+    async def public(self, fn, feature, endpoint, *params):
+        url = self.base_url + '/Api/' + feature + '/' + '/'.join(str(param) for param in params)
+        status, res_json = await self.request(fn, 'GET', url, endpoint)
+        return self.check_response(fn, status, res_json)
+
+    async def private(self, fn, feature, endpoint, params=None):
+        url = self.base_url + '/Api/' + feature
+        post_data = json.dumps({} if params is None else params)
+        # secure_headers only reads key and secret off the client it is called with
+        headers = CryptopiaAPI.secure_headers(self, url, post_data)
+        status, res_json = await self.request(fn, 'POST', url, endpoint, data=post_data, headers=headers)
+        return self.check_response(fn, status, res_json)
+
+    @staticmethod
+    def market_name(pair):
+        # pairs are labelled ETH/BTC, the market routes take ETH_BTC
+        return pair['pair'].replace('/', '_')
+
+    #
+    # GET ACCOUNT BALANCES
+    #
+
+    async def get_exchange_balances(self, coin=None):
+        balances = await self.private('get_exchange_balances', 'GetBalance', 'exchange_balances',
+                                      {'Currency': '' if coin is None else coin})
+        if coin is None:
+            return [CryptopiaAPI.normalize_balance(balance) for balance in balances]
+        for balance in balances:
+            if balance['Symbol'].lower() == coin.lower():
+                return CryptopiaAPI.normalize_balance(balance)
+        raise InvalidCoinError(coin, 'cryptopia')
+
+    #
+    # GET TICKERS
+    #
+
+    async def get_exchange_pairs(self):
+        pairs = await self.public('get_exchange_pairs', 'GetTradePairs', 'exchange_pairs')
+        return [CryptopiaAPI.normalize_exchange_pair(pair) for pair in pairs]
+
+    async def get_current_tickers(self):
+        if self.pairs is None:
+            self.pairs = dict((pair['pair'], pair) for pair in await self.get_exchange_pairs())
+        tickers = await self.public('get_current_tickers', 'GetMarkets', 'current_tickers')
+        return [CryptopiaAPI.normalize_ticker(tick, self.pairs[tick['Label']]) for tick in tickers
+                if tick['Label'] in self.pairs]
+
+    async def get_current_pair_ticker(self, pair):
+        tick = await self.public('get_current_pair_ticker', 'GetMarket', 'current_pair_ticker', self.market_name(pair))
+        return CryptopiaAPI.normalize_ticker(tick, pair)
+
+    #
+    # GET ORDER BOOK
+    #
+
+    async def get_order_book(self, pair, side='both'):
+        book = await self.public('get_order_book', 'GetMarketOrders', 'order_book', self.market_name(pair))
+        book = {
+            'bids': [self.normalize_order(order) for order in book['Buy']],
+            'asks': [self.normalize_order(order) for order in book['Sell']]
+        }
+        return book if side == 'both' else book[side]
+
+    @staticmethod
+    def normalize_order(order):
+        return {
+            'price': float(order['Price']),
+            'amount': float(order['Volume'])
+        }
+
+    #
+    # PLACE / CANCEL / STATUS ORDER
+    #
+
+    async def buy_limit(self, amount, price, pair):
+        return await self.order_limit(amount, price, 'buy', pair)
+
+    async def sell_limit(self, amount, price, pair):
+        return await self.order_limit(amount, price, 'sell', pair)
+
+    async def order_limit(self, amount, price, side, pair):
+        params = {'Market': pair['pair'], 'Type': side.capitalize(), 'Rate': price, 'Amount': amount}
+        order = await self.private('order_limit_' + side, 'SubmitTrade', side + '_limit', params)
+        # an order filled on submission comes back without an OrderId
+        return self.normalize_order_resp(order['OrderId'], side, price, amount, 0.0 if order['OrderId'] else amount,
+                                         order['OrderId'] is not None, pair)
+
+    async def cancel_order(self, order_id, pair):
+        cancelled = await self.private('cancel_order', 'CancelTrade', 'cancel_order', {'Type': 'Trade', 'OrderId': order_id})
+        return {'order_id': order_id, 'exchange': 'cryptopia', 'pair': pair['pair'], 'is_cancelled': order_id in cancelled}
+
+    async def get_order_status(self, order_id, pair):
+        """
+            cryptopia only lists open orders, an order missing from them is reported as no longer live
+        """
+        orders = await self.private('get_order_status', 'GetOpenOrders', 'order_status', {'Market': pair['pair']})
+        for order in orders:
+            if order['OrderId'] == order_id:
+                return self.normalize_order_resp(order_id, order['Type'].lower(), order['Rate'], order['Amount'],
+                                                 order['Amount'] - order['Remaining'], True, pair)
+        return {'order_id': order_id, 'exchange': 'cryptopia', 'pair': pair['pair'], 'is_live': False}
+
+    @staticmethod
+    def normalize_order_resp(order_id, side, price, amount, executed, is_live, pair):
+        return {
+            'order_id': order_id,
+            'exchange': 'cryptopia',
+            'order_type': 'limit',
+            'pair': pair['pair'],
+            'base_coin': pair['base_coin'],
+            'mkt_coin': pair['mkt_coin'],
+            'side': side,
+            'price': float(price),
+            'original_amount': float(amount),
+            'executed_amount': float(executed),
+            'remaining_amount': float(amount) - float(executed),
+            'is_live': is_live,
+            'is_cancelled': False
+        }
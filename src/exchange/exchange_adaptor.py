@@ -12,9 +12,12 @@ import pandas as pd
 from src.utils.conversion_utils import convert_str_columns_to_num, get_usd_rate
 from src.utils.utils import is_eth, is_btc
 from src.exchange.gdax.gdax_public import PublicClient as GDaxPub
-from datetime import datetime, timedelta
+from datetime import datetime
 from src.utils.logger import Logger
-from src.utils.rate_limiter import RateLimiter
+from src.exchange.exchange_limits import new_rate_limiters
+from src.exchange.client_registry import get_client
+from src.exchange.fan_out import fan_out, merge_results
+from src.exchange.rate_service import HistoricalRateService, RateCache, RATE_CACHE, RATE_CACHE_PATH, MINUTE_MS
 from src.exceptions import APIRequestError, InvalidCoinError, APIDoesNotExistError
 from src.exchange.exchange_utils.binance_utils import create_normalized_trade_data_binance
 from src.data_structures.historical_prices import HistoricalRates
@@ -51,16 +54,7 @@ class ExchangeAdaptor:
             'cmc': Market,
             'bitfinex': BitfinexAPI
         }
-        self.rate_limiters = {
-            'binance': RateLimiter('binance'),
-            'bittrex': RateLimiter('bittrex'),
-            'gdax': RateLimiter('gdax'),
-            'gemini': RateLimiter('gemini'),
-            'cryptopia': RateLimiter('cryptopia'),
-            'gateio': RateLimiter('gateio'),
-            'cmc': RateLimiter('cmc'),
-            'bitfinex': RateLimiter('bitfinex', rate_limit=timedelta(0, 2, 0))
-        }
+        self.rate_limiters = new_rate_limiters()
         self.exchange_pairs = {
             'binance': {},
             'bittrex': {},
@@ -90,13 +84,21 @@ class ExchangeAdaptor:
             'bitfinex': 1
         }
         self.historical_rates = HistoricalRates('gemini')
+        self.rate_service = None
 
     def get_exchange_adaptor(self, exchange):
-        return self.exchange_adaptors[exchange]()
+        # one shared, long lived client per exchange, see client_registry
+        return get_client(exchange, self.exchange_adaptors[exchange])
 
     def check_rate_cache(self, timestamp, base_coin, mkt_coin):
         return self.historical_rates.get_rate(timestamp, base_coin, mkt_coin)
 
+    def get_rate_service(self):
+        if self.rate_service is None:
+            self.rate_service = HistoricalRateService(self.get_historical_candles,
+                                                      RateCache(RATE_CACHE_PATH if RATE_CACHE else None))
+        return self.rate_service
+
     #####################################################
     #                                                   #
     #   Formatting Utils                                #
@@ -190,18 +192,18 @@ class ExchangeAdaptor:
         try:
             if timestamp is None:
                 timestamp = datetime.now()
-            # gemini has no historical rate endpoint
-            if exchange == 'gemini':
-                exchange = 'gdax'
+            exchange = self.historical_rate_exchange(exchange)
             exists_in_cache, cache_rate = self.check_rate_cache(timestamp, base_coin, mkt_coin)
             if exists_in_cache:
                 return cache_rate
+            elif interval == '1m' and self.get_rate_service().supports(exchange):
+                return self.get_rate_service().get_rate(exchange, base_coin, mkt_coin, timestamp)
             else:
                 start, end = self.format_exchange_start_and_end_times(exchange, timestamp, 1)
                 exchange_interval = self.format_exchange_interval(exchange, interval)
                 pair = self.format_exchange_pair(exchange, mkt_coin, base_coin)
-                ex = self.exchange_adaptors[exchange]()
-                self.rate_limiters[exchange].limit()
+                ex = self.get_exchange_adaptor(exchange)
+                self.rate_limiters[exchange].limit('historical_rate')
                 pair_rate = float(ex.get_historical_rate(pair=pair, start=start, end=end, interval=exchange_interval))
                 return pair_rate
         except KeyError as e:
@@ -218,6 +220,48 @@ class ExchangeAdaptor:
             log.error(e.error_msg)
             return None
 
+    @staticmethod
+    def historical_rate_exchange(exchange):
+        # gemini has no historical rate endpoint
+        return 'gdax' if exchange == 'gemini' else exchange
+
+    def get_historical_candles(self, exchange, base_coin, mkt_coin, start, end):
+        """
+            1 minute candles of a pair, one request
+        :param start: <int> ms
+        :param end: <int> ms, within the exchange's candle limit of start
+        :return: [{'timestamp': <ms>, 'close': 0.071}, ...] oldest first
+        """
+        start_time, end_time = self.format_exchange_start_and_end_times(exchange, start, (end - start) / MINUTE_MS)
+        pair = self.format_exchange_pair(exchange, mkt_coin, base_coin)
+        ex = self.get_exchange_adaptor(exchange)
+        self.rate_limiters[exchange].limit('historical_candles')
+        return ex.get_historical_candles(pair=pair, start=start_time, end=end_time,
+                                         interval=self.format_exchange_interval(exchange, '1m'))
+
+    def prefetch_historical_rates(self, trades):
+        """
+            fetches every rate get_historical_usd_vs_btc_eth_rates and get_historical_coin_vs_btc_eth_rates
+            look up for <trades> as candle ranges, so the per trade lookups are cache hits
+        :param trades: <DataFrame> trade_time, exchange_id, mkt_coin
+        """
+        keys = []
+        for timestamp, exchange, coin in zip(trades['trade_time'], trades['exchange_id'], trades['mkt_coin']):
+            keys += self.historical_rate_keys(timestamp, exchange, coin.upper())
+        self.get_rate_service().prefetch(keys)
+
+    def historical_rate_keys(self, timestamp, exchange, coin):
+        """
+        :return: [(exchange, base_coin, mkt_coin, timestamp), ...] the rates one trade is analyzed with
+        """
+        exchange = self.historical_rate_exchange(exchange)
+        keys = [('gdax', 'USD', 'BTC', timestamp), ('gdax', 'USD', 'ETH', timestamp), (exchange, 'BTC', coin, timestamp)]
+        if coin == 'BTC':
+            keys.append((exchange, 'BTC', 'ETH', timestamp))
+        else:
+            keys.append((exchange, 'ETH', coin, timestamp))
+        return [key for key in keys if key[1] != key[2]]
+
     def get_historical_trades(self, exchange, pair=None):
         """
             gets all account trades on specified exchange pair between specified time period
@@ -231,8 +275,8 @@ class ExchangeAdaptor:
         try:
             if pair is None:
                 raise APIRequestError(exchange, 'get_historical_trades', 'pair missing')
-            ex = self.exchange_adaptors[exchange]()
-            self.rate_limiters[exchange].limit()
+            ex = self.get_exchange_adaptor(exchange)
+            self.rate_limiters[exchange].limit('historical_trades')
             trade_data = ex.get_historical_trades(pair=pair)
             if isinstance(trade_data, list):
                 return trade_data
@@ -253,8 +297,8 @@ class ExchangeAdaptor:
         try:
             if pair is None:
                 raise APIRequestError(exchange, 'get_historical_trades', 'pair missing')
-            ex = self.exchange_adaptors[exchange]()
-            self.rate_limiters[exchange].limit()
+            ex = self.get_exchange_adaptor(exchange)
+            self.rate_limiters[exchange].limit('historical_tickers')
             trade_data = ex.get_historical_tickers(pair, start_time=start_time, end_time=end_time, interval=interval)
             if isinstance(trade_data, list):
                 return trade_data
@@ -288,8 +332,8 @@ class ExchangeAdaptor:
             ]
         """
         try:
-            ex = self.exchange_adaptors[exchange]()
-            self.rate_limiters[exchange].limit()
+            ex = self.get_exchange_adaptor(exchange)
+            self.rate_limiters[exchange].limit('current_tickers')
             tickers = ex.get_current_tickers()
             result = []
             if ohlc:
@@ -309,6 +353,17 @@ class ExchangeAdaptor:
             log.error(e.error_msg)
             return None
 
+    def get_all_current_tickers(self, exchanges, ohlc=False, allow_partial=False):
+        """
+            get_current_tickers of every exchange, fetched concurrently
+        :param exchanges: <List> exchange names
+        :param ohlc: see get_current_tickers
+        :param allow_partial: <bool> return the exchanges that answered instead of raising PartialResultError
+        :return: <DataFrame> tickers of every exchange, 'exchange' column set
+        """
+        results = fan_out(exchanges, lambda exchange: self.get_current_tickers(exchange, ohlc))
+        return merge_results(results, 'get_all_current_tickers', allow_partial)
+
     def get_current_pair_ticker(self, exchange, pair=None):
         """
             gets the most recent ticker data for a specified pair on a given exchange
@@ -335,8 +390,8 @@ class ExchangeAdaptor:
         try:
             if pair is None:
                 raise APIRequestError(exchange, 'get_current_pair_ticker', 'please specify a pair')
-            ex = self.exchange_adaptors[exchange]()
-            self.rate_limiters[exchange].limit()
+            ex = self.get_exchange_adaptor(exchange)
+            self.rate_limiters[exchange].limit('current_pair_ticker')
             ticker = ex.get_current_pair_ticker(pair)
             ticker = {
                 **ticker,
@@ -382,8 +437,8 @@ class ExchangeAdaptor:
                 raise APIRequestError(exchange, 'buy_limit', 'amount missing')
             if price is None:
                 raise APIRequestError(exchange, 'buy_limit', 'price missing')
-            ex = self.exchange_adaptors[exchange]()
-            self.rate_limiters[exchange].limit()
+            ex = self.get_exchange_adaptor(exchange)
+            self.rate_limiters[exchange].limit('buy_limit')
             return ex.buy_limit(amount, price, pair)
         except APIRequestError as e:
             log.error(e.error_msg)
@@ -420,8 +475,8 @@ class ExchangeAdaptor:
                 raise APIRequestError(exchange, 'sell_limit', 'amount missing')
             if price is None:
                 raise APIRequestError(exchange, 'sell_limit', 'price missing')
-            ex = self.exchange_adaptors[exchange]()
-            self.rate_limiters[exchange].limit()
+            ex = self.get_exchange_adaptor(exchange)
+            self.rate_limiters[exchange].limit('sell_limit')
             return ex.sell_limit(amount, price, pair)
         except APIRequestError as e:
             log.error(e.error_msg)
@@ -456,8 +511,8 @@ class ExchangeAdaptor:
                 raise APIRequestError(exchange, 'cancel_order', 'pair missing')
             if order_id is None:
                 raise APIRequestError(exchange, 'cancel_order', 'order_id missing')
-            ex = self.exchange_adaptors[exchange]()
-            self.rate_limiters[exchange].limit()
+            ex = self.get_exchange_adaptor(exchange)
+            self.rate_limiters[exchange].limit('cancel_order')
             return ex.cancel_order(order_id, pair)
         except APIRequestError as e:
             log.error(e.error_msg)
@@ -495,8 +550,8 @@ class ExchangeAdaptor:
             if order_id is None:
                 raise APIRequestError(exchange, 'get_order_status', 'please specify an order_id')
 
-            ex = self.exchange_adaptors[exchange]()
-            self.rate_limiters[exchange].limit()
+            ex = self.get_exchange_adaptor(exchange)
+            self.rate_limiters[exchange].limit('order_status')
             order_status = ex.get_order_status(order_id, pair)
             return order_status
         except APIRequestError as e:
@@ -525,8 +580,8 @@ class ExchangeAdaptor:
             if pair is None:
                 raise APIRequestError(exchange, 'get_order_book', 'pair missing')
 
-            ex = self.exchange_adaptors[exchange]()
-            self.rate_limiters[exchange].limit()
+            ex = self.get_exchange_adaptor(exchange)
+            self.rate_limiters[exchange].limit('order_book')
             order_book = ex.get_order_book(pair, side)
             return order_book
         except APIRequestError as e:
@@ -555,7 +610,7 @@ class ExchangeAdaptor:
         :param exchange: 'binance'
         :return: {'LTC-BTC': {'pair': 'LTC-BTC', 'base_coin': 'BTC', 'mkt_coin': 'LTC'}, ...}
         """
-        ex = self.exchange_adaptors[exchange]()
+        ex = self.get_exchange_adaptor(exchange)
         pair_list = ex.get_exchange_pairs()
         for pair in pair_list:
             self.exchange_pairs[exchange][pair['pair']] = pair
@@ -617,8 +672,8 @@ class ExchangeAdaptor:
             ]
         """
         try:
-            ex = self.exchange_adaptors[exchange]()
-            self.rate_limiters[exchange].limit()
+            ex = self.get_exchange_adaptor(exchange)
+            self.rate_limiters[exchange].limit('exchange_balances')
             self.balances[exchange] = ex.get_exchange_balances()
             return self.balances[exchange]
         except APIRequestError as e:
@@ -637,6 +692,16 @@ class ExchangeAdaptor:
             #                         'btc_balance', 'last_price']
             #     return convert_str_columns_to_num(pd.DataFrame(balances), coinigy_col_keys)
 
+    def get_all_exchange_balances(self, exchanges, allow_partial=False):
+        """
+            get_exchange_balances of every exchange, fetched concurrently
+        :param exchanges: <List> exchange names
+        :param allow_partial: <bool> return the exchanges that answered instead of raising PartialResultError
+        :return: <DataFrame> balances of every exchange, 'exchange' column set
+        """
+        results = fan_out(exchanges, lambda exchange: self.get_exchange_balances(exchange))
+        return merge_results(results, 'get_all_exchange_balances', allow_partial)
+
     #####################################################
     #                                                   #
     #   Level 2 Routes                                  #
@@ -655,7 +720,7 @@ class ExchangeAdaptor:
             ex = self.get_exchange_adaptor(exchange)
             for sym, pair in pairs.items():
                 log.info('getting historical trade data for {0} on {1}'.format(pair, exchange))
-                self.rate_limiters[exchange].limit()
+                self.rate_limiters[exchange].limit('historical_trades')
                 trade_data = ex.get_historical_trades(pair)
                 if trade_data is not None:
                     all_trades = all_trades + trade_data
@@ -757,13 +822,13 @@ class ExchangeAdaptor:
     #####################################################
 
     def get_stats(self, convert='USD'):
-        ex = self.exchange_adaptors['cmc']()
+        ex = self.get_exchange_adaptor('cmc')
         return ex.stats(convert=convert)
 
     def get_ticker(self, coin='BTC', start=None, limit=None, convert='USD'):
-        ex = self.exchange_adaptors['cmc']()
+        ex = self.get_exchange_adaptor('cmc')
         return ex.ticker(currency=coin, start=start, limit=limit, convert=convert)
 
     def get_listings(self):
-        ex = self.exchange_adaptors['cmc']()
+        ex = self.get_exchange_adaptor('cmc')
         return ex.listings()
\ No newline at end of file
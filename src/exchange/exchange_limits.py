@@ -0,0 +1,46 @@
+from src.utils.rate_limiter import TokenBucketLimiter, REQUESTS
+
+# binance weighs each endpoint against its 1200 per minute limit
+BINANCE_REQUEST_WEIGHTS = {
+    'current_tickers': 40,
+    'historical_trades': 5,
+    'exchange_balances': 5,
+    'order_status': 1,
+    'order_book': 1,
+    'current_pair_ticker': 1,
+    'historical_rate': 1,
+    'historical_candles': 1,
+    'historical_tickers': 1,
+    'buy_limit': 1,
+    'sell_limit': 1,
+    'cancel_order': 1
+}
+
+# published request limits, a request waits until every window of its exchange has room for it
+# (allowed, seconds[, what the window counts]), windows count request weight unless marked REQUESTS
+EXCHANGE_RATE_LIMITS = {
+    'binance': ([(20, 1, REQUESTS), (1200, 60)], BINANCE_REQUEST_WEIGHTS),
+    'bittrex': ([(1, 1), (60, 60)], None),
+    'gdax': ([(3, 1)], None),
+    'gemini': ([(5, 1), (120, 60)], None),
+    'cryptopia': ([(1, 1)], None),
+    'gateio': ([(1, 1)], None),
+    'cmc': ([(30, 60)], None),
+    'bitfinex': ([(1, 1), (30, 60)], None)
+}
+
+
+def new_rate_limiter(exchange):
+    """
+    :param exchange: <str> a key of EXCHANGE_RATE_LIMITS
+    :return: <TokenBucketLimiter> a fresh limiter with the exchange's published limits
+    """
+    windows, weights = EXCHANGE_RATE_LIMITS[exchange]
+    return TokenBucketLimiter(exchange, windows, weights=weights)
+
+
+def new_rate_limiters():
+    """
+    :return: {exchange: <TokenBucketLimiter>} for every exchange in EXCHANGE_RATE_LIMITS
+    """
+    return dict((exchange, new_rate_limiter(exchange)) for exchange in EXCHANGE_RATE_LIMITS)
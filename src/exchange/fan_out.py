@@ -0,0 +1,66 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from src.exceptions import APIRequestError, PartialResultError
+from src.utils.logger import Logger
+
+log = Logger(__name__)
+
+FAN_OUT_WORKERS = int(os.getenv('FAN_OUT_WORKERS', 8))
+
+
+def fan_out(exchanges, call, workers=FAN_OUT_WORKERS):
+    """
+        runs call(exchange) for every exchange at the same time, so a multi exchange request takes as long
+        as the slowest exchange instead of the sum of all of them
+        each call still waits on its own exchange's rate limiter. an exchange whose request fails with
+        APIRequestError is logged and left as None (see failed_exchanges), any other error is raised once
+        every call has finished
+    :param exchanges: <List> exchange names
+    :param call: function of one exchange name
+    :param workers: <int> threads, 0 calls the exchanges one after another
+    :return: {exchange: result} in the order of exchanges
+    """
+    def safe_call(exchange):
+        try:
+            return call(exchange)
+        except APIRequestError as e:
+            log.error('fan out failed :: ' + exchange + ' :: ' + str(e.error_msg))
+            return None
+
+    exchanges = list(exchanges)
+    if workers <= 0 or len(exchanges) < 2:
+        return dict((exchange, safe_call(exchange)) for exchange in exchanges)
+    with ThreadPoolExecutor(max_workers=min(workers, len(exchanges))) as pool:
+        futures = [pool.submit(safe_call, exchange) for exchange in exchanges]
+    return dict((exchange, future.result()) for exchange, future in zip(exchanges, futures))
+
+
+def failed_exchanges(results):
+    """
+    :param results: {exchange: result} as returned by fan_out
+    :return: <List> exchanges without a result, the adaptor routes return None when their request failed
+    """
+    return [exchange for exchange, result in results.items() if result is None]
+
+
+def merge_results(results, fn='fan_out', allow_partial=False):
+    """
+        one frame of every exchange's rows, tagged with the exchange they came from
+    :param results: {exchange: <List> <dict>} as returned by fan_out
+    :param fn: <str> the route the results are for, used in errors
+    :param allow_partial: <bool> merge what there is when some exchanges failed, instead of raising
+    :return: <DataFrame>
+    """
+    failed = failed_exchanges(results)
+    if len(failed) > 0 and not allow_partial:
+        raise PartialResultError(fn, failed)
+    frames = []
+    for exchange, rows in results.items():
+        if not rows:
+            continue
+        frame = pd.DataFrame(rows)
+        if 'exchange' not in frame.columns:
+            frame['exchange'] = exchange
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True) if len(frames) > 0 else pd.DataFrame()
@@ -224,11 +224,12 @@ class GateIOAPI:
         except Exception as e:
             self.throw_error('get_current_pair_ticker', e.__str__())
 
-    def normalize_ticker(self, tick, pair):
+    @staticmethod
+    def normalize_ticker(tick, pair):
         return {
             'last': float(tick['last']),
             'exchange': 'gatio',
-            **self.normalize_exchange_pair(pair)
+            **GateIOAPI.normalize_exchange_pair(pair)
         }
 
 
@@ -320,10 +321,11 @@ class GateIOAPI:
             self.throw_error('get_order_book', e.__str__())
 
 
-    def normalize_order_book(self, order_book):
+    @staticmethod
+    def normalize_order_book(order_book):
         return {
-            'bids': [self.normalize_order(order) for order in order_book['bids']],
-            'asks': [self.normalize_order(order) for order in order_book['asks']]
+            'bids': [GateIOAPI.normalize_order(order) for order in order_book['bids']],
+            'asks': [GateIOAPI.normalize_order(order) for order in order_book['asks']]
         }
 
 
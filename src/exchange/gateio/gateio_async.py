@@ -0,0 +1,115 @@
+import os
+from urllib.parse import urlencode
+from src.exchange.async_client import AsyncExchangeClient
+from src.exchange.gateio.gateio_api import GateIOAPI
+from src.exchange.gateio.HttpUtil import getSign
+from src.exceptions import APIRequestError, InvalidCoinError
+
+
+class AsyncGateIOAPI(AsyncExchangeClient):
+    def __init__(self, api_url='https://data.gateio.io', trade_url='https://api.gateio.io', limiter=None, **kwargs):
+        """
+            asyncio version of the normalized GateIOAPI routes, on one pooled session instead of
+            a new HTTPSConnection per call
+        :param api_url: <str> public data host
+        :param trade_url: <str> private trading host
+        """
+        super(AsyncGateIOAPI, self).__init__('gateio', limiter, **kwargs)
+        self.api_url = api_url
+        self.trade_url = trade_url
+        self.api_key = os.getenv('GATEIO_API_KEY', '')
+        self.secret_key = os.getenv('GATEIO_API_SECRET', '')
+
+    @staticmethod
+    def throw_error(fn, err):
+        raise APIRequestError('gateio', fn, 'gateio :: ' + str(err))
+
+    async def public(self, fn, path, endpoint):
+        status, res_json = await self.request(fn, 'GET', self.api_url + '/api2/1/' + path, endpoint)
+        if status != 200 or (isinstance(res_json, dict) and res_json.get('result') in ('false', False)):
+            self.throw_error(fn, res_json)
+        return res_json
+
+    async def private(self, fn, path, endpoint, params=None):
+        params = {} if params is None else params
+        headers = {
+            'Content-type': 'application/x-www-form-urlencoded',
+            'KEY': self.api_key,
+            'SIGN': getSign(params, self.secret_key)
+        }
+        status, res_json = await self.request(fn, 'POST', self.trade_url + '/api2/1/private/' + path, endpoint,
+                                              data=urlencode(params), headers=headers)
+        if status != 200 or res_json.get('result') in ('false', False):
+            self.throw_error(fn, res_json)
+        return res_json
+
+    #
+    # GET ACCOUNT BALANCES
+    #
+
+    async def get_exchange_balances(self, coin=None):
+        balances = (await self.private('get_exchange_balances', 'balances', 'exchange_balances')).get('available', {})
+        if coin is None:
+            return [GateIOAPI.normalize_balance(balance, koin) for koin, balance in balances.items()]
+        if coin not in balances:
+            raise InvalidCoinError(coin, 'gateio')
+        return GateIOAPI.normalize_balance(balances[coin], coin)
+
+    #
+    # GET TICKERS
+    #
+
+    async def get_exchange_pairs(self):
+        pairs = await self.public('get_exchange_pairs', 'pairs', 'exchange_pairs')
+        return [GateIOAPI.normalize_exchange_pair(pair) for pair in pairs]
+
+    async def get_current_tickers(self):
+        tickers = await self.public('get_current_tickers', 'tickers', 'current_tickers')
+        return [GateIOAPI.normalize_ticker(tick, pair) for pair, tick in tickers.items()]
+
+    async def get_current_pair_ticker(self, pair):
+        tick = await self.public('get_current_pair_ticker', 'ticker/' + pair['pair'], 'current_pair_ticker')
+        return GateIOAPI.normalize_ticker(tick, pair['pair'])
+
+    #
+    # GET ORDER BOOK
+    #
+
+    async def get_order_book(self, pair, side='both'):
+        book = await self.public('get_order_book', 'orderBook/' + pair['pair'], 'order_book')
+        book = GateIOAPI.normalize_order_book(book)
+        return book if side == 'both' else book[side]
+
+    #
+    # PLACE ORDER
+    #
+
+    async def buy_limit(self, amount, price, pair):
+        return await self.order_limit(amount, price, 'buy', pair)
+
+    async def sell_limit(self, amount, price, pair):
+        return await self.order_limit(amount, price, 'sell', pair)
+
+    async def order_limit(self, amount, price, side, pair):
+        params = {'currencyPair': pair['pair'], 'rate': price, 'amount': amount}
+        order = await self.private('order_limit_' + side, side, side + '_limit', params)
+        return self.normalize_order_resp(order, side, amount, pair)
+
+    @staticmethod
+    def normalize_order_resp(order_resp, side, amount, pair):
+        filled = float(order_resp.get('filledAmount', 0))
+        return {
+            'order_id': order_resp['orderNumber'],
+            'exchange': 'gateio',
+            'order_type': 'limit',
+            'pair': pair['pair'],
+            'base_coin': pair['base_coin'],
+            'mkt_coin': pair['mkt_coin'],
+            'side': side,
+            'price': float(order_resp['rate']),
+            'original_amount': float(amount),
+            'executed_amount': filled,
+            'remaining_amount': float(order_resp.get('leftAmount', float(amount) - filled)),
+            'is_live': float(order_resp.get('leftAmount', 0)) > 0,
+            'is_cancelled': False
+        }
@@ -7,7 +7,6 @@
 import hmac
 import hashlib
 import time
-import requests
 import base64
 import json
 from requests.auth import AuthBase
@@ -17,7 +16,7 @@ from src.exceptions import APIRequestError, APIDoesNotExistError, InvalidCoinErr
 import os
 import datetime
 import dateutil.parser as dp
-from src.utils.rate_limiter import RateLimiter
+from src.exchange.exchange_limits import new_rate_limiter
 
 
 GDAX_API_KEY = os.getenv('GDAX_API_KEY', '')
@@ -31,10 +30,11 @@ class GDAXAPI(PublicClient):
         self.auth = GdaxAuth(GDAX_API_KEY, GDAX_API_SECRET, GDAX_API_PASS)
         self.timeout = timeout
         self.pairs = None
-        self.rate_limiter = RateLimiter('gdax')
+        # public endpoints allow 3 requests per second
+        self.rate_limiter = new_rate_limiter('gdax')
 
     def get_account(self, account_id):
-        r = requests.get(self.url + '/accounts/' + account_id, auth=self.auth, timeout=self.timeout)
+        r = self.session.get(self.url + '/accounts/' + account_id, auth=self.auth, timeout=self.timeout)
         # r.raise_for_status()
         return r.json()
 
@@ -43,7 +43,7 @@ class GDAXAPI(PublicClient):
 
     def get_account_history(self, account_id):
         result = []
-        r = requests.get(self.url + '/accounts/{}/ledger'.format(account_id), auth=self.auth, timeout=self.timeout)
+        r = self.session.get(self.url + '/accounts/{}/ledger'.format(account_id), auth=self.auth, timeout=self.timeout)
         # r.raise_for_status()
         result.append(r.json())
         if "cb-after" in r.headers:
@@ -51,7 +51,7 @@ class GDAXAPI(PublicClient):
         return result
 
     def history_pagination(self, account_id, result, after):
-        r = requests.get(self.url + '/accounts/{}/ledger?after={}'.format(account_id, str(after)), auth=self.auth, timeout=self.timeout)
+        r = self.session.get(self.url + '/accounts/{}/ledger?after={}'.format(account_id, str(after)), auth=self.auth, timeout=self.timeout)
         # r.raise_for_status()
         if r.json():
             result.append(r.json())
@@ -61,7 +61,7 @@ class GDAXAPI(PublicClient):
 
     def get_account_holds(self, account_id):
         result = []
-        r = requests.get(self.url + '/accounts/{}/holds'.format(account_id), auth=self.auth, timeout=self.timeout)
+        r = self.session.get(self.url + '/accounts/{}/holds'.format(account_id), auth=self.auth, timeout=self.timeout)
         # r.raise_for_status()
         result.append(r.json())
         if "cb-after" in r.headers:
@@ -69,7 +69,7 @@ class GDAXAPI(PublicClient):
         return result
 
     def holds_pagination(self, account_id, result, after):
-        r = requests.get(self.url + '/accounts/{}/holds?after={}'.format(account_id, str(after)), auth=self.auth, timeout=self.timeout)
+        r = self.session.get(self.url + '/accounts/{}/holds?after={}'.format(account_id, str(after)), auth=self.auth, timeout=self.timeout)
         # r.raise_for_status()
         if r.json():
             result.append(r.json())
@@ -81,22 +81,22 @@ class GDAXAPI(PublicClient):
         kwargs["side"] = "buy"
         if "product_id" not in kwargs:
             kwargs["product_id"] = self.product_id
-        r = requests.post(self.url + '/orders',
-                          data=json.dumps(kwargs),
-                          auth=self.auth,
-                          timeout=self.timeout)
+        r = self.session.post(self.url + '/orders',
+                              data=json.dumps(kwargs),
+                              auth=self.auth,
+                              timeout=self.timeout)
         return r.json()
 
     def sell(self, **kwargs):
         kwargs["side"] = "sell"
-        r = requests.post(self.url + '/orders',
-                          data=json.dumps(kwargs),
-                          auth=self.auth,
-                          timeout=self.timeout)
+        r = self.session.post(self.url + '/orders',
+                              data=json.dumps(kwargs),
+                              auth=self.auth,
+                              timeout=self.timeout)
         return r.json()
 
     def cancel_order(self, order_id):
-        r = requests.delete(self.url + '/orders/' + order_id, auth=self.auth, timeout=self.timeout)
+        r = self.session.delete(self.url + '/orders/' + order_id, auth=self.auth, timeout=self.timeout)
         # r.raise_for_status()
         return r.json()
 
@@ -104,12 +104,12 @@ class GDAXAPI(PublicClient):
         url = self.url + '/orders/'
         if product_id:
             url += "?product_id={}&".format(str(product_id))
-        r = requests.delete(url, auth=self.auth, timeout=self.timeout)
+        r = self.session.delete(url, auth=self.auth, timeout=self.timeout)
         # r.raise_for_status()
         return r.json()
 
     def get_order(self, order_id):
-        r = requests.get(self.url + '/orders/' + order_id, auth=self.auth, timeout=self.timeout)
+        r = self.session.get(self.url + '/orders/' + order_id, auth=self.auth, timeout=self.timeout)
         # r.raise_for_status()
         return r.json()
 
@@ -121,7 +121,7 @@ class GDAXAPI(PublicClient):
             params["product_id"] = product_id
         if status:
             params["status"] = status
-        r = requests.get(url, auth=self.auth, params=params, timeout=self.timeout)
+        r = self.session.get(url, auth=self.auth, params=params, timeout=self.timeout)
         # r.raise_for_status()
         result.append(r.json())
         if 'cb-after' in r.headers:
@@ -138,7 +138,7 @@ class GDAXAPI(PublicClient):
             params["product_id"] = product_id
         if status:
             params["status"] = status
-        r = requests.get(url, auth=self.auth, params=params, timeout=self.timeout)
+        r = self.session.get(url, auth=self.auth, params=params, timeout=self.timeout)
         # r.raise_for_status()
         if r.json():
             result.append(r.json())
@@ -159,7 +159,7 @@ class GDAXAPI(PublicClient):
             url += "after={}&".format(str(after))
         if limit:
             url += "limit={}&".format(str(limit))
-        r = requests.get(url, auth=self.auth, timeout=self.timeout)
+        r = self.session.get(url, auth=self.auth, timeout=self.timeout)
         # r.raise_for_status()
         result.append(r.json())
         if 'cb-after' in r.headers and limit is not len(r.json()):
@@ -172,7 +172,7 @@ class GDAXAPI(PublicClient):
             url += "order_id={}&".format(str(order_id))
         if product_id:
             url += "product_id={}&".format(product_id)
-        r = requests.get(url, auth=self.auth, timeout=self.timeout)
+        r = self.session.get(url, auth=self.auth, timeout=self.timeout)
         # r.raise_for_status()
         if r.json():
             result.append(r.json())
@@ -188,7 +188,7 @@ class GDAXAPI(PublicClient):
             url += "status={}&".format(str(status))
         if after:
             url += 'after={}&'.format(str(after))
-        r = requests.get(url, auth=self.auth, timeout=self.timeout)
+        r = self.session.get(url, auth=self.auth, timeout=self.timeout)
         # r.raise_for_status()
         result.append(r.json())
         if 'cb-after' in r.headers:
@@ -200,7 +200,7 @@ class GDAXAPI(PublicClient):
             "amount": amount,
             "currency": currency  # example: USD
         }
-        r = requests.post(self.url + "/funding/repay", data=json.dumps(payload), auth=self.auth, timeout=self.timeout)
+        r = self.session.post(self.url + "/funding/repay", data=json.dumps(payload), auth=self.auth, timeout=self.timeout)
         # r.raise_for_status()
         return r.json()
 
@@ -211,12 +211,12 @@ class GDAXAPI(PublicClient):
             "currency": currency,  # example: USD
             "amount": amount
         }
-        r = requests.post(self.url + "/profiles/margin-transfer", data=json.dumps(payload), auth=self.auth, timeout=self.timeout)
+        r = self.session.post(self.url + "/profiles/margin-transfer", data=json.dumps(payload), auth=self.auth, timeout=self.timeout)
         # r.raise_for_status()
         return r.json()
 
     def get_position(self):
-        r = requests.get(self.url + "/position", auth=self.auth, timeout=self.timeout)
+        r = self.session.get(self.url + "/position", auth=self.auth, timeout=self.timeout)
         # r.raise_for_status()
         return r.json()
 
@@ -224,7 +224,7 @@ class GDAXAPI(PublicClient):
         payload = {
             "repay_only": repay_only or False
         }
-        r = requests.post(self.url + "/position/close", data=json.dumps(payload), auth=self.auth, timeout=self.timeout)
+        r = self.session.post(self.url + "/position/close", data=json.dumps(payload), auth=self.auth, timeout=self.timeout)
         # r.raise_for_status()
         return r.json()
 
@@ -234,7 +234,7 @@ class GDAXAPI(PublicClient):
             "currency": currency,
             "payment_method_id": payment_method_id
         }
-        r = requests.post(self.url + "/deposits/payment-method", data=json.dumps(payload), auth=self.auth, timeout=self.timeout)
+        r = self.session.post(self.url + "/deposits/payment-method", data=json.dumps(payload), auth=self.auth, timeout=self.timeout)
         # r.raise_for_status()
         return r.json()
 
@@ -244,7 +244,7 @@ class GDAXAPI(PublicClient):
             "currency": currency,
             "coinbase_account_id": coinbase_account_id
         }
-        r = requests.post(self.url + "/deposits/coinbase-account", data=json.dumps(payload), auth=self.auth, timeout=self.timeout)
+        r = self.session.post(self.url + "/deposits/coinbase-account", data=json.dumps(payload), auth=self.auth, timeout=self.timeout)
         # r.raise_for_status()
         return r.json()
 
@@ -254,7 +254,7 @@ class GDAXAPI(PublicClient):
             "currency": currency,
             "payment_method_id": payment_method_id
         }
-        r = requests.post(self.url + "/withdrawals/payment-method", data=json.dumps(payload), auth=self.auth, timeout=self.timeout)
+        r = self.session.post(self.url + "/withdrawals/payment-method", data=json.dumps(payload), auth=self.auth, timeout=self.timeout)
         # r.raise_for_status()
         return r.json()
 
@@ -264,7 +264,7 @@ class GDAXAPI(PublicClient):
             "currency": currency,
             "coinbase_account_id": coinbase_account_id
         }
-        r = requests.post(self.url + "/withdrawals/coinbase", data=json.dumps(payload), auth=self.auth, timeout=self.timeout)
+        r = self.session.post(self.url + "/withdrawals/coinbase", data=json.dumps(payload), auth=self.auth, timeout=self.timeout)
         # r.raise_for_status()
         return r.json()
 
@@ -274,17 +274,17 @@ class GDAXAPI(PublicClient):
             "currency": currency,
             "crypto_address": crypto_address
         }
-        r = requests.post(self.url + "/withdrawals/crypto", data=json.dumps(payload), auth=self.auth, timeout=self.timeout)
+        r = self.session.post(self.url + "/withdrawals/crypto", data=json.dumps(payload), auth=self.auth, timeout=self.timeout)
         # r.raise_for_status()
         return r.json()
 
     def get_payment_methods(self):
-        r = requests.get(self.url + "/payment-methods", auth=self.auth, timeout=self.timeout)
+        r = self.session.get(self.url + "/payment-methods", auth=self.auth, timeout=self.timeout)
         # r.raise_for_status()
         return r.json()
 
     def get_coinbase_accounts(self):
-        r = requests.get(self.url + "/coinbase-accounts", auth=self.auth, timeout=self.timeout)
+        r = self.session.get(self.url + "/coinbase-accounts", auth=self.auth, timeout=self.timeout)
         # r.raise_for_status()
         return r.json()
 
@@ -299,17 +299,17 @@ class GDAXAPI(PublicClient):
             "format": report_format,
             "email": email
         }
-        r = requests.post(self.url + "/reports", data=json.dumps(payload), auth=self.auth, timeout=self.timeout)
+        r = self.session.post(self.url + "/reports", data=json.dumps(payload), auth=self.auth, timeout=self.timeout)
         # r.raise_for_status()
         return r.json()
 
     def get_report(self, report_id=""):
-        r = requests.get(self.url + "/reports/" + report_id, auth=self.auth, timeout=self.timeout)
+        r = self.session.get(self.url + "/reports/" + report_id, auth=self.auth, timeout=self.timeout)
         # r.raise_for_status()
         return r.json()
 
     def get_trailing_volume(self):
-        r = requests.get(self.url + "/users/self/trailing-volume", auth=self.auth, timeout=self.timeout)
+        r = self.session.get(self.url + "/users/self/trailing-volume", auth=self.auth, timeout=self.timeout)
         # r.raise_for_status()
         return r.json()
 
@@ -387,7 +387,7 @@ class GDAXAPI(PublicClient):
             self.pairs = self.get_exchange_pairs()
         pairs = []
         for p in self.pairs:
-            self.rate_limiter.limit()
+            self.rate_limiter.limit('current_pair_ticker')
             pairs.append(self.get_current_pair_ticker(p))
         return pairs
 
@@ -525,6 +525,22 @@ class GDAXAPI(PublicClient):
             # TODO deal w/ empty response
             return self.get_product_historic_rates(product_id=pair, start=start, end=end, granularity=interval)[0][4]
 
+    def get_historical_candles(self, pair, start=None, end=None, interval=None):
+        """
+        :param pair: 'ETH-BTC'
+        :param start: <str> iso start time
+        :param end: <str> iso end time, at most 300 candles after start
+        :param interval: <int> candle seconds
+        :return: [{'timestamp': <ms>, 'close': 0.071}, ...] oldest first, minutes without trades have no candle
+        """
+        if pair is None or start is None or end is None:
+            raise APIRequestError('gdax', 'get_historical_candles', "PAIR, START, and END required. pair: {0} start: {1}, end: {2}".format(pair, start, end))
+        candles = self.get_product_historic_rates(product_id=pair, start=start, end=end, granularity=interval)
+        if not isinstance(candles, list):
+            raise APIRequestError('gdax', 'get_historical_candles', repr(candles))
+        return sorted(({'timestamp': candle[0] * 1000, 'close': float(candle[4])} for candle in candles),
+                      key=lambda candle: candle['timestamp'])
+
     # TODO, get_historical_tickers, get_account_info, initiate_withdrawal
 
     # def get_historical_tickers(self, start_time=None, end_time=None, interval='1m'):
@@ -4,7 +4,7 @@
 #
 # For public requests to the GDAX exchange
 
-import requests
+from src.utils.http_session import new_session
 from src.exceptions import APIRequestError
 
 class PublicClient(object):
@@ -27,6 +27,7 @@ class PublicClient(object):
         """
         self.url = api_url.rstrip('/')
         self.timeout = timeout
+        self.session = new_session()
 
     ###########################################
 
@@ -37,7 +38,7 @@ class PublicClient(object):
     def _get(self, path, params=None):
         """Perform get request"""
 
-        r = requests.get(self.url + path, params=params, timeout=self.timeout)
+        r = self.session.get(self.url + path, params=params, timeout=self.timeout)
         # r.raise_for_status()
         # TODO deal w/ empty response
         return r.json()
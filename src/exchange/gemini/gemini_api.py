@@ -8,11 +8,25 @@ import json
 import hmac
 import base64
 import hashlib
-import requests
 import os
+from src.utils.http_session import new_session
 from src.exceptions import InvalidCoinError, APIDoesNotExistError, APIRequestError
 
 
+def sign_payload(api_key, secret_key, params):
+    """
+        the headers of an authenticated request, shared by the blocking and asyncio clients
+    :param params: <dict> request payload
+    """
+    jsonparams = json.dumps(params)
+    payload = base64.b64encode(jsonparams.encode())
+    signature = hmac.new(secret_key.encode(), payload, hashlib.sha384).hexdigest()
+
+    return {'X-GEMINI-APIKEY': api_key,
+            'X-GEMINI-PAYLOAD': payload.decode(),
+            'X-GEMINI-SIGNATURE': signature}
+
+
 class GeminiAPI(object):
     """
     A class to make requests to the Gemini API.
@@ -35,6 +49,7 @@ class GeminiAPI(object):
         self.live_url = 'https://api.gemini.com'
         self.sandbox_url = 'https://api.sandbox.gemini.com'
         self.base_url = self.live_url
+        self.session = new_session()
 
         self.pairs = None
 
@@ -43,13 +58,13 @@ class GeminiAPI(object):
         """Send a request for all trading symbols, return the response."""
         url = self.base_url + '/v1/symbols'
 
-        return requests.get(url)
+        return self.session.get(url)
 
     def pubticker(self, symbol='btcusd'):
         """Send a request for latest ticker info, return the response."""
         url = self.base_url + '/v1/pubticker/' + symbol
 
-        return requests.get(url)
+        return self.session.get(url)
 
     def book(self, symbol='btcusd', limit_bids=0, limit_asks=0):
         """
@@ -66,7 +81,7 @@ class GeminiAPI(object):
             'limit_asks': limit_asks
         }
 
-        return requests.get(url, params)
+        return self.session.get(url, params)
 
     def trades(self, symbol='btcusd', since=0, limit_trades=50,
                include_breaks=0):
@@ -86,13 +101,13 @@ class GeminiAPI(object):
             'include_breaks': include_breaks
         }
 
-        return requests.get(url, params)
+        return self.session.get(url, params)
 
     def auction(self, symbol='btcusd'):
         """Send a request for latest auction info, return the response."""
         url = self.base_url + '/v1/auction/' + symbol
 
-        return requests.get(url)
+        return self.session.get(url)
 
     def auction_history(self, symbol='btcusd', since=0,
                         limit_auction_results=50, include_indicative=1):
@@ -114,7 +129,7 @@ class GeminiAPI(object):
             'include_indicative': include_indicative
         }
 
-        return requests.get(url, params)
+        return self.session.get(url, params)
 
     # authenticated requests
     def new_order(self, amount, price, side, client_order_id=None,
@@ -148,7 +163,7 @@ class GeminiAPI(object):
         if options is not None:
             params['options'] = options
 
-        return requests.post(url, headers=self.prepare(params))
+        return self.session.post(url, headers=self.prepare(params))
 
     def _cancel_order(self, order_id):
         """
@@ -165,7 +180,7 @@ class GeminiAPI(object):
             'order_id': order_id
         }
 
-        return requests.post(url, headers=self.prepare(params))
+        return self.session.post(url, headers=self.prepare(params))
 
     def cancel_session(self):
         """Send a request to cancel all session orders, return the response."""
@@ -176,7 +191,7 @@ class GeminiAPI(object):
             'nonce': self.get_nonce()
         }
 
-        return requests.post(url, headers=self.prepare(params))
+        return self.session.post(url, headers=self.prepare(params))
 
     def cancel_all(self):
         """Send a request to cancel all orders, return the response."""
@@ -187,7 +202,7 @@ class GeminiAPI(object):
             'nonce': self.get_nonce()
         }
 
-        return requests.post(url, headers=self.prepare(params))
+        return self.session.post(url, headers=self.prepare(params))
 
     def order_status(self, order_id):
         """
@@ -204,7 +219,7 @@ class GeminiAPI(object):
             'order_id': order_id
         }
 
-        return requests.post(url, headers=self.prepare(params))
+        return self.session.post(url, headers=self.prepare(params))
 
     def active_orders(self):
         """Send a request to get active orders, return the response."""
@@ -215,7 +230,7 @@ class GeminiAPI(object):
             'nonce': self.get_nonce()
         }
 
-        return requests.post(url, headers=self.prepare(params))
+        return self.session.post(url, headers=self.prepare(params))
 
     def _get_historical_trades(self, symbol='btcusd', limit_trades=50, timestamp=0):
         """
@@ -236,7 +251,7 @@ class GeminiAPI(object):
             'timestamp': timestamp
         }
 
-        return requests.post(url, headers=self.prepare(params))
+        return self.session.post(url, headers=self.prepare(params))
 
     def tradevolume(self):
         """Send a request to get your trade volume, return the response."""
@@ -247,7 +262,7 @@ class GeminiAPI(object):
             'nonce': self.get_nonce()
         }
 
-        return requests.post(url, headers=self.prepare(params))
+        return self.session.post(url, headers=self.prepare(params))
 
     def balances(self):
         """Send an account balance request, return the response."""
@@ -258,7 +273,7 @@ class GeminiAPI(object):
             'nonce': self.get_nonce()
         }
 
-        return requests.post(url, headers=self.prepare(params))
+        return self.session.post(url, headers=self.prepare(params))
 
     def newAddress(self, currency='btc', label=''):
         """
@@ -279,7 +294,7 @@ class GeminiAPI(object):
         if label != '':
             params['label'] = label
 
-        return requests.post(url, headers=self.prepare(params))
+        return self.session.post(url, headers=self.prepare(params))
 
     def heartbeat(self):
         """Send a heartbeat message, return the response."""
@@ -290,7 +305,7 @@ class GeminiAPI(object):
             'nonce': self.get_nonce()
         }
 
-        return requests.post(url, headers=self.prepare(params))
+        return self.session.post(url, headers=self.prepare(params))
 
     def get_nonce(self):
         """Return the current millisecond timestamp as the nonce."""
@@ -306,14 +321,7 @@ class GeminiAPI(object):
         Arguments:
         params -- a dictionary of parameters
         """
-        jsonparams = json.dumps(params)
-        payload = base64.b64encode(jsonparams.encode())
-        signature = hmac.new(self.secret_key.encode(), payload,
-                             hashlib.sha384).hexdigest()
-
-        return {'X-GEMINI-APIKEY': self.api_key,
-                'X-GEMINI-PAYLOAD': payload,
-                'X-GEMINI-SIGNATURE': signature}
+        return sign_payload(self.api_key, self.secret_key, params)
 
     #####################################################
     #                                                   #
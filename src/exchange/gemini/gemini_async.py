@@ -0,0 +1,124 @@
+import os
+import time
+import asyncio
+from src.exchange.async_client import AsyncExchangeClient
+from src.exchange.gemini.gemini_api import GeminiAPI, sign_payload
+from src.exceptions import APIRequestError, InvalidCoinError
+
+
+class AsyncGeminiAPI(AsyncExchangeClient):
+    def __init__(self, base_url='https://api.gemini.com', limiter=None, **kwargs):
+        """
+            asyncio version of the normalized GeminiAPI routes, returns the same normalized data
+        :param base_url: <str> live, sandbox or a local stub
+        """
+        super(AsyncGeminiAPI, self).__init__('gemini', limiter, **kwargs)
+        self.api_key = os.getenv('GEMINI_API_KEY', '')
+        self.secret_key = os.getenv('GEMINI_API_SECRET', '')
+        self.base_url = base_url
+        self.pairs = None
+        self.last_nonce = 0
+        # gemini rejects a nonce lower than one it has already seen, so private requests go one at a time
+        self.private_lock = asyncio.Lock()
+
+    def get_nonce(self):
+        self.last_nonce = max(int(round(time.time() * 1000)), self.last_nonce + 1)
+        return self.last_nonce
+
+    @staticmethod
+    def throw_error(fn, err):
+        if isinstance(err, dict) and 'reason' in err:
+            GeminiAPI.throw_error(fn, err)
+        raise APIRequestError('gemini', fn, 'gemini :: ' + str(err))
+
+    async def public(self, fn, path, endpoint, params=None):
+        status, res_json = await self.request(fn, 'GET', self.base_url + path, endpoint, params=params)
+        if status != 200:
+            self.throw_error(fn, res_json)
+        return res_json
+
+    async def private(self, fn, path, endpoint, params=None):
+        async with self.private_lock:
+            payload = {'request': path, 'nonce': self.get_nonce()}
+            if params is not None:
+                payload.update(params)
+            status, res_json = await self.request(fn, 'POST', self.base_url + path, endpoint,
+                                                  headers=sign_payload(self.api_key, self.secret_key, payload))
+        if status != 200:
+            self.throw_error(fn, res_json)
+        return res_json
+
+    #
+    # GET ACCOUNT BALANCES
+    #
+
+    async def get_exchange_balances(self, coin=None):
+        balances = await self.private('get_exchange_balances', '/v1/balances', 'exchange_balances')
+        if coin is None:
+            return [GeminiAPI.normalize_balance(balance) for balance in balances]
+        for balance in balances:
+            if balance['currency'].lower() == coin.lower():
+                return GeminiAPI.normalize_balance(balance)
+        raise InvalidCoinError(coin, 'gemini')
+
+    #
+    # GET TICKERS
+    #
+
+    async def get_exchange_pairs(self):
+        symbols = await self.public('get_exchange_pairs', '/v1/symbols', 'exchange_pairs')
+        return [GeminiAPI.normalize_exchange_pair(symbol) for symbol in symbols]
+
+    async def get_current_tickers(self):
+        """
+            gemini has no all pairs ticker, every pair's ticker is requested at once
+        """
+        if self.pairs is None:
+            self.pairs = await self.get_exchange_pairs()
+        return await self.gather([self.get_current_pair_ticker(pair) for pair in self.pairs])
+
+    async def get_current_pair_ticker(self, pair):
+        tick = await self.public('get_current_pair_ticker', '/v1/pubticker/' + pair['pair'], 'current_pair_ticker')
+        return GeminiAPI.normalize_ticker(tick, pair)
+
+    #
+    # GET ORDER BOOK
+    #
+
+    async def get_order_book(self, pair, side='both'):
+        book = await self.public('get_order_book', '/v1/book/' + pair['pair'], 'order_book',
+                                 params={'limit_bids': 0, 'limit_asks': 0})
+        book = {
+            'bids': [GeminiAPI.normalize_order(order) for order in book['bids']],
+            'asks': [GeminiAPI.normalize_order(order) for order in book['asks']]
+        }
+        return book if side == 'both' else book[side]
+
+    #
+    # PLACE / CANCEL / STATUS ORDER
+    #
+
+    async def buy_limit(self, amount, price, pair):
+        return await self.order_limit(amount, price, 'buy', pair)
+
+    async def sell_limit(self, amount, price, pair):
+        return await self.order_limit(amount, price, 'sell', pair)
+
+    async def order_limit(self, amount, price, side, pair):
+        params = {
+            'symbol': pair['pair'],
+            'amount': str(amount),
+            'price': str(price),
+            'side': side,
+            'type': 'exchange limit'
+        }
+        order = await self.private('order_limit_' + side, '/v1/order/new', side + '_limit', params)
+        return GeminiAPI.normalize_order_resp(order, pair)
+
+    async def cancel_order(self, order_id, pair):
+        order = await self.private('cancel_order', '/v1/order/cancel', 'cancel_order', {'order_id': order_id})
+        return GeminiAPI.normalize_order_resp(order, pair)
+
+    async def get_order_status(self, order_id, pair):
+        order = await self.private('get_order_status', '/v1/order/status', 'order_status', {'order_id': order_id})
+        return GeminiAPI.normalize_order_resp(order, pair)
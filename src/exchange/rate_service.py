@@ -0,0 +1,168 @@
+import os
+import sqlite3
+import threading
+from collections import defaultdict
+from src.exceptions import APIRequestError
+from src.utils.logger import Logger
+
+log = Logger(__name__)
+
+RATE_CACHE = os.getenv('RATE_CACHE', 'TRUE') == 'TRUE'
+RATE_CACHE_PATH = os.getenv('RATE_CACHE_PATH', os.path.expanduser('~/.cryptobot/rate_cache.sqlite'))
+MINUTE_MS = 1000 * 60
+
+# most 1 minute candles one request returns
+CANDLE_LIMITS = {
+    'gdax': 300,
+    'binance': 1000
+}
+
+
+def minute_of(timestamp):
+    """
+    :param timestamp: <int> ms
+    :return: <int> minutes since the epoch
+    """
+    return int(timestamp) // MINUTE_MS
+
+
+def fill_range(start, end, candles):
+    """
+        the close of every minute in [start, end], a minute without a candle takes the close of the next one
+        (the rate the single candle lookup stepped forward to), minutes after the last candle are left out
+    :param candles: [{'timestamp': <ms>, 'close': <float>}, ...]
+    :return: {minute: close}
+    """
+    closes = dict((minute_of(candle['timestamp']), candle['close']) for candle in candles)
+    rates = {}
+    next_close = None
+    for minute in range(end, start - 1, -1):
+        if minute in closes:
+            next_close = closes[minute]
+        if next_close is not None:
+            rates[minute] = next_close
+    return rates
+
+
+class RateCache:
+    def __init__(self, path=RATE_CACHE_PATH):
+        """
+            on disk (exchange, pair, minute) -> close, kept between runs so rates are fetched once
+        :param path: <str> sqlite file, None keeps the rates in memory only
+        """
+        self.path = path
+        if path is not None and os.path.dirname(path) and not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(':memory:' if path is None else path, check_same_thread=False)
+        self.conn.execute('CREATE TABLE IF NOT EXISTS rates (exchange TEXT, pair TEXT, minute INTEGER, close REAL, '
+                          'PRIMARY KEY (exchange, pair, minute))')
+        self.conn.commit()
+
+    def get_many(self, exchange, pair, minutes):
+        """
+        :return: {minute: close} of the minutes that are cached
+        """
+        minutes = list(minutes)
+        result = {}
+        with self.lock:
+            # stay under sqlite's bound variable limit
+            for i in range(0, len(minutes), 500):
+                chunk = minutes[i:i + 500]
+                rows = self.conn.execute('SELECT minute, close FROM rates WHERE exchange = ? AND pair = ? AND minute IN ('
+                                         + ','.join('?' * len(chunk)) + ')', [exchange, pair] + chunk)
+                result.update(rows.fetchall())
+        return result
+
+    def put_many(self, exchange, pair, rates):
+        """
+        :param rates: {minute: close}
+        """
+        with self.lock:
+            self.conn.executemany('INSERT OR REPLACE INTO rates VALUES (?, ?, ?, ?)',
+                                  [(exchange, pair, minute, close) for minute, close in rates.items()])
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class HistoricalRateService:
+    def __init__(self, fetch_candles, cache=None, candle_limits=CANDLE_LIMITS):
+        """
+            memoized 1 minute close rates, the (pair, minute) keys a job needs are collected up front and
+            fetched as ranges of contiguous candles instead of one candle request per lookup
+        :param fetch_candles: fn(exchange, base_coin, mkt_coin, start, end) -> [{'timestamp': <ms>, 'close': <float>}]
+                              oldest first, start and end in ms
+        :param cache: <RateCache> defaults to memory only
+        :param candle_limits: {exchange: most candles per request}, the exchanges the service can fetch
+        """
+        self.fetch_candles = fetch_candles
+        self.cache = RateCache(None) if cache is None else cache
+        self.candle_limits = candle_limits
+        self.rates = {}
+        self.requests = 0
+
+    def supports(self, exchange):
+        return exchange in self.candle_limits
+
+    def get_rate(self, exchange, base_coin, mkt_coin, timestamp):
+        """
+        :param timestamp: <int> ms
+        :return: <float> close of the minute's candle (or the next candle), None when the exchange has none
+        """
+        base_coin, mkt_coin = base_coin.upper(), mkt_coin.upper()
+        minute = minute_of(timestamp)
+        self.load(exchange, base_coin, mkt_coin, [minute])
+        return self.rates.get((exchange, base_coin + '-' + mkt_coin, minute))
+
+    def prefetch(self, keys):
+        """
+            loads every rate in keys with as few requests as the candle limits allow, a pair that fails is
+            logged and left to be fetched on lookup
+        :param keys: iterable of (exchange, base_coin, mkt_coin, <ms timestamp>)
+        """
+        minutes_by_pair = defaultdict(set)
+        for exchange, base_coin, mkt_coin, timestamp in keys:
+            if self.supports(exchange) and base_coin.upper() != mkt_coin.upper():
+                minutes_by_pair[(exchange, base_coin.upper(), mkt_coin.upper())].add(minute_of(timestamp))
+        requests = self.requests
+        for (exchange, base_coin, mkt_coin), minutes in minutes_by_pair.items():
+            try:
+                self.load(exchange, base_coin, mkt_coin, sorted(minutes))
+            except APIRequestError as e:
+                log.error(e.error_msg)
+        log.info('prefetched rates :: ' + str(len(minutes_by_pair)) + ' pairs, ' + str(self.requests - requests) + ' requests')
+
+    def load(self, exchange, base_coin, mkt_coin, minutes):
+        """
+            resolves the minutes from memory, then disk, then candle ranges from the exchange
+        :param minutes: <List> sorted minutes
+        """
+        pair = base_coin + '-' + mkt_coin
+        missing = [minute for minute in minutes if (exchange, pair, minute) not in self.rates]
+        for minute, close in self.cache.get_many(exchange, pair, missing).items():
+            self.rates[(exchange, pair, minute)] = close
+        missing = [minute for minute in missing if (exchange, pair, minute) not in self.rates]
+        limit = self.candle_limits[exchange]
+        i = 0
+        while i < len(missing):
+            start = missing[i]
+            end = start + limit - 1
+            candles = self.fetch_candles(exchange, base_coin, mkt_coin, start * MINUTE_MS, end * MINUTE_MS)
+            self.requests += 1
+            rates = fill_range(start, end, candles)
+            self.cache.put_many(exchange, pair, rates)
+            for minute, close in rates.items():
+                self.rates[(exchange, pair, minute)] = close
+            j = i
+            while j < len(missing) and missing[j] <= end:
+                j += 1
+            # minutes after the window's last candle get one more range starting at the first of them
+            unresolved = [k for k in range(i, j) if missing[k] not in rates]
+            if len(unresolved) > 0 and missing[unresolved[0]] != start:
+                i = unresolved[0]
+            else:
+                if len(unresolved) > 0:
+                    log.warning('no ' + exchange + ' ' + pair + ' candles after minute ' + str(start))
+                i = j
@@ -0,0 +1,108 @@
+import math
+import numpy
+
+# largest growth allowed for decay ** -k inside one block of ema_series
+MAX_BLOCK_GROWTH = 1e100
+
+
+def ema_alpha(span):
+    return 2.0 / (span + 1)
+
+
+class EMA:
+    def __init__(self, span):
+        """
+            O(1) recursive exponential moving average, seeded with the first value
+            matches series.ewm(span=span, adjust=False).mean()
+        :param span: <int>
+        """
+        self.span = span
+        self.alpha = ema_alpha(span)
+        self.value = numpy.nan
+        self.n = 0
+
+    def update(self, value):
+        if self.n == 0:
+            self.value = value
+        else:
+            self.value = (value - self.value) * self.alpha + self.value
+        self.n += 1
+        return self.value
+
+
+def ema_series(values, span, seed=None):
+    """
+        vectorized recursive EMA over a whole array, same values as stepping EMA(span) through <values>
+
+        uses the closed form ema[t] = decay^t * (ema[-1] + alpha * sum(x[k] * decay^-k)), evaluated in
+        blocks short enough for decay^-k to stay inside float range
+    :param values: <numpy.ndarray>
+    :param span: <int>
+    :param seed: previous EMA value, defaults to seeding with values[0]
+    :return: <numpy.ndarray>
+    """
+    values = numpy.asarray(values, dtype=numpy.float64)
+    result = numpy.empty_like(values)
+    if len(values) == 0:
+        return result
+    alpha = ema_alpha(span)
+    decay = 1.0 - alpha
+    if seed is None:
+        seed = values[0]
+    if decay == 0:
+        result[:] = values
+        return result
+    block_size = max(1, int(math.log(MAX_BLOCK_GROWTH) / -math.log(decay)))
+    prev = seed
+    for start in range(0, len(values), block_size):
+        block = values[start:start + block_size]
+        powers = decay ** numpy.arange(1, len(block) + 1)
+        result[start:start + len(block)] = powers * (prev + alpha * numpy.cumsum(block / powers))
+        prev = result[start + len(block) - 1]
+    return result
+
+
+class MACD:
+    def __init__(self, fast_span, slow_span, signal_span):
+        """
+            O(1) MACD state for one market
+                MACD = EMA(fast) - EMA(slow)
+                MACD_sign = EMA(MACD, signal_span)
+        """
+        self.ema_fast = EMA(fast_span)
+        self.ema_slow = EMA(slow_span)
+        self.ema_signal = EMA(signal_span)
+        self.macd = numpy.nan
+
+    def update(self, value):
+        self.macd = self.ema_fast.update(value) - self.ema_slow.update(value)
+        self.ema_signal.update(self.macd)
+        return self
+
+    @property
+    def signal(self):
+        return self.ema_signal.value
+
+    def values(self):
+        return {
+            'MACD': self.macd,
+            'emaSlw': self.ema_slow.value,
+            'emaFst': self.ema_fast.value,
+            'MACD_sign': self.signal
+        }
+
+
+def macd_series(values, fast_span, slow_span, signal_span):
+    """
+        vectorized MACD over a whole price array, for backtests
+    :return: {'MACD': <ndarray>, 'emaSlw': <ndarray>, 'emaFst': <ndarray>, 'MACD_sign': <ndarray>}
+    """
+    ema_fast = ema_series(values, fast_span)
+    ema_slow = ema_series(values, slow_span)
+    macd = ema_fast - ema_slow
+    return {
+        'MACD': macd,
+        'emaSlw': ema_slow,
+        'emaFst': ema_fast,
+        'MACD_sign': ema_series(macd, signal_span)
+    }
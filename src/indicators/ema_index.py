@@ -0,0 +1,144 @@
+from collections import deque
+import numpy
+
+from src.indicators.ema import ema_alpha
+
+
+class CoinWindow:
+    def __init__(self, coin):
+        """
+            one coin's rows inside the index window, oldest first
+
+            each entry carries the running sums of an adjust=True ewm started at the coin's first row ever:
+                ng[j] = decay * ng[j - 1] + x[j]     dg[j] = decay * dg[j - 1] + 1
+            so the ewm restarted at the window start s is (ng[j] - decay^(j-s+1) * ng[s-1]) / (same for dg),
+            and sliding the window only needs the sums of the last evicted row
+        :param coin: <str> coin name of the latest row, used for the blacklist
+        """
+        self.coin = coin
+        self.entries = deque()      # (day, stat, volume, market_cap, ng, dg)
+        self.evicted_ng = 0.0
+        self.evicted_dg = 0.0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def append(self, day, stat, volume, market_cap, decay):
+        if len(self.entries) > 0:
+            ng, dg = self.entries[-1][4:]
+        else:
+            ng, dg = self.evicted_ng, self.evicted_dg
+        # NaN rows still decay the weights, same as ewm(ignore_na=False)
+        if numpy.isnan(stat):
+            ng, dg = decay * ng, decay * dg
+        else:
+            ng, dg = decay * ng + stat, decay * dg + 1.0
+        self.entries.append((day, stat, volume, market_cap, ng, dg))
+
+    def evict(self, start_day):
+        while len(self.entries) > 0 and self.entries[0][0] < start_day:
+            self.evicted_ng, self.evicted_dg = self.entries.popleft()[4:]
+
+    def ema_diffs(self, n, decay):
+        """
+        :return: <list> (stat - ema) / ema of the last n rows, ema restarted at the window start
+        """
+        diffs = []
+        for pos in range(max(0, len(self.entries) - n), len(self.entries)):
+            stat, ng, dg = self.entries[pos][1], self.entries[pos][4], self.entries[pos][5]
+            weight = decay ** (pos + 1)
+            num = ng - weight * self.evicted_ng
+            den = dg - weight * self.evicted_dg
+            ema = num / den if den > 0 else numpy.nan
+            diffs.append((stat - ema) / ema)
+        return diffs
+
+    def ema(self, decay):
+        pos = len(self.entries) - 1
+        ng, dg = self.entries[pos][4:]
+        weight = decay ** (pos + 1)
+        den = dg - weight * self.evicted_dg
+        return (ng - weight * self.evicted_ng) / den if den > 0 else numpy.nan
+
+    def rolling_mean(self, column, n):
+        """
+        :param column: 2 volume, 3 market_cap
+        :return: mean of the last n rows, NaN with fewer rows, same as rolling(n).mean()
+        """
+        if len(self.entries) < n:
+            return numpy.nan
+        return numpy.mean([self.entries[pos][column] for pos in range(len(self.entries) - n, len(self.entries))])
+
+
+class EMAIndexWindows:
+    VOLUME = 2
+    MARKET_CAP = 3
+
+    def __init__(self, span, stat_key):
+        """
+            per coin EMA / rolling average state of the EMA index, advanced one day of cmc rows at a time
+        :param span: <int> ewm span, the strat's ema_window
+        :param stat_key: <str> cmc column the ewm runs over
+        """
+        self.span = span
+        self.stat_key = stat_key
+        self.decay = 1.0 - ema_alpha(span)
+        self.coins = {}
+        self.last_day = None
+
+    def reset(self):
+        self.coins = {}
+        self.last_day = None
+
+    def advance(self, day, rows):
+        """
+        :param day: <int> day number of <rows>, see date_index.day_number
+        :param rows: <DataFrame> cmc rows of that one day
+        """
+        for coin_id, coin, stat, volume, market_cap in zip(rows['id'].values, rows['coin'].values,
+                                                            rows[self.stat_key].values.astype(numpy.float64),
+                                                            rows['volume'].values.astype(numpy.float64),
+                                                            rows['market_cap'].values.astype(numpy.float64)):
+            if coin_id not in self.coins:
+                self.coins[coin_id] = CoinWindow(coin)
+            window = self.coins[coin_id]
+            window.coin = coin
+            window.append(day, stat, volume, market_cap, self.decay)
+        self.last_day = day
+
+    def evict(self, start_day):
+        """
+            drops the rows older than start_day, coins left without rows are forgotten
+        """
+        for coin_id in list(self.coins.keys()):
+            window = self.coins[coin_id]
+            window.evict(start_day)
+            if len(window) == 0:
+                del self.coins[coin_id]
+
+    def count(self, coin_id):
+        return len(self.coins[coin_id]) if coin_id in self.coins else 0
+
+    def ema(self, coin_id):
+        return self.coins[coin_id].ema(self.decay)
+
+    def last_ema_diff(self, coin_id):
+        return self.coins[coin_id].ema_diffs(1, self.decay)[0]
+
+    def rolling_mean(self, coin_id, column, n):
+        return self.coins[coin_id].rolling_mean(column, n)
+
+    def ema_diff_avgs(self, coin_ids, sma_window):
+        """
+            rolling(sma_window) mean of the ema diffs at each coin's latest row, with the rows of every coin
+            in <coin_ids> laid end to end in id order, the way the full window frame is sorted by id and date.
+            a coin with fewer rows than sma_window borrows the trailing diffs of the coins before it
+        :param coin_ids: ids of the coins in the index data
+        :return: {id: ema diff avg}
+        """
+        avgs = {}
+        carry = []
+        for coin_id in sorted(coin_ids):
+            carry = (carry + self.coins[coin_id].ema_diffs(sma_window, self.decay))[-sma_window:]
+            avgs[coin_id] = numpy.mean(carry) if len(carry) == sma_window else numpy.nan
+        return avgs
@@ -0,0 +1,73 @@
+from src.indicators.rolling_stats import RollingStats
+from src.indicators.rolling_extrema import RollingExtrema
+from src.indicators.ema import EMA, MACD
+from src.indicators.rsi import StochasticRSI
+
+INDICATOR_STATES = {
+    'rolling_stats': RollingStats,  # params: window                    -> .sma, .stddev
+    'ema': EMA,                     # params: span                      -> .value
+    'extrema': RollingExtrema,      # params: window                    -> .highest, .lowest
+    'stoch_rsi': StochasticRSI,     # params: rsi_window, sma_window    -> .rsi, .stoch_rsi, ...
+    'macd': MACD                    # params: fast, slow, signal        -> .macd, .signal, .values()
+}
+
+
+class IndicatorRegistry:
+    def __init__(self):
+        """
+            per market indicator state shared between strategies
+
+            strats declare what they read with require(kind, column, *params), every distinct key gets one state
+            per market, and update() steps all of a market's states once per new bar no matter how many strats
+            read them
+        """
+        self.requirements = {}  # key -> True
+        self.states = {}        # mkt_name -> {key: state}
+        self.seen_counts = {}   # mkt_name -> RingBuffer.count at the last update
+        self.seen_clears = {}   # mkt_name -> RingBuffer.clears at the last update
+
+    def require(self, kind, column, *params):
+        """
+        :param kind: one of INDICATOR_STATES
+        :param column: RingBuffer column the indicator is computed from
+        :param params: constructor params for the state (window, span, ...)
+        :return: the key to pass to get()
+        """
+        if kind not in INDICATOR_STATES:
+            raise KeyError('unknown indicator ' + kind)
+        key = (kind, column) + tuple(params)
+        self.requirements[key] = True
+        return key
+
+    @staticmethod
+    def create_state(key):
+        return INDICATOR_STATES[key[0]](*key[2:])
+
+    def update(self, mkt_name, mkt_data):
+        """
+            steps every required state for <mkt_name> through the bars added since the last update
+            calling it again for the same bar is a no-op
+        :param mkt_name: <str>
+        :param mkt_data: <RingBuffer>
+        :return: {key: state}
+        """
+        states = self.states.get(mkt_name)
+        if states is None or len(states) != len(self.requirements) or self.seen_clears[mkt_name] != mkt_data.clears:
+            # new market, new requirements or a cleared buffer, replay whatever the buffer holds
+            states = dict((key, self.create_state(key)) for key in self.requirements)
+            self.states[mkt_name] = states
+            num_new = len(mkt_data)
+        else:
+            num_new = min(mkt_data.count - self.seen_counts[mkt_name], len(mkt_data))
+        self.seen_counts[mkt_name] = mkt_data.count
+        self.seen_clears[mkt_name] = mkt_data.clears
+
+        if num_new > 0:
+            windows = dict((key[1], mkt_data.window(key[1], num_new)) for key in states)
+            for idx in range(num_new):
+                for key, state in states.items():
+                    state.update(windows[key[1]][idx])
+        return states
+
+    def get(self, mkt_name, key):
+        return self.states[mkt_name][key]
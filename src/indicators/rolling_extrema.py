@@ -0,0 +1,83 @@
+from collections import deque
+import numpy
+
+
+class RollingExtrema:
+    def __init__(self, window):
+        """
+            amortized O(1) rolling max / min over the last <window> values, using monotonic deques
+            matches series.rolling(window).max() / .min() - NaN until the window is filled
+        :param window: <int>
+        """
+        self.window = window
+        self.max_deque = deque()    # (idx, value), values decreasing
+        self.min_deque = deque()    # (idx, value), values increasing
+        self.idx = 0
+
+    def update(self, value):
+        while self.max_deque and self.max_deque[-1][1] <= value:
+            self.max_deque.pop()
+        self.max_deque.append((self.idx, value))
+        while self.min_deque and self.min_deque[-1][1] >= value:
+            self.min_deque.pop()
+        self.min_deque.append((self.idx, value))
+
+        # drop whatever slid out of the window
+        oldest_idx = self.idx - self.window
+        if self.max_deque[0][0] <= oldest_idx:
+            self.max_deque.popleft()
+        if self.min_deque[0][0] <= oldest_idx:
+            self.min_deque.popleft()
+        self.idx += 1
+        return self
+
+    def is_ready(self):
+        return self.idx >= self.window
+
+    @property
+    def highest(self):
+        if not self.is_ready():
+            return numpy.nan
+        return self.max_deque[0][1]
+
+    @property
+    def lowest(self):
+        if not self.is_ready():
+            return numpy.nan
+        return self.min_deque[0][1]
+
+    @property
+    def partial_highest(self):
+        # max of whatever has been seen while the window is filling
+        return self.max_deque[0][1] if self.max_deque else numpy.nan
+
+    @property
+    def partial_lowest(self):
+        return self.min_deque[0][1] if self.min_deque else numpy.nan
+
+
+def rolling_max(values, window):
+    """
+        vectorized rolling max over a whole array in O(len(values)), independent of <window> (van Herk / Gil-Werman)
+        NaN until the window is filled, same as series.rolling(window).max()
+    :param values: <numpy.ndarray>
+    :param window: <int>
+    :return: <numpy.ndarray>
+    """
+    values = numpy.asarray(values, dtype=numpy.float64)
+    num_values = len(values)
+    result = numpy.full(num_values, numpy.nan)
+    if num_values < window:
+        return result
+    pad = (-num_values) % window
+    blocks = numpy.concatenate([values, numpy.full(pad, -numpy.inf)]).reshape(-1, window)
+    # running max from the start of each block, and from the end of each block backwards
+    prefix = numpy.maximum.accumulate(blocks, axis=1).ravel()
+    suffix = numpy.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    starts = numpy.arange(num_values - window + 1)
+    result[window - 1:] = numpy.maximum(suffix[starts], prefix[starts + window - 1])
+    return result
+
+
+def rolling_min(values, window):
+    return -rolling_max(-numpy.asarray(values, dtype=numpy.float64), window)
@@ -0,0 +1,62 @@
+import math
+import numpy
+
+# recompute the sums from scratch every so often so float error can't pile up over long runs
+RESYNC_INTERVAL = 10000
+
+
+class RollingStats:
+    def __init__(self, window):
+        """
+            O(1) rolling mean / sample variance over the last <window> values (sliding window Welford)
+            matches series.rolling(window).mean() / .std() - NaN until the window is filled
+        :param window: <int>
+        """
+        self.window = window
+        self.values = numpy.zeros(window)
+        self.pos = 0
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.num_updates = 0
+
+    def update(self, value):
+        if self.n < self.window:
+            self.n += 1
+            delta = value - self.mean
+            self.mean += delta / self.n
+            self.m2 += delta * (value - self.mean)
+        else:
+            # swap the oldest value out for the new one
+            old_value = self.values[self.pos]
+            old_mean = self.mean
+            self.mean += (value - old_value) / self.window
+            self.m2 += (value - old_value) * (value - self.mean + old_value - old_mean)
+            if self.m2 < 0:
+                self.m2 = 0.0
+        self.values[self.pos] = value
+        self.pos = (self.pos + 1) % self.window
+        self.num_updates += 1
+        if self.num_updates % RESYNC_INTERVAL == 0 and self.is_ready():
+            self.mean = self.values.mean()
+            self.m2 = ((self.values - self.mean) ** 2).sum()
+        return self
+
+    def is_ready(self):
+        return self.n == self.window
+
+    @property
+    def sma(self):
+        if not self.is_ready():
+            return numpy.nan
+        return self.mean
+
+    @property
+    def variance(self):
+        if not self.is_ready() or self.window < 2:
+            return numpy.nan
+        return self.m2 / (self.window - 1)
+
+    @property
+    def stddev(self):
+        return math.sqrt(self.variance)
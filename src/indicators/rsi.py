@@ -0,0 +1,149 @@
+import numpy
+
+from src.indicators.ema import ema_series
+from src.indicators.rolling_stats import RollingStats
+from src.indicators.rolling_extrema import RollingExtrema, rolling_max, rolling_min
+
+
+def calc_rsi(avg_gain, avg_loss):
+    if avg_loss == 0:
+        return 100.0 if avg_gain > 0 else 50.0
+    return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+def calc_stochastic(value, lowest, highest):
+    den = highest - lowest
+    if den == 0:
+        return 0.0
+    return (value - lowest) / den
+
+
+class StochasticRSI:
+    def __init__(self, rsi_window, sma_window):
+        """
+            O(1) wilder RSI + stochastic RSI state for one market
+                GAIN / LOSS     = positive / negative change vs the previous value
+                AVG_GAIN / LOSS = mean of the first <rsi_window> changes, then wilder smoothed
+                STOCH_RSI       = (RSI - min RSI) / (max RSI - min RSI) over the last <rsi_window> RSI's
+                STOCH_RSI_SMA   = mean of the last <sma_window> STOCH_RSI's
+        """
+        self.rsi_window = rsi_window
+        self.sma_window = sma_window
+        self.prev_value = None
+        self.num_changes = 0
+        self.gain_sum = 0.0
+        self.loss_sum = 0.0
+        self.gain = numpy.nan
+        self.loss = numpy.nan
+        self.avg_gain = numpy.nan
+        self.avg_loss = numpy.nan
+        self.rsi = numpy.nan
+        self.max_rsi = numpy.nan
+        self.min_rsi = numpy.nan
+        self.stoch_rsi = numpy.nan
+        self.rsi_extrema = RollingExtrema(rsi_window)
+        self.stoch_rsi_stats = RollingStats(sma_window)
+
+    def update(self, value):
+        if self.prev_value is None:
+            self.prev_value = value
+            return self
+        change = value - self.prev_value
+        self.prev_value = value
+        self.gain = max(change, 0.0)
+        self.loss = max(-change, 0.0)
+        self.num_changes += 1
+
+        if self.num_changes < self.rsi_window:
+            self.gain_sum += self.gain
+            self.loss_sum += self.loss
+            return self
+        elif self.num_changes == self.rsi_window:
+            self.avg_gain = (self.gain_sum + self.gain) / self.rsi_window
+            self.avg_loss = (self.loss_sum + self.loss) / self.rsi_window
+        else:
+            self.avg_gain = (self.avg_gain * (self.rsi_window - 1) + self.gain) / self.rsi_window
+            self.avg_loss = (self.avg_loss * (self.rsi_window - 1) + self.loss) / self.rsi_window
+
+        self.rsi = calc_rsi(self.avg_gain, self.avg_loss)
+        self.rsi_extrema.update(self.rsi)
+        self.max_rsi = self.rsi_extrema.partial_highest
+        self.min_rsi = self.rsi_extrema.partial_lowest
+        self.stoch_rsi = calc_stochastic(self.rsi, self.min_rsi, self.max_rsi)
+        self.stoch_rsi_stats.update(self.stoch_rsi)
+        return self
+
+    @property
+    def stoch_rsi_sma(self):
+        return self.stoch_rsi_stats.sma
+
+    def values(self):
+        return {
+            'GAIN': self.gain,
+            'LOSS': self.loss,
+            'AVG_GAIN': self.avg_gain,
+            'AVG_LOSS': self.avg_loss,
+            'RSI': self.rsi,
+            'MAX_RSI': self.max_rsi,
+            'MIN_RSI': self.min_rsi,
+            'STOCH_RSI': self.stoch_rsi,
+            'STOCH_RSI_SMA': self.stoch_rsi_sma
+        }
+
+
+def rolling_mean(values, window):
+    # NaN until <window> values are available, same as series.rolling(window).mean()
+    result = numpy.full(len(values), numpy.nan)
+    if len(values) >= window:
+        sums = numpy.cumsum(numpy.insert(values, 0, 0.0))
+        result[window - 1:] = (sums[window:] - sums[:-window]) / window
+    return result
+
+
+def stochastic_rsi_series(values, rsi_window, sma_window):
+    """
+        vectorized wilder RSI + stochastic RSI over a whole price array, for backtests
+        produces the same values StochasticRSI gives when stepped through <values>
+    :param values: <numpy.ndarray>
+    :return: {'GAIN': <ndarray>, 'LOSS': ..., 'AVG_GAIN', 'AVG_LOSS', 'RSI', 'MAX_RSI', 'MIN_RSI', 'STOCH_RSI',
+              'STOCH_RSI_SMA'}
+    """
+    values = numpy.asarray(values, dtype=numpy.float64)
+    num_values = len(values)
+    result = dict((col, numpy.full(num_values, numpy.nan)) for col in
+                  ['GAIN', 'LOSS', 'AVG_GAIN', 'AVG_LOSS', 'RSI', 'MAX_RSI', 'MIN_RSI', 'STOCH_RSI', 'STOCH_RSI_SMA'])
+    if num_values < 2:
+        return result
+
+    change = numpy.diff(values)
+    result['GAIN'][1:] = numpy.maximum(change, 0.0)
+    result['LOSS'][1:] = numpy.maximum(-change, 0.0)
+    if num_values <= rsi_window:
+        return result
+
+    # seed with the mean of the first rsi_window changes, wilder smoothing is an EMA with alpha = 1 / rsi_window
+    wilder_span = 2 * rsi_window - 1
+    for col, avg_col in [('GAIN', 'AVG_GAIN'), ('LOSS', 'AVG_LOSS')]:
+        seed = result[col][1:rsi_window + 1].mean()
+        result[avg_col][rsi_window] = seed
+        result[avg_col][rsi_window + 1:] = ema_series(result[col][rsi_window + 1:], wilder_span, seed=seed)
+
+    avg_gain = result['AVG_GAIN'][rsi_window:]
+    avg_loss = result['AVG_LOSS'][rsi_window:]
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+    rsi = numpy.where(avg_loss == 0, numpy.where(avg_gain > 0, 100.0, 50.0), rsi)
+    result['RSI'][rsi_window:] = rsi
+
+    # rolling max / min over the last rsi_window RSI's, using what's available while the window fills
+    padded = numpy.concatenate([numpy.full(rsi_window - 1, rsi[0]), rsi])
+    max_rsi = rolling_max(padded, rsi_window)[rsi_window - 1:]
+    min_rsi = rolling_min(padded, rsi_window)[rsi_window - 1:]
+    den = max_rsi - min_rsi
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        stoch_rsi = numpy.where(den == 0, 0.0, (rsi - min_rsi) / den)
+    result['MAX_RSI'][rsi_window:] = max_rsi
+    result['MIN_RSI'][rsi_window:] = min_rsi
+    result['STOCH_RSI'][rsi_window:] = stoch_rsi
+    result['STOCH_RSI_SMA'][rsi_window:] = rolling_mean(stoch_rsi, sma_window)
+    return result
@@ -1,4 +1,5 @@
 from src.bot.crypto_bot import CryptoBot
+from src.bot.index_backtester import IndexRun
 from src.strats.bollinger_bands_strat import BollingerBandsStrat
 from src.strats.stochastic_rsi_strat import StochasticRSIStrat
 from src.strats.williams_pct_strat import WilliamsPctStrat
@@ -19,6 +20,8 @@ from src.exceptions import NoDataError
 BACKTESTING_START_DATE = datetime.datetime(2017, 1, 1)
 BACKTESTING_END_DATE = datetime.datetime(2017, 8, 31)
 BACKTESTING = os.getenv('BACKTESTING', 'FALSE')
+# TRUE runs every crypto index and EMA weighting below as one batch over a single load of the cmc data
+INDEX_BATCH = os.getenv('INDEX_BATCH', 'FALSE') == 'TRUE'
 
 
 index_base_options = {
@@ -147,6 +150,19 @@ index_run_opts = {'rebalance_frequency': 1}
 
 # bot.load_stock_csv_into_db(['dji', 'sp500'])
 
+if INDEX_BATCH:
+    index_runs = []
+    for crypto_index in crypto_indexes:
+        for i in range(1, 5):
+            if i > 1 and crypto_index['name'] == 'Bitcoin':
+                continue
+            index_runs.append(IndexRun(IndexStrat2(crypto_index), rebalance_frequency=i, index_id=crypto_index['name'] + '_' + str(i)))
+    for i in range(80, 100):
+        ema_options = merge_2_dicts(EMA, {'weights': {'stat_weight': round(i / 100, 2), 'ema_diff_avg_weight': round(1 - (i / 100), 2)}})
+        index_runs.append(IndexRun(EMAIndexStrat(ema_options)))
+    bot = CryptoBot({'v1_strats': [], 'index_strats': []})
+    bot.run_index_batch(index_runs)
+
 rep = PortfolioReporter([])
 # rep.compare_indexes(index_id_list=['CC20 (Chrisyviro Crypto Index)', 'Coinbase Index', 'Bitcoin', 'DJI', 'MC_EMA_DIFF_0.95/0.05'])
 # index_list = ['Bitcoin_1', 'DJI']
@@ -1,8 +1,20 @@
 import os
+import numpy
 from src.utils.logger import Logger
+from src.indicators.indicator_registry import IndicatorRegistry
 
 log = Logger(__name__)
 
+
+def shift(values):
+    # values[t - 1] at t, NaN at the first bar - the vectorized form of mkt_data.window(col, 2)[0]
+    return numpy.concatenate([[numpy.nan], values[:-1]])
+
+
+def bar_counts(num_bars):
+    # len(mkt_data) at every bar
+    return numpy.arange(1, num_bars + 1)
+
 class BaseStrategy:
     def __init__(self, options):
         self.name = options['name']
@@ -15,6 +27,8 @@ class BaseStrategy:
         self.sell_positions = {}
         self.ema_suffix = '_EMA'
         self.pct_weight_suffix = '_PCT_WEIGHT'
+        self.indicator_columns = []
+        self.indicators = IndicatorRegistry()
 
     def init_market_positions(self, pairs):
         self.buy_positions = {pair: False for pair, p in pairs.items()}
@@ -23,6 +37,35 @@ class BaseStrategy:
     def handle_data(self, mkt_data, pair):
         raise Exception('HANDLE_DATA function should be overwritten')
 
+    def calc_positions_series(self, bars):
+        """
+            batch mode for backtests, the positions handle_data would set at every bar of a market's history
+        :param bars: {column: <numpy.ndarray>} full bar history of one market
+        :return: (buy, sell) <numpy.ndarray> of bools, one per bar
+        """
+        raise Exception('CALC_POSITIONS_SERIES function should be overwritten')
+
+    def init_indicator_columns(self, mkt_data):
+        """
+            makes sure the market's RingBuffer holds a column for every indicator this strat writes
+        :param mkt_data: <RingBuffer>
+        """
+        mkt_data.add_columns(self.indicator_columns)
+
+    def register_indicators(self):
+        """
+            declares the indicators this strat reads from self.indicators, overwritten by strats that use them
+        """
+        pass
+
+    def use_indicator_registry(self, registry):
+        """
+            swaps the strat's private IndicatorRegistry for one shared with other strats
+        :param registry: <IndicatorRegistry>
+        """
+        self.indicators = registry
+        self.register_indicators()
+
     def should_buy(self, pair):
         return self.buy_positions[pair['pair']]
 
@@ -42,8 +85,8 @@ class BaseStrategy:
         return mkt_report
 
     def _set_positions(self, buy, sell, pair):
-        self.buy_positions[pair['pair']] = buy
-        self.sell_positions[pair['pair']] = sell
+        self.buy_positions[pair] = buy
+        self.sell_positions[pair] = sell
         if buy:
             log.info(' * * * BUY :: ' + pair)
         elif sell:
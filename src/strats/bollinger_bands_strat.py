@@ -1,5 +1,6 @@
 import pandas as pd
-from src.strats.base_strat import BaseStrategy
+import numpy
+from src.strats.base_strat import BaseStrategy, shift, bar_counts
 from src.utils.logger import Logger
 from datetime import datetime
 log = Logger(__name__)
@@ -10,39 +11,72 @@ class BollingerBandsStrat(BaseStrategy):
         BaseStrategy.__init__(self, options)
         self.num_standard_devs = options['num_standard_devs']
         self.sma_window = options['sma_window']
+        self.indicator_columns = ['SMA', 'STDDEV', 'UPPER_BB', 'LOWER_BB']
+        self.rolling_stats_key = None
+        self.register_indicators()
+
+    def register_indicators(self):
+        self.rolling_stats_key = self.indicators.require('rolling_stats', self.stat_key, self.sma_window)
 
     def handle_data(self, mkt_data, mkt_name):
+        self.init_indicator_columns(mkt_data)
+        self.calc_bollinger_bands(mkt_data, mkt_name)
         if len(mkt_data) >= self.sma_window:
-            mkt_data = self.calc_bollinger_bands(mkt_data)
-            tail = mkt_data.tail(2)
+            last = mkt_data.window('last', 2)
+            upper_bb = mkt_data.window('UPPER_BB', 2)
+            sma = mkt_data.window('SMA', 2)
 
             # # SPIKE CHASER
-            buy = tail['last'].values[1] >= tail['UPPER_BB'].values[1] and tail['last'].values[0] < tail['UPPER_BB'].values[0]
-            sell = tail['last'].values[1] < tail['SMA'].values[1] and tail['last'].values[0] >= tail['SMA'].values[0]
+            buy = last[1] >= upper_bb[1] and last[0] < upper_bb[0]
+            sell = last[1] < sma[1] and last[0] >= sma[0]
 
             # # STANDARD
-            # buy = tail['last'].values[1] < tail['LOWER_BB'].values[1]
-            # sell = tail['last'].values[1] > tail['UPPER_BB'].values[1]
+            # buy = last[1] < lower_bb[1]
+            # sell = last[1] > upper_bb[1]
 
             self._set_positions(buy, sell, mkt_name)
 
         return mkt_data
 
-    def calc_bollinger_bands(self, df):
-        # cutoff tail, sized by window
-
-        tail = df.tail(self.sma_window).reset_index(drop=True)
-        # drop last row, will be replaced after calculation
-        df = df.drop(df.index[-1:])
+    def calc_bollinger_bands(self, mkt_data, mkt_name):
+        # step the market's rolling stats forward with the new bars, written onto the latest row
+        self.indicators.update(mkt_name, mkt_data)
+        stats = self.indicators.get(mkt_name, self.rolling_stats_key)
+        if stats.is_ready():
+            sma = stats.sma
+            stddev = stats.stddev
+            mkt_data.set_latest('SMA', sma)
+            mkt_data.set_latest('STDDEV', stddev)
+            mkt_data.set_latest('UPPER_BB', sma + self.num_standard_devs * stddev)
+            mkt_data.set_latest('LOWER_BB', sma - self.num_standard_devs * stddev)
+        return mkt_data
 
-        # calculate stats
-        tail['SMA'] = tail[self.stat_key].rolling(window=self.sma_window, center=False).mean()
-        tail['STDDEV'] = tail[self.stat_key].rolling(window=self.sma_window, center=False).std()
-        tail['UPPER_BB'] = tail['SMA'] + self.num_standard_devs * tail['STDDEV']
-        tail['LOWER_BB'] = tail['SMA'] - self.num_standard_devs * tail['STDDEV']
+    def calc_bollinger_bands_series(self, values):
+        """
+            batch mode for backtests, computes the bollinger band columns for a whole price array in one pass
+        :param values: <numpy.ndarray> full history of self.stat_key
+        :return: <DataFrame> columns = self.indicator_columns
+        """
+        rolling = pd.Series(numpy.asarray(values, dtype=numpy.float64)).rolling(self.sma_window)
+        sma = rolling.mean().values
+        stddev = rolling.std().values
+        return pd.DataFrame({
+            'SMA': sma,
+            'STDDEV': stddev,
+            'UPPER_BB': sma + self.num_standard_devs * stddev,
+            'LOWER_BB': sma - self.num_standard_devs * stddev
+        })
 
-        # append and return
-        return df.append(tail.tail(1), ignore_index=True)
+    def calc_positions_series(self, bars):
+        last = bars['last']
+        bands = self.calc_bollinger_bands_series(bars[self.stat_key])
+        upper_bb = bands['UPPER_BB'].values
+        sma = bands['SMA'].values
+        ready = bar_counts(len(last)) >= self.sma_window
+        with numpy.errstate(invalid='ignore'):
+            buy = ready & (last >= upper_bb) & (shift(last) < shift(upper_bb))
+            sell = ready & (last < sma) & (shift(last) >= shift(sma))
+        return buy, sell
 
     def get_mkt_report(self, mkt_name, mkt_data):
         # get standard report data
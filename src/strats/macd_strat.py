@@ -1,5 +1,7 @@
 import pandas as pd
-from src.strats.base_strat import BaseStrategy
+import numpy
+from src.strats.base_strat import BaseStrategy, shift, bar_counts
+from src.indicators.ema import macd_series
 from src.utils.logger import Logger
 from datetime import datetime
 log = Logger(__name__)
@@ -12,42 +14,52 @@ class MACDStrat(BaseStrategy):
         self.sma_window = options['sma_window']
         self.slow_ema_window = options['slow_ema_window']
         self.fast_ema_window = options['fast_ema_window']
+        self.indicator_columns = ['MACD', 'emaSlw', 'emaFst', 'MACD_sign']
+        self.macd_key = None
+        self.register_indicators()
+
+    def register_indicators(self):
+        self.macd_key = self.indicators.require('macd', self.stat_key, self.fast_ema_window, self.slow_ema_window,
+                                                self.sma_window)
 
     def handle_data(self, mkt_data, mkt_name):
+        self.init_indicator_columns(mkt_data)
+        self.calc_macd(mkt_data, mkt_name)
         if len(mkt_data) >= self.slow_ema_window:
-            mkt_data = self.calc_macd(mkt_data)
-            tail = mkt_data.tail(2)
+            macd = mkt_data.window('MACD', 2)
+            macd_sign = mkt_data.window('MACD_sign', 2)
 
-            buy = tail['MACD'].values[1] >= tail['MACD_sign'].values[1] and tail['MACD'].values[0] < tail['MACD_sign'].values[0]
-            sell = tail['MACD'].values[1] < tail['MACD_sign'].values[1] and tail['MACD'].values[0] >= tail['MACD_sign'].values[0]
+            buy = macd[1] >= macd_sign[1] and macd[0] < macd_sign[0]
+            sell = macd[1] < macd_sign[1] and macd[0] >= macd_sign[0]
 
             self._set_positions(buy, sell, mkt_name)
 
         return mkt_data
 
-    def calc_macd(self, df):
-        # cutoff tail, sized by window
-
-        tail = df.tail(self.slow_ema_window).reset_index(drop=True)
-        # drop last row, will be replaced after calculation
-        df = df.drop(df.index[-1:])
-
-        # calculate stats
-        tail[['MACD', 'emaSlw', 'emaFst']] = self.moving_average_convergence(tail['last'])
-        tail['MACD_sign'] = self.moving_average(tail['MACD'])
-
-        # append and return
-        return df.append(tail.tail(1), ignore_index=True)
-
-    def moving_average(self, group):
-        sma = pd.rolling_mean(group, self.sma_window)
-        return sma
+    def calc_macd(self, mkt_data, mkt_name):
+        # step the market's MACD state forward with the new bars, written onto the latest row
+        self.indicators.update(mkt_name, mkt_data)
+        for column, value in self.indicators.get(mkt_name, self.macd_key).values().items():
+            mkt_data.set_latest(column, value)
+        return mkt_data
 
-    def moving_average_convergence(self, data):
-        emaslow = pd.ewma(data, span=self.slow_ema_window, min_periods=1)
-        emafast = pd.ewma(data, span=self.fast_ema_window, min_periods=1)
-        result = pd.DataFrame({'MACD': emafast - emaslow, 'emaSlw': emaslow, 'emaFst': emafast})
-        return result
+    def calc_macd_series(self, values):
+        """
+            batch mode for backtests, computes the MACD columns for a whole price array in one pass
+        :param values: <numpy.ndarray> full history of self.stat_key
+        :return: <DataFrame> columns = ['MACD', 'emaSlw', 'emaFst', 'MACD_sign']
+        """
+        return pd.DataFrame(macd_series(values, self.fast_ema_window, self.slow_ema_window, self.sma_window))
+
+    def calc_positions_series(self, bars):
+        result = self.calc_macd_series(bars[self.stat_key])
+        macd = result['MACD'].values
+        macd_sign = result['MACD_sign'].values
+        ready = bar_counts(len(macd)) >= self.slow_ema_window
+        with numpy.errstate(invalid='ignore'):
+            buy = ready & (macd >= macd_sign) & (shift(macd) < shift(macd_sign))
+            sell = ready & (macd < macd_sign) & (shift(macd) >= shift(macd_sign))
+        return buy, sell
 
     def get_mkt_report(self, mkt_name, mkt_data):
         # get standard report data
@@ -4,6 +4,9 @@ from src.exceptions import StratError
 from src.utils.logger import Logger
 from datetime import datetime
 from src.utils.utils import scale_features
+from src.indicators.ema_index import EMAIndexWindows
+from src.data_structures.date_index import day_number
+from src.data_structures.coin_panel import CoinPanel
 import numpy
 log = Logger(__name__)
 
@@ -32,6 +35,8 @@ class EMAIndexStrat(BaseStrategy):
         self.score_key = 'index_score'
         self.vol_avg_key = 'volume_avg'
         self.mkt_cap_avg_key = 'mkt_cap_avg'
+        self.ema_windows = EMAIndexWindows(self.ema_window, self.stat_key)
+        self.panel = None
 
         # configure name for ML stat backtesting
         self.name = options['name'] + '_' + str(self.stat_weight) + '/' + str(self.ema_diff_avg_weight)
@@ -47,12 +52,23 @@ class EMAIndexStrat(BaseStrategy):
         if index_date is None:
             index_date = full_mkt_data['date'].max()
         self.index_data = full_mkt_data
+        self.load_panel(full_mkt_data)
         # check how many values exist per coin
         if full_mkt_data.groupby('id').agg('count').loc['Bitcoin', 'coin'] >= self.ema_window:
             self.calc_index(index_date, index_coins=index_coins)
             self.calc_deltas(holdings_data)
         return self.index_data
 
+    def load_panel(self, full_mkt_data):
+        """
+            one (coin x date) panel per history frame for every per coin calculation in calc_index,
+            rebuilt only when a different frame is passed in
+        :param full_mkt_data: <DataFrame> full market prices from cmc
+        """
+        if self.panel is None or self.panel.data is not full_mkt_data:
+            self.panel = CoinPanel(full_mkt_data)
+        return self.panel
+
     def calc_index(self, index_date, index_coins=None):
         """
         :param full_mkt_data: <DataFrame> full market prices from cmc
@@ -63,25 +79,15 @@ class EMAIndexStrat(BaseStrategy):
         # remove bottom percentile
         if index_coins is None:
             # remove low volume coins
-            self.index_data = self.index_data.groupby('id').apply(self.apply_avg_monthly_volume)
-            self.index_data = self.index_data.groupby('id').apply(self.apply_avg_monthly_mkt_cap)
+            self.apply_avg_monthly_volume()
+            self.apply_avg_monthly_mkt_cap()
             index_on_date = self.index_data[self.index_data['date'] == index_date]
-
-            vol_avg_coins_to_drop = index_on_date[index_on_date[self.vol_avg_key] < 1000]['id']
-            mkt_cap_avg_coins_to_drop = index_on_date[index_on_date[self.mkt_cap_avg_key] < 10000000]['id']
-            coins_to_drop = mkt_cap_avg_coins_to_drop + vol_avg_coins_to_drop
-
-            self.index_data = self.index_data.drop(self.index_data[self.index_data['id'].isin(coins_to_drop.values)].index)
-
-            num_in_top_percentile = round(len(self.index_data[self.index_data['date'] == index_date]) * (1 - self.stat_top_percentile))
-            # sort by stat key on index date, then take top percentile coins, keep those coins in self.index_data
-            top_percentile_coins = self.index_data[self.index_data['date'] == index_date].sort_values(by=[self.stat_key], ascending=False)[
-                'id'].unique()[:num_in_top_percentile]
+            top_percentile_coins = self.top_percentile_coins(index_on_date)
             self.index_data = self.index_data[self.index_data['id'].isin(top_percentile_coins)]
             # remove blacklist, sort, apply ema calcs
             self.index_data = self.index_data.drop(self.index_data[self.index_data['coin'].isin(self.blacklist)].index)
 
-        self.index_data.sort_values(by=['id', 'date'], inplace=True)
+        self.index_data = self.index_data.sort_values(by=['id', 'date'])
         self.apply_ema()
         self.apply_ema_diff()
         # at this point only the latest data for each coin is relevant for the index score
@@ -97,6 +103,24 @@ class EMAIndexStrat(BaseStrategy):
         # ema_index_data[self.pct_weight_key] = ema_index_data[self.ema_stat_key] / total
         #
         # index_data['in_index'] = True
+        self.apply_index_weights(index_coins)
+
+    def top_percentile_coins(self, index_on_date):
+        """
+        :param index_on_date: <DataFrame> every coin's row on the index date, with the monthly averages
+        :return: ids of the coins in the top percentile by stat key
+        """
+        vol_avg_coins_to_drop = index_on_date[index_on_date[self.vol_avg_key] < 1000]['id']
+        mkt_cap_avg_coins_to_drop = index_on_date[index_on_date[self.mkt_cap_avg_key] < 10000000]['id']
+        coins_to_drop = mkt_cap_avg_coins_to_drop + vol_avg_coins_to_drop
+
+        index_on_date = index_on_date.drop(index_on_date[index_on_date['id'].isin(coins_to_drop.values)].index)
+
+        num_in_top_percentile = round(len(index_on_date) * (1 - self.stat_top_percentile))
+        # sort by stat key on index date, then take top percentile coins
+        return index_on_date.sort_values(by=[self.stat_key], ascending=False)['id'].unique()[:num_in_top_percentile]
+
+    def apply_index_weights(self, index_coins=None):
         if index_coins is not None:
             self.index_data = self.index_data[self.index_data['id'].isin(index_coins)]
         else:
@@ -107,6 +131,75 @@ class EMAIndexStrat(BaseStrategy):
         self.index_data.rename(columns={'close': 'rate_usd'}, inplace=True)
         self.index_data = self.index_data[['id', 'index_pct', 'coin', 'rate_usd']]
 
+    def handle_day_index(self, date_index, holdings_data, index_coins=None, index_date=None, window_days=None):
+        """
+            handle_data_index over the window [index_date - window_days, index_date] without recalculating it:
+            self.ema_windows keeps every coin's ewm / rolling average state and takes in only the days
+            since the last call, the scores and rankings come out the same as handle_data_index
+        :param date_index: <DateIndex> full market prices from cmc
+        :param holdings_data: <DataFrame> aggregate account balances
+        :param index_coins: <List> current coins in index
+                            * index_coins=None to reset the index (calculate new index makeup)
+        :param index_date: last day of the window, defaults to the latest day in date_index
+        :param window_days: <int> days before index_date in the window, defaults to ema_window
+        :return:
+        """
+        if index_date is None:
+            index_date = date_index.data['date'].max()
+        if window_days is None:
+            window_days = self.ema_window
+        day = day_number(index_date)
+        start_day = day - window_days
+        self.advance_ema_windows(date_index, start_day, day)
+        if self.ema_windows.count('Bitcoin') >= self.ema_window:
+            self.index_data = date_index.on_date(index_date)
+            self.calc_day_index(index_coins=index_coins)
+            self.calc_deltas(holdings_data)
+        else:
+            self.index_data = date_index.slice(numpy.datetime64(start_day, 'D').astype(object), index_date)
+        return self.index_data
+
+    def advance_ema_windows(self, date_index, start_day, day):
+        # carry on from the last day seen when the new window overlaps it, otherwise rebuild the window
+        if self.ema_windows.last_day is None or not start_day <= self.ema_windows.last_day < day:
+            self.ema_windows.reset()
+            first_day = start_day
+        else:
+            first_day = self.ema_windows.last_day + 1
+        for row_day, rows in date_index.day_slices(numpy.datetime64(first_day, 'D').astype(object),
+                                                   numpy.datetime64(day, 'D').astype(object)):
+            self.ema_windows.advance(row_day, rows)
+        self.ema_windows.evict(start_day)
+        self.ema_windows.last_day = day
+
+    def calc_day_index(self, index_coins=None):
+        """
+            calc_index with the per coin columns taken from self.ema_windows, self.index_data holds the
+            rows of the index date only
+        :param index_coins: <List> current coins in index
+                            * index_coins=None to reset the index (calculate new index makeup)
+        """
+        windows = self.ema_windows
+        self.index_data = self.index_data.sort_values(by=['id'])
+        if index_coins is None:
+            ids = self.index_data['id'].values
+            self.index_data[self.vol_avg_key] = [windows.rolling_mean(i, windows.VOLUME, 30) for i in ids]
+            self.index_data[self.mkt_cap_avg_key] = [windows.rolling_mean(i, windows.MARKET_CAP, 30) for i in ids]
+            top_percentile_coins = self.top_percentile_coins(self.index_data)
+            window_ids = [i for i in top_percentile_coins if windows.coins[i].coin not in self.blacklist]
+            self.index_data = self.index_data[self.index_data['id'].isin(top_percentile_coins)]
+            self.index_data = self.index_data.drop(self.index_data[self.index_data['coin'].isin(self.blacklist)].index)
+        else:
+            window_ids = list(windows.coins.keys())
+
+        ids = self.index_data['id'].values
+        ema_diff_avgs = windows.ema_diff_avgs(window_ids, self.sma_window)
+        self.index_data[self.ema_stat_key] = [windows.ema(i) for i in ids]
+        self.index_data[self.ema_diff_stat_key] = [windows.last_ema_diff(i) for i in ids]
+        self.index_data[self.ema_diff_avg_stat_key] = [ema_diff_avgs[i] for i in ids]
+        self.apply_index_score()
+        self.apply_index_weights(index_coins)
+
     def calc_deltas(self, holdings_data):
         """
         :param index_data: <Dataframe> columns = ['id', 'index_pct']
@@ -115,7 +208,7 @@ class EMAIndexStrat(BaseStrategy):
         """
         self.index_data = pd.merge(self.index_data, holdings_data, on='id', how='outer')
         self.index_data = self.index_data.rename(columns={'coin_x': 'coin'}).drop(columns=['coin_y'])
-        self.index_data['balance'] = self.index_data['balance'].replace(numpy.NaN, 0)
+        self.index_data['balance'] = self.index_data['balance'].replace(numpy.nan, 0)
         self.index_data['balance_usd'] = self.index_data['balance'] * self.index_data['rate_usd']
         total_usd = self.index_data.head(self.index_depth)['balance_usd'].sum()
         self.index_data['balance_pct'] = self.index_data['balance_usd'] / total_usd
@@ -127,34 +220,22 @@ class EMAIndexStrat(BaseStrategy):
         # self.index_data['should_trade'] = self.index_data['delta_pct'] >= self.trade_threshold_pct
         # self.index_data = self.index_data[self.index_data['should_trade']]
 
-    def apply_avg_monthly_volume(self, df):
-        df[self.vol_avg_key] = df.sort_values(by=['date'], ascending=True)['volume'].rolling(30).mean()
-        return df
+    def apply_avg_monthly_volume(self):
+        self.index_data[self.vol_avg_key] = self.panel.rolling_mean('volume', 30)
 
-    def apply_avg_monthly_mkt_cap(self, df):
-        df[self.mkt_cap_avg_key] = df.sort_values(by=['date'], ascending=True)['market_cap'].rolling(30).mean()
-        return df
+    def apply_avg_monthly_mkt_cap(self):
+        self.index_data[self.mkt_cap_avg_key] = self.panel.rolling_mean('market_cap', 30)
 
     def apply_ema(self):
         log.info('APPLY EMA')
-        ema_series = self.index_data.groupby(['id']).apply(self.ema_calc)
-        ema_series = ema_series.reset_index().rename(columns={self.stat_key: self.ema_stat_key}).drop(columns=['id']).set_index('level_1')
-        self.index_data= self.index_data.merge(ema_series, left_index=True, right_index=True)
+        self.index_data[self.ema_stat_key] = self.panel.ewm_mean(self.stat_key, self.ema_window)
 
     def apply_ema_diff(self):
         log.info('APPLY EMA DIFF')
-        ema_diff_series = self.index_data.groupby(['id']).apply(self.ema_diff_calc)
-        ema_diff_series = ema_diff_series.reset_index().rename(columns={0: self.ema_diff_stat_key}).drop(
-            columns=['id']).set_index('level_1')
-        self.index_data = self.index_data.merge(ema_diff_series, left_index=True, right_index=True)
+        self.index_data[self.ema_diff_stat_key] = (self.index_data[self.stat_key] - self.index_data[self.ema_stat_key]) / self.index_data[self.ema_stat_key]
+        # over the whole frame sorted by id and date, not per coin
         self.index_data[self.ema_diff_avg_stat_key] = self.index_data[self.ema_diff_stat_key].rolling(self.sma_window).mean()
 
-    def ema_calc(self, x):
-        return x[self.stat_key].ewm(span=self.ema_window).mean()
-
-    def ema_diff_calc(self, x):
-        return (x[self.stat_key] - x[self.ema_stat_key]) / x[self.ema_stat_key]
-
     def apply_index_score(self):
         log.info('APPLY INDEX SCORE')
         # remove na's
@@ -68,7 +68,7 @@ class IndexStrat2(BaseStrategy):
         """
         dataset = pd.merge(index_data, holdings_data, on='id', how='outer')
         dataset = dataset.rename(columns={'coin_x': 'coin'}).drop(columns=['coin_y'])
-        dataset['balance'] = dataset['balance'].replace(numpy.NaN, 0)
+        dataset['balance'] = dataset['balance'].replace(numpy.nan, 0)
         dataset['balance_usd'] = dataset['balance'] * dataset['rate_usd']
         total_usd = dataset.head(self.index_depth)['balance_usd'].sum()
         dataset['balance_pct'] = dataset['balance_usd'] / total_usd
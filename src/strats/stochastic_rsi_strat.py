@@ -1,8 +1,9 @@
 import pandas as pd
-from src.strats.base_strat import BaseStrategy
+import numpy
+from src.strats.base_strat import BaseStrategy, shift, bar_counts
+from src.indicators.rsi import stochastic_rsi_series
 from src.utils.logger import Logger
 from datetime import datetime
-import math
 
 log = Logger(__name__)
 
@@ -13,92 +14,54 @@ class StochasticRSIStrat(BaseStrategy):
         self.sma_window = options['sma_window']
         self.rsi_window = options['rsi_window']
         self.stat_key = options['stat_key']
-        self.columns_initialized = False
+        self.indicator_columns = ['GAIN', 'LOSS', 'AVG_GAIN', 'AVG_LOSS', 'RSI', 'MAX_RSI', 'MIN_RSI', 'STOCH_RSI',
+                                  'STOCH_RSI_SMA']
+        self.stoch_rsi_key = None
+        self.register_indicators()
+
+    def register_indicators(self):
+        self.stoch_rsi_key = self.indicators.require('stoch_rsi', self.stat_key, self.rsi_window, self.sma_window)
 
     def handle_data(self, mkt_data, mkt_name):
-        if len(mkt_data) >= self.rsi_window:
-            mkt_data = self.calc_stochastic_rsi(mkt_data)
-            tail = mkt_data.tail(2)
-            if len(mkt_data.index) >= self.rsi_window + 1:
-                buy = (tail['STOCH_RSI'].values[1] >= tail['STOCH_RSI_SMA'].values[1]) and (
-                    tail['STOCH_RSI'].values[0] < tail['STOCH_RSI_SMA'].values[0]) and (
-                    tail['STOCH_RSI'].values[0] < .2)
+        self.init_indicator_columns(mkt_data)
+        self.calc_stochastic_rsi(mkt_data, mkt_name)
+        if len(mkt_data) >= self.rsi_window + 1:
+            stoch_rsi = mkt_data.window('STOCH_RSI', 2)
+            stoch_rsi_sma = mkt_data.window('STOCH_RSI_SMA', 2)
+            buy = (stoch_rsi[1] >= stoch_rsi_sma[1]) and (
+                stoch_rsi[0] < stoch_rsi_sma[0]) and (
+                stoch_rsi[0] < .2)
 
-                sell = (tail['STOCH_RSI'].values[1] <= tail['STOCH_RSI_SMA'].values[1]) and (
-                    tail['STOCH_RSI'].values[0] > tail['STOCH_RSI_SMA'].values[0]) and (
-                    tail['STOCH_RSI'].values[0] > .8)
+            sell = (stoch_rsi[1] <= stoch_rsi_sma[1]) and (
+                stoch_rsi[0] > stoch_rsi_sma[0]) and (
+                stoch_rsi[0] > .8)
 
-                self._set_positions(buy, sell, mkt_name)
+            self._set_positions(buy, sell, mkt_name)
         return mkt_data
 
-    def calc_stochastic_rsi(self, df):
-        if len(df.index) == self.rsi_window:
-            df = self.init_columns(df)
-
-        # optimize calculations by getting tail
-        tail = df.tail(self.rsi_window).reset_index(drop=True)
-        df = df.drop(df.index[-self.rsi_window:])
-        tail_len = len(tail.index)
-
-        # calculate change
-        change = tail.loc[(tail_len - 1), self.stat_key] - tail.loc[(tail_len - 2), self.stat_key]
-        if change >= 0:
-            tail.set_value(tail_len - 1, 'GAIN', abs(change))
-            tail.set_value(tail_len - 1, 'LOSS', 0.0)
-        else:
-            tail.set_value(tail_len - 1, 'LOSS', abs(change))
-            tail.set_value(tail_len - 1, 'GAIN', 0.0)
-
-        # don't start calculating rsi and stochastic rsi until the window is filled
-        if len(tail.index) == self.rsi_window:
-            if df.empty:
-                total_gains = tail['GAIN'].rolling(window=self.rsi_window, center=False).sum()
-                total_losses = tail['LOSS'].rolling(window=self.rsi_window, center=False).sum()
-                avg_gain = (total_gains / self.rsi_window)[self.rsi_window - 1]
-                avg_loss = (total_losses / self.rsi_window)[self.rsi_window - 1]
-                tail.set_value(self.rsi_window - 1, 'AVG_GAIN', avg_gain)
-                tail.set_value(self.rsi_window - 1, 'AVG_LOSS', avg_loss)
-                if avg_loss != 0:
-                    rs = avg_gain / avg_loss
-                else:
-                    rs = 0.0
-            else:
-                prev_avg_gain = tail.loc[self.rsi_window - 2, 'AVG_GAIN']
-                prev_avg_loss = tail.loc[self.rsi_window - 2, 'AVG_LOSS']
-                avg_gain = ((prev_avg_gain * (self.rsi_window - 1)) + tail.loc[self.rsi_window - 1, 'GAIN']) / self.rsi_window
-                avg_loss = ((prev_avg_loss * (self.rsi_window - 1)) + tail.loc[self.rsi_window - 1, 'LOSS']) / self.rsi_window
-                tail.set_value(self.rsi_window - 1, 'AVG_GAIN', avg_gain)
-                tail.set_value(self.rsi_window - 1, 'AVG_LOSS', avg_loss)
-                if avg_loss != 0 and not math.isnan(avg_gain) and not math.isnan(avg_loss):
-                    rs = avg_gain / avg_loss
-                else:
-                    rs = 0.0
-            rsi = 100 - (100 / (1 + rs))
-            tail.set_value(self.rsi_window - 1, 'RSI', rsi)
+    def calc_stochastic_rsi(self, mkt_data, mkt_name):
+        # step the market's RSI state forward with the new bars, written onto the latest row
+        self.indicators.update(mkt_name, mkt_data)
+        for col, value in self.indicators.get(mkt_name, self.stoch_rsi_key).values().items():
+            mkt_data.set_latest(col, value)
+        return mkt_data
 
-            max_rsi = max(tail['RSI'])
-            min_rsi = min(tail['RSI'])
-            stoch_num = rsi - min_rsi
-            stoch_den = max_rsi - min_rsi
-            if stoch_den != 0:
-                stochastic_rsi = stoch_num / stoch_den
-            else:
-                stochastic_rsi = 0.0
-            tail.set_value(self.rsi_window - 1, 'STOCH_RSI', stochastic_rsi)
-            stochastic_rsi_sma = tail['STOCH_RSI'].rolling(window=self.sma_window, center=False).mean()
-            tail.set_value(self.rsi_window - 1, 'STOCH_RSI_SMA', stochastic_rsi_sma[self.rsi_window - 1])
-        return df.append(tail, ignore_index=True)
+    def calc_stochastic_rsi_series(self, values):
+        """
+            batch mode for backtests, computes the stochastic RSI columns for a whole price array in one pass
+        :param values: <numpy.ndarray> full history of self.stat_key
+        :return: <DataFrame> columns = self.indicator_columns
+        """
+        return pd.DataFrame(stochastic_rsi_series(values, self.rsi_window, self.sma_window))
 
-    def init_columns(self, df):
-        if not self.columns_initialized:
-            df['GAIN'] = 0.0
-            df['LOSS'] = 0.0
-            df['AVG_GAIN'] = 0.0
-            df['AVG_LOSS'] = 0.0
-            df['RSI'] = 0.0
-            df['MAX_RSI'] = 0.0
-            df['MIN_RSI'] = 0.0
-            df['STOCH_RSI'] = 0.0
-            df['STOCH_RSI_SMA'] = 0.0
-            self.columns_initialized = True
-        return df
+    def calc_positions_series(self, bars):
+        result = self.calc_stochastic_rsi_series(bars[self.stat_key])
+        stoch_rsi = result['STOCH_RSI'].values
+        stoch_rsi_sma = result['STOCH_RSI_SMA'].values
+        prev_stoch_rsi = shift(stoch_rsi)
+        prev_stoch_rsi_sma = shift(stoch_rsi_sma)
+        ready = bar_counts(len(stoch_rsi)) >= self.rsi_window + 1
+        with numpy.errstate(invalid='ignore'):
+            buy = ready & (stoch_rsi >= stoch_rsi_sma) & (prev_stoch_rsi < prev_stoch_rsi_sma) & (prev_stoch_rsi < .2)
+            sell = ready & (stoch_rsi <= stoch_rsi_sma) & (prev_stoch_rsi > prev_stoch_rsi_sma) & (prev_stoch_rsi > .8)
+        return buy, sell
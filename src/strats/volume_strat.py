@@ -1,4 +1,5 @@
 import pandas as pd
+import numpy
 from src.strats.base_strat import BaseStrategy
 from src.utils.logger import Logger
 
@@ -13,80 +14,80 @@ class VolumeStrat(BaseStrategy):
         self.long_vol_ema_window = options['long_vol_ema_window']
         self.vol_roc_window = options['vol_roc_window']
         self.is_active = False
+        self.indicator_columns = ['SHORT_VOL_EMA', 'LONG_VOL_EMA', 'PVO', 'PVO_EMA']
 
     def handle_data(self, mkt_data, mkt_name):
+        self.init_indicator_columns(mkt_data)
         if len(mkt_data) > self.long_vol_ema_window:
-            mkt_data = self.calc_volume_metrics(mkt_data)
+            self.calc_volume_metrics(mkt_data)
             if len(mkt_data) > self.long_vol_ema_window + self.pvo_ema_window:
-                tail = mkt_data.tail(2).reset_index(drop=True)
+                pvo = mkt_data.window('PVO', 2)
+                pvo_ema = mkt_data.window('PVO_EMA', 2)
 
-                pvo_up = tail.loc[1, 'PVO'] > tail.loc[1, 'PVO_EMA']
-                pvo_down_1 = tail.loc[0, 'PVO'] < tail.loc[0, 'PVO_EMA']
+                pvo_up = pvo[1] > pvo_ema[1]
+                pvo_down_1 = pvo[0] < pvo_ema[0]
 
                 buy = pvo_up and pvo_down_1
                 sell = not pvo_up and not pvo_down_1
 
                 self._set_positions(buy, sell, mkt_name)
         else:
-            mkt_data['SHORT_VOL_EMA'] = mkt_data[self.stat_key].rolling(window=self.short_vol_ema_window,
-                                                                        center=False).mean()
-            mkt_data['LONG_VOL_EMA'] = mkt_data[self.stat_key].rolling(window=self.long_vol_ema_window,
-                                                                        center=False).mean()
+            mkt_data.set_latest('SHORT_VOL_EMA', self.calc_sma(mkt_data, self.short_vol_ema_window, self.stat_key))
+            mkt_data.set_latest('LONG_VOL_EMA', self.calc_sma(mkt_data, self.long_vol_ema_window, self.stat_key))
         return mkt_data
 
-    def calc_volume_metrics(self, df):
+    def calc_volume_metrics(self, mkt_data):
         # calculate stats
-        df = self.calc_volume_osc(df)
-        # df = self.calc_volume_roc(df)
+        mkt_data = self.calc_volume_osc(mkt_data)
+        # mkt_data = self.calc_volume_roc(mkt_data)
 
-        return df
+        return mkt_data
 
-    def calc_volume_roc(self, df):
+    def calc_volume_roc(self, mkt_data):
         # VOL_ROC = ( ( current_vol / vol_n_windows_back ) - 1 ) / 100
-        return df
+        return mkt_data
 
-    def calc_volume_osc(self, df):
+    def calc_volume_osc(self, mkt_data):
         # PVO = ( ( short_vol_ema - long_vol_ema ) / long_vol_ema ) * 100
 
-        # cutoff tail, sized by window
-        tail = df.tail(2).reset_index(drop=True)
-
-        # drop last row, will be replaced after calculation
-        df = df.drop(df.index[-1:])
-
         # calculate short EMA
-        tail = self.set_ema(tail, 'SHORT_VOL_EMA', self.short_vol_ema_window, self.stat_key)
+        self.set_ema(mkt_data, 'SHORT_VOL_EMA', self.short_vol_ema_window, self.stat_key)
 
         # calculate long EMA
-        tail = self.set_ema(tail, 'LONG_VOL_EMA', self.long_vol_ema_window, self.stat_key)
+        self.set_ema(mkt_data, 'LONG_VOL_EMA', self.long_vol_ema_window, self.stat_key)
 
         # calculate PVO
-        pvo = ((tail.loc[1, 'SHORT_VOL_EMA'] - tail.loc[1, 'LONG_VOL_EMA']) / tail.loc[1, 'LONG_VOL_EMA']) * 100
-        tail.set_value(1, 'PVO', pvo)
+        short_vol_ema = mkt_data.latest('SHORT_VOL_EMA')
+        long_vol_ema = mkt_data.latest('LONG_VOL_EMA')
+        mkt_data.set_latest('PVO', ((short_vol_ema - long_vol_ema) / long_vol_ema) * 100)
 
         # if we have calculated enough PVO's, start calculating the PVO_EMA
         # else calculate PVO_SMA
-        if len(df) >= self.long_vol_ema_window + self.pvo_ema_window:
+        if len(mkt_data) - 1 >= self.long_vol_ema_window + self.pvo_ema_window:
             self.is_active = True
             # calculate PVO EMA
-            tail = self.set_ema(tail, 'PVO_EMA', self.pvo_ema_window, 'PVO')
-            return df.append(tail.tail(1), ignore_index=True)
+            self.set_ema(mkt_data, 'PVO_EMA', self.pvo_ema_window, 'PVO')
         else:
-            df = df.append(tail.tail(1), ignore_index=True)
-            df['PVO_EMA'] = df['PVO'].rolling(window=self.pvo_ema_window, center=False).mean()
-            return df
+            mkt_data.set_latest('PVO_EMA', self.calc_sma(mkt_data, self.pvo_ema_window, 'PVO'))
+        return mkt_data
 
-    def set_ema(self, df, ema_key, ema_window, stat_key):
-        prev_ema = df.loc[0, ema_key]
-        next_ema = self.calc_ema(df, ema_window, prev_ema, stat_key)
-        df.set_value(1, ema_key, next_ema)
-        return df
+    def set_ema(self, mkt_data, ema_key, ema_window, stat_key):
+        prev_ema = mkt_data.window(ema_key, 2)[0]
+        next_ema = self.calc_ema(mkt_data.latest(stat_key), ema_window, prev_ema)
+        mkt_data.set_latest(ema_key, next_ema)
+        return mkt_data
 
     @staticmethod
-    def calc_ema(df, window, prev_ema, stat_key):
+    def calc_ema(value, window, prev_ema):
         # EMA = (last - prev_ema) * multiplier + prev_ema
         multiplier = 2.0 / (window + 1)
-        return (df.loc[1, stat_key] - prev_ema) * multiplier + prev_ema
+        return (value - prev_ema) * multiplier + prev_ema
+
+    @staticmethod
+    def calc_sma(mkt_data, window, stat_key):
+        if len(mkt_data) < window:
+            return numpy.nan
+        return mkt_data.window(stat_key, window).mean()
 
     def get_mkt_report(self, mkt_name, mkt_data):
         # get standard report data
@@ -1,5 +1,7 @@
 import pandas as pd
-from src.strats.base_strat import BaseStrategy
+import numpy
+from src.strats.base_strat import BaseStrategy, bar_counts
+from src.indicators.rolling_extrema import rolling_max, rolling_min
 from src.utils.logger import Logger
 log = Logger(__name__)
 
@@ -9,28 +11,52 @@ class WilliamsPctStrat(BaseStrategy):
         BaseStrategy.__init__(self, options)
         self.wp_window = options['wp_window']
         self.stat_key = options['stat_key']
+        self.indicator_columns = ['W_PCT']
+        self.extrema_key = None
+        self.register_indicators()
+
+    def register_indicators(self):
+        self.extrema_key = self.indicators.require('extrema', self.stat_key, self.wp_window)
 
     def handle_data(self, mkt_data, mkt_name):
+        self.init_indicator_columns(mkt_data)
+        self.calculate_williams_pct(mkt_data, mkt_name)
         if len(mkt_data) >= self.wp_window:
-            mkt_data = self.calculate_williams_pct(mkt_data)
-            tail = mkt_data.tail(1)
+            w_pct = mkt_data.latest('W_PCT')
 
-            buy = tail['W_PCT'].values[0] >= -20
-            sell = tail['W_PCT'].values[0] <= -80
+            buy = w_pct >= -20
+            sell = w_pct <= -80
 
             self._set_positions(buy, sell, mkt_name)
         return mkt_data
 
-    def calculate_williams_pct(self, data):
-        # get tail, drop last row of data
-        window = data.tail(self.wp_window).reset_index(drop=True)
-        data = data.drop(data.index[-1:])
-
-        # calculate williams %
-        highest = window[self.stat_key].max(axis=0)
-        lowest = window[self.stat_key].min(axis=0)
-        last = window[self.stat_key].iloc[-1]
-        w_pct = (highest - last) / (highest - lowest) * -100
-        window.set_value(self.wp_window - 1, 'W_PCT', w_pct)
+    def calculate_williams_pct(self, mkt_data, mkt_name):
+        # step the market's rolling highest / lowest forward with the new bars, written onto the latest row
+        self.indicators.update(mkt_name, mkt_data)
+        extrema = self.indicators.get(mkt_name, self.extrema_key)
+        if extrema.is_ready():
+            mkt_data.set_latest('W_PCT', self.calc_w_pct(extrema.highest, extrema.lowest, mkt_data.latest(self.stat_key)))
+        return mkt_data
 
-        return data.append(window.tail(1), ignore_index=True)
+    def calculate_williams_pct_series(self, values):
+        """
+            batch mode for backtests, computes W_PCT for a whole price array in one pass
+        :param values: <numpy.ndarray> full history of self.stat_key
+        :return: <DataFrame> columns = ['W_PCT']
+        """
+        values = numpy.asarray(values, dtype=numpy.float64)
+        return pd.DataFrame({'W_PCT': self.calc_w_pct(rolling_max(values, self.wp_window),
+                                                      rolling_min(values, self.wp_window), values)})
+
+    def calc_positions_series(self, bars):
+        w_pct = self.calculate_williams_pct_series(bars[self.stat_key])['W_PCT'].values
+        ready = bar_counts(len(w_pct)) >= self.wp_window
+        with numpy.errstate(invalid='ignore'):
+            buy = ready & (w_pct >= -20)
+            sell = ready & (w_pct <= -80)
+        return buy, sell
+
+    @staticmethod
+    def calc_w_pct(highest, lowest, last):
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            return (highest - last) / (highest - lowest) * -100
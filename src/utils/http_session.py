@@ -0,0 +1,23 @@
+import os
+import requests
+from requests.adapters import HTTPAdapter
+
+# keep-alive connections kept per host, enough for the threads sharing one exchange client
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', 10))
+
+
+def new_session(headers=None, pool_size=HTTP_POOL_SIZE):
+    """
+        a requests.Session whose connection pool holds <pool_size> keep-alive connections per host,
+        so concurrent requests through one exchange client reuse their TCP / TLS connections
+    :param headers: <dict> default headers of every request
+    :param pool_size: <int>
+    :return: <requests.Session>
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    if headers is not None:
+        session.headers.update(headers)
+    return session
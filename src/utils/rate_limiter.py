@@ -1,28 +1,107 @@
-from datetime import datetime, timedelta
-from time import sleep
+import asyncio
+import threading
+import time
 from src.utils.logger import Logger
+from src.exceptions import RateLimitError
 
 log = Logger(__name__)
 
 
-class RateLimiter:
-    def __init__(self, name, rate_limit=timedelta(0, 4, 0)):
+# what a window counts, a request's weight or one per request whatever its weight
+WEIGHT = 'weight'
+REQUESTS = 'requests'
+
+
+class TokenBucket:
+    def __init__(self, capacity, period, clock=time.monotonic, counts=WEIGHT):
+        """
+            <capacity> tokens refilled evenly over <period> seconds, a full bucket is the allowed burst
+        :param capacity: <int> request weight (or requests) allowed per window
+        :param period: <float> window length in seconds
+        :param counts: WEIGHT or REQUESTS
+        """
+        self.counts = counts
+        self.capacity = float(capacity)
+        self.rate = capacity / float(period)
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated = clock()
+
+    def refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, weight):
+        """
+        :return: <float> seconds until <weight> tokens are available, 0 when they already are
+        """
+        return max(0.0, (weight - self.tokens) / self.rate)
+
+    def cost(self, weight):
+        return weight if self.counts == WEIGHT else 1
+
+
+class TokenBucketLimiter:
+    def __init__(self, name, windows, weights=None, default_weight=1, clock=time.monotonic):
+        """
+            token bucket rate limiter, a request goes through once every window has room for its weight
+            safe to share between threads
+        :param name: <str> exchange name, for logs
+        :param windows: <List> (request weight allowed, window seconds[, WEIGHT or REQUESTS])
+                        e.g. [(20, 1, REQUESTS), (1200, 60)], windows count weight by default
+        :param weights: {endpoint: request weight}, endpoints not listed weigh <default_weight>
+        :param default_weight: <int>
+        """
         self.name = name
-        self.rate_limit = rate_limit
-        self.tick = None
-        self.reset()
-
-    def reset(self):
-        self.tick = datetime.now()
-
-    def check(self):
-        current_tick = datetime.now()
-        return (current_tick - self.tick) < self.rate_limit
-
-    def limit(self):
-        current_tick = datetime.now()
-        if self.check():
-            sleep_for = self.rate_limit - (current_tick - self.tick)
-            log.warning('Rate Limit ' + self.name + ' :: sleeping for ' + str(sleep_for) + ' seconds')
-            sleep(sleep_for.seconds)
-        self.reset()
+        self.buckets = [TokenBucket(*window[:2], clock=clock, counts=window[2] if len(window) > 2 else WEIGHT)
+                        for window in windows]
+        self.weights = weights if weights is not None else {}
+        self.default_weight = default_weight
+        self.lock = threading.Lock()
+
+    def weight(self, endpoint=None):
+        return self.weights.get(endpoint, self.default_weight)
+
+    def _acquire(self, weight):
+        """
+        :return: <float> 0 when the tokens were taken, otherwise the seconds to wait before trying again
+        """
+        with self.lock:
+            for bucket in self.buckets:
+                if bucket.cost(weight) > bucket.capacity:
+                    raise RateLimitError(self.name, weight)
+                bucket.refill()
+            wait = max(bucket.wait_time(bucket.cost(weight)) for bucket in self.buckets)
+            if wait == 0:
+                for bucket in self.buckets:
+                    bucket.tokens -= bucket.cost(weight)
+            return wait
+
+    def try_acquire(self, endpoint=None, weight=None):
+        """
+            non blocking
+        :return: <bool> True when the request may go ahead now
+        """
+        return self._acquire(self.weight(endpoint) if weight is None else weight) == 0
+
+    def limit(self, endpoint=None, weight=None):
+        """
+            blocks until the request may go ahead
+        """
+        weight = self.weight(endpoint) if weight is None else weight
+        wait = self._acquire(weight)
+        while wait > 0:
+            log.debug('Rate Limit ' + self.name + ' :: waiting ' + str(round(wait, 3)) + ' seconds')
+            time.sleep(wait)
+            wait = self._acquire(weight)
+
+    async def acquire(self, endpoint=None, weight=None):
+        """
+            waits on the event loop until the request may go ahead
+        """
+        weight = self.weight(endpoint) if weight is None else weight
+        wait = self._acquire(weight)
+        while wait > 0:
+            await asyncio.sleep(wait)
+            wait = self._acquire(weight)
@@ -0,0 +1,142 @@
+from src.exchange.gemini.gemini_async import AsyncGeminiAPI
+from src.exchange.gateio.gateio_async import AsyncGateIOAPI
+from src.exchange.cryptopia.cryptopia_async import AsyncCryptopiaAPI
+from src.utils.rate_limiter import TokenBucketLimiter
+from src.exceptions import APIRequestError
+from tests.mocks.exchange_stub_server import ExchangeStubServer, GEMINI_SYMBOLS
+import asyncio
+import time
+
+PAIR = {'pair': 'ethbtc', 'base_coin': 'btc', 'mkt_coin': 'eth'}
+
+
+def unlimited(exchange):
+    # the stub server has no limits, keeps the published ones from slowing the tests down
+    return TokenBucketLimiter(exchange, [(1000, 1)])
+
+
+def run_with_server(scenario, delay=0.0):
+    """
+        runs scenario(server) against a fresh stub server on its own event loop
+    """
+    async def main():
+        server = ExchangeStubServer(delay)
+        await server.start()
+        try:
+            return await scenario(server)
+        finally:
+            await server.stop()
+    return asyncio.run(main())
+
+
+class TestAsyncGemini:
+    def test_tickers_in_flight_together(self):
+        async def scenario(server):
+            async with AsyncGeminiAPI(server.url + '/gemini', limiter=unlimited('gemini')) as gemini:
+                start = time.time()
+                tickers = await gemini.get_current_tickers()
+                return tickers, time.time() - start, server.max_in_flight
+        tickers, elapsed, max_in_flight = run_with_server(scenario, delay=0.1)
+        assert([t['pair'] for t in tickers] == GEMINI_SYMBOLS)
+        assert(tickers[2]['vol_base'] == 1000.0 and tickers[2]['mkt_coin'] == 'eth')
+        assert(max_in_flight == len(GEMINI_SYMBOLS))
+        # one round for the symbols and one for all of the tickers
+        assert(elapsed < 0.1 * len(GEMINI_SYMBOLS))
+
+    def test_normalized_routes(self):
+        async def scenario(server):
+            async with AsyncGeminiAPI(server.url + '/gemini', limiter=unlimited('gemini')) as gemini:
+                return (await gemini.get_current_pair_ticker(PAIR), await gemini.get_order_book(PAIR, 'asks'),
+                        await gemini.get_exchange_balances(), await gemini.buy_limit(0.5, 0.07, PAIR))
+        ticker, asks, balances, order = run_with_server(scenario)
+        assert(ticker['last'] == 10.0 and ticker['exchange'] == 'gemini')
+        assert(asks == [{'price': 10.5, 'amount': 3.0}, {'price': 11.0, 'amount': 1.0}])
+        assert(balances[0] == {'exchange': 'gemini', 'coin': 'BTC', 'balance': 1.5, 'address': None})
+        assert(order['side'] == 'buy' and order['price'] == 0.07 and order['remaining_amount'] == 0.5)
+
+    def test_error(self):
+        async def scenario(server):
+            async with AsyncGeminiAPI(server.url + '/gemini') as gemini:
+                try:
+                    await gemini.get_current_pair_ticker({'pair': 'xxxyyy', 'base_coin': 'yyy', 'mkt_coin': 'xxx'})
+                except APIRequestError as e:
+                    return e
+        error = run_with_server(scenario)
+        assert(error.fn == 'get_current_pair_ticker')
+        assert('InvalidSymbol' in error.error_msg)
+
+    def test_limiter(self):
+        async def scenario(server):
+            limiter = TokenBucketLimiter('gemini', [(4, 0.2)])
+            async with AsyncGeminiAPI(server.url + '/gemini', limiter=limiter) as gemini:
+                start = time.time()
+                await gemini.gather([gemini.get_current_pair_ticker(PAIR) for i in range(8)])
+                return time.time() - start
+        # the second four wait for the bucket to refill
+        assert(run_with_server(scenario) >= 0.15)
+
+    def test_default_limiter(self):
+        gemini = AsyncGeminiAPI()
+        assert(gemini.limiter.name == 'gemini')
+        assert([bucket.capacity for bucket in gemini.limiter.buckets] == [5, 120])
+        assert(AsyncGateIOAPI().limiter.name == 'gateio')
+        assert(AsyncCryptopiaAPI().limiter.name == 'cryptopia')
+
+    def test_private_requests_in_nonce_order(self):
+        async def scenario(server):
+            async with AsyncGeminiAPI(server.url + '/gemini', limiter=unlimited('gemini')) as gemini:
+                await gemini.gather([gemini.get_exchange_balances() for i in range(5)])
+                return server.nonces, server.max_in_flight
+        nonces, max_in_flight = run_with_server(scenario, delay=0.02)
+        assert(max_in_flight == 1)
+        assert(len(nonces) == 5 and nonces == sorted(set(nonces)))
+
+
+class TestAsyncGateIO:
+    def test_normalized_routes(self):
+        async def scenario(server):
+            gateio = AsyncGateIOAPI(server.url + '/gateio', server.url + '/gateio', limiter=unlimited('gateio'))
+            try:
+                return await gateio.gather([gateio.get_current_tickers(), gateio.get_order_book({'pair': 'eth_btc'}),
+                                            gateio.get_exchange_balances(),
+                                            gateio.buy_limit(2, 0.05, {'pair': 'eth_btc', 'base_coin': 'btc',
+                                                                       'mkt_coin': 'eth'})])
+            finally:
+                await gateio.close()
+        tickers, book, balances, order = run_with_server(scenario)
+        assert(tickers[0] == {'last': 0.05, 'exchange': 'gatio', 'pair': 'eth_btc', 'base_coin': 'btc', 'mkt_coin': 'eth'})
+        assert(book['bids'][0] == {'price': 0.049, 'amount': 6.0})
+        assert(sorted(b['coin'] for b in balances) == ['BTC', 'ETH'])
+        assert(order['order_id'] == '123456' and order['remaining_amount'] == 2.0 and order['is_live'])
+
+
+class TestAsyncCryptopia:
+    def test_normalized_routes(self):
+        pair = {'pair': 'ETH/BTC', 'base_coin': 'BTC', 'mkt_coin': 'ETH'}
+
+        async def scenario(server):
+            async with AsyncCryptopiaAPI(server.url + '/cryptopia', limiter=unlimited('cryptopia')) as cryptopia:
+                return await cryptopia.gather([cryptopia.get_current_tickers(), cryptopia.get_current_pair_ticker(pair),
+                                               cryptopia.get_order_book(pair, 'bids'), cryptopia.get_exchange_balances(),
+                                               cryptopia.buy_limit(2.0, 0.05, pair), cryptopia.cancel_order(23467, pair),
+                                               cryptopia.get_order_status(23467, pair)])
+        tickers, ticker, bids, balances, order, cancelled, status = run_with_server(scenario)
+        # DOT/BTC has no trade pair and is left out
+        assert([t['pair'] for t in tickers] == ['ETH/BTC', 'LTC/BTC'])
+        assert(ticker['last'] == 0.05 and ticker['mkt_coin'] == 'ETH')
+        assert(bids == [{'price': 0.049, 'amount': 6.0}])
+        assert(balances[1] == {'coin': 'ETH', 'balance': 12.0, 'address': '0x0'})
+        assert(order['order_id'] == 23467 and order['side'] == 'buy' and order['remaining_amount'] == 2.0)
+        assert(cancelled['is_cancelled'])
+        assert(status['is_live'] and status['executed_amount'] == 0.5)
+
+    def test_error(self):
+        async def scenario(server):
+            async with AsyncCryptopiaAPI(server.url + '/cryptopia', limiter=unlimited('cryptopia')) as cryptopia:
+                try:
+                    await cryptopia.get_current_pair_ticker({'pair': 'XXX/BTC', 'base_coin': 'BTC', 'mkt_coin': 'XXX'})
+                except APIRequestError as e:
+                    return e
+        error = run_with_server(scenario)
+        assert(error.fn == 'get_current_pair_ticker')
+        assert('Market not found' in error.error_msg)
@@ -97,4 +97,29 @@ class TestBacktestExchange:
         ticker = self.be.getticker(market)
         assert(ticker['Bid'] == btc_ltc_summary['bid'])
         assert(ticker['Ask'] == btc_ltc_summary['ask'])
-        assert(ticker['Last'] == btc_ltc_summary['last'])
\ No newline at end of file
+        assert(ticker['Last'] == btc_ltc_summary['last'])
+
+class TestBacktestExchangeReplay:
+    def setup_class(self):
+        self.be = BacktestExchange(BACKTESTING_START_DATE, BACKTESTING_END_DATE)
+        self.be.init_tradeable_markets(['BTC-LTC', 'BTC-ETH'])
+        self.be.getmarkets(['BTC', 'ETH'])
+        self.replay = BacktestExchange(BACKTESTING_START_DATE, BACKTESTING_END_DATE)
+        self.replay.init_tradeable_markets(['BTC-LTC', 'BTC-ETH'])
+        self.replay.getmarkets(['BTC', 'ETH'])
+        self.replay.preload_market_summaries()
+
+    def teardown_class(self):
+        self.be = None
+        self.replay = None
+
+    def test_replay_matches_db(self):
+        for tick in range(5):
+            db_summaries = dict((s['marketname'], s) for s in self.be.getmarketsummaries())
+            replay_summaries = dict((s['marketname'], s) for s in self.replay.getmarketsummaries())
+            assert(sorted(db_summaries) == sorted(replay_summaries))
+            for market, summary in db_summaries.items():
+                assert(summary['last'] == replay_summaries[market]['last'])
+                assert(summary['saved_timestamp'] == replay_summaries[market]['saved_timestamp'])
+            assert(self.be.getticker('BTC-LTC') == self.replay.getticker('BTC-LTC'))
+            assert(self.be.getorderbook('BTC-LTC', 'both') == self.replay.getorderbook('BTC-LTC', 'both'))
@@ -0,0 +1,71 @@
+from src.data_structures.bar_aggregator import BarAggregator, BarBuilder, parse_bar_size
+import pytest
+import numpy
+
+
+def make_ticker(last, timestamp, vol=1.0):
+    return {'pair': 'BTC-LTC', 'open': last, 'high': last, 'low': last, 'close': last, 'bid': last - .1,
+            'ask': last + .1, 'last': last, 'vol_base': vol, 'vol_mkt': vol * 10, 'timestamp': timestamp}
+
+
+class TestBarAggregator:
+    def test_parse_bar_size(self):
+        assert(parse_bar_size('5t') == ('t', 5))
+        assert(parse_bar_size('1m') == ('ms', 60000))
+        assert(parse_bar_size('2h') == ('ms', 7200000))
+        with pytest.raises(ValueError):
+            parse_bar_size('5x')
+
+    def test_tick_bars(self):
+        builder = BarBuilder('3t')
+        assert(builder.update(make_ticker(2.0, 0)) is None)
+        assert(builder.update(make_ticker(3.0, 1)) is None)
+        bar = builder.update(make_ticker(1.0, 2))
+        assert(bar['open'] == 2.0)
+        assert(bar['high'] == 3.0)
+        assert(bar['low'] == 1.0)
+        assert(bar['close'] == 1.0)
+        assert(bar['bid'] == 0.9)
+        assert(bar['vol_base'] == 3.0)
+        assert(bar['vol_mkt'] == 30.0)
+        assert(bar['timestamp'] == 2)
+        assert(builder.bar is None)
+
+    def test_time_bars(self):
+        builder = BarBuilder('1m')
+        assert(builder.update(make_ticker(2.0, 0)) is None)
+        assert(builder.update(make_ticker(4.0, 59999)) is None)
+        bar = builder.update(make_ticker(3.0, 60000))
+        assert(bar['open'] == 2.0)
+        assert(bar['close'] == 4.0)
+        assert(bar['timestamp'] == 59999)
+        assert(builder.bar['open'] == 3.0)
+
+    def test_second_timestamps(self):
+        aggregator = BarAggregator.for_exchange(['1m'], 'gdax')
+        assert(aggregator.timestamp_unit == 's')
+        assert(aggregator.update('BTC-LTC', make_ticker(2.0, '1520000100')) == {})
+        assert(aggregator.update('BTC-LTC', make_ticker(4.0, '1520000159')) == {})
+        bar = aggregator.update('BTC-LTC', make_ticker(3.0, '1520000160'))['1m']
+        assert(bar['open'] == 2.0 and bar['close'] == 4.0)
+        with pytest.raises(ValueError):
+            BarBuilder('1m', 'us')
+
+    def test_last_price_only(self):
+        # binance's normalized tickers have no bid, ask, volumes or timestamp
+        builder = BarBuilder('2t')
+        builder.update({'pair': 'ETHBTC', 'last': 0.05})
+        bar = builder.update({'pair': 'ETHBTC', 'last': 0.06})
+        assert(bar['open'] == 0.05 and bar['close'] == 0.06 and bar['high'] == 0.06)
+        assert(bar['vol_base'] == 0.0 and numpy.isnan(bar['bid']))
+        assert(bar['timestamp'] is not None)
+
+    def test_multiple_bar_sizes(self):
+        aggregator = BarAggregator(['2t', '1m'])
+        finished = [aggregator.update('BTC-LTC', make_ticker(float(i), i * 20000)) for i in range(4)]
+        assert(list(finished[0].keys()) == [])
+        assert(list(finished[1].keys()) == ['2t'])
+        assert(sorted(finished[3].keys()) == ['1m', '2t'])
+        assert(finished[3]['1m']['open'] == 0.0)
+        assert(finished[3]['1m']['close'] == 2.0)
+        assert(aggregator.flush('BTC-LTC', '1m')['open'] == 3.0)
@@ -1,6 +1,6 @@
 from src.strats.bollinger_bands_strat import BollingerBandsStrat
+from src.data_structures.ring_buffer import RingBuffer
 import pandas as pd
-from pandas.util.testing import assert_series_equal
 from fixtures.processed_summary_tickers_fixture import PROCESSED_SUMMARY_TICKERS_FIXTURE
 import os
 import datetime
@@ -14,7 +14,8 @@ bb_options = {
     'num_standard_devs': 2,
     'sma_window': 5,
     'stat_key': 'last',
-    'window': 5
+    'window': 5,
+    'ema_window': 5
 }
 
 
@@ -26,12 +27,13 @@ class TestBBStrat:
         self.strat = None
 
     def test_calc_bollinger_bands(self):
-        result = self.strat.calc_bollinger_bands(PROCESSED_SUMMARY_TICKERS_FIXTURE)
-        expected_result = pd.Series(
-            {'ask': 2.2, 'bid': 2.2, 'last': 2.2, 'marketname': 'BTC-LTC',
-             'saved_timestamp': datetime.datetime(2017, 1, 1, 1, 20, 1), 'SMA': 2.0, 'STDDEV': 0.158114,
-             'UPPER_BB': 2.316228, 'LOWER_BB': 1.683772},
-            index=['LOWER_BB', 'SMA', 'STDDEV', 'UPPER_BB', 'ask', 'bid', 'last', 'marketname', 'saved_timestamp'],
-            name=4
-        )
-        assert_series_equal(result.iloc[4], expected_result)
+        mkt_data = RingBuffer(10)
+        self.strat.init_indicator_columns(mkt_data)
+        for idx, ticker in PROCESSED_SUMMARY_TICKERS_FIXTURE.iterrows():
+            mkt_data.append(ticker)
+        result = self.strat.calc_bollinger_bands(mkt_data, 'BTC-LTC')
+        assert(result.latest('last') == 2.2)
+        assert(round(result.latest('SMA'), 6) == 2.0)
+        assert(round(result.latest('STDDEV'), 6) == 0.158114)
+        assert(round(result.latest('UPPER_BB'), 6) == 2.316228)
+        assert(round(result.latest('LOWER_BB'), 6) == 1.683772)
@@ -0,0 +1,35 @@
+from src.db.bulk_writer import iter_chunks, to_copy_buffer, upsert_query
+import pandas as pd
+import numpy
+
+COLUMNS = ['id', 'date', 'close']
+
+
+class TestBulkWriter:
+    def setup_class(self):
+        self.rows = [{'id': 'bitcoin', 'date': '2018-01-0' + str(day), 'close': 100.0 + day, 'extra': 1}
+                     for day in range(1, 8)]
+
+    def teardown_class(self):
+        self.rows = None
+
+    def test_iter_chunks_dicts(self):
+        chunks = list(iter_chunks(iter(self.rows), COLUMNS, 3))
+        assert([len(chunk) for chunk in chunks] == [3, 3, 1])
+        assert(list(chunks[0].columns) == COLUMNS)
+        assert(chunks[2].iloc[0]['close'] == 107.0)
+
+    def test_iter_chunks_frame(self):
+        chunks = list(iter_chunks(pd.DataFrame(self.rows), COLUMNS, 5))
+        assert([len(chunk) for chunk in chunks] == [5, 2])
+        assert('extra' not in chunks[0])
+
+    def test_to_copy_buffer(self):
+        chunk = pd.DataFrame([{'id': 'a,b', 'date': '2018-01-01', 'close': numpy.nan}], columns=COLUMNS)
+        assert(to_copy_buffer(chunk).read() == '"a,b",2018-01-01,\\N\n')
+
+    def test_upsert_query(self):
+        query = upsert_query('cmc_historical_data', 'cmc_historical_data_staging', COLUMNS, ['id', 'date'])
+        assert('ON CONFLICT (id,date) DO UPDATE SET close = EXCLUDED.close' in query)
+        query = upsert_query('cmc_historical_data', 'cmc_historical_data_staging', COLUMNS, COLUMNS)
+        assert('DO NOTHING' in query)
@@ -0,0 +1,49 @@
+from src.exchange.client_registry import ClientRegistry
+from src.utils.http_session import new_session
+from threading import Thread
+import time
+
+
+class SlowClient:
+    created = 0
+
+    def __init__(self):
+        time.sleep(0.05)
+        SlowClient.created += 1
+        self.session = new_session({'Accept': 'application/json'}, pool_size=4)
+
+
+class TestClientRegistry:
+    def setup_method(self):
+        SlowClient.created = 0
+        self.registry = ClientRegistry()
+
+    def teardown_method(self):
+        self.registry = None
+
+    def test_reuses_client(self):
+        client = self.registry.get('gemini', SlowClient)
+        assert(self.registry.get('gemini', SlowClient) is client)
+        assert(self.registry.get('gdax', SlowClient) is not client)
+        assert(SlowClient.created == 2)
+
+    def test_threads_share_one_client(self):
+        clients = []
+        threads = [Thread(target=lambda: clients.append(self.registry.get('binance', SlowClient))) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert(SlowClient.created == 1)
+        assert(all(client is clients[0] for client in clients))
+
+    def test_new_process_gets_new_clients(self):
+        client = self.registry.get('gemini', SlowClient)
+        self.registry.pid = -1
+        assert(self.registry.get('gemini', SlowClient) is not client)
+
+    def test_session_pool(self):
+        session = SlowClient().session
+        adapter = session.get_adapter('https://api.gemini.com')
+        assert(adapter._pool_maxsize == 4)
+        assert(session.headers['Accept'] == 'application/json')
@@ -0,0 +1,83 @@
+import pytest
+import os
+import shutil
+import tempfile
+import pandas as pd
+
+pytest.importorskip('pyarrow')
+
+from src.db.cmc_cache import CmcHistoryCache, filter_history
+
+
+def make_history(start, end, coins=('bitcoin', 'ethereum')):
+    rows = []
+    for date in pd.date_range(start, end):
+        for coin in coins:
+            rows.append({'coin': coin, 'id': coin, 'date': date.strftime('%Y-%m-%d'), 'close': float(date.day)})
+    return pd.DataFrame(rows)
+
+
+class FakePostgresConnection:
+    def __init__(self, history):
+        self.history = history
+        self.start_dates = []
+
+    def stream_cmc_historical_data(self, start_date=None):
+        self.start_dates.append(start_date)
+        data = self.history
+        if start_date is not None:
+            data = data[pd.to_datetime(data['date']) >= pd.Timestamp(start_date)]
+        if len(data) > 0:
+            yield data.reset_index(drop=True)
+
+
+class TestCmcHistoryCache:
+    def setup_method(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def teardown_method(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_partitions_and_filters(self):
+        history = make_history('2018-01-20', '2018-03-10')
+        cache = CmcHistoryCache(FakePostgresConnection(history), self.cache_dir)
+        data = cache.get('2018-02-15', start_date='2018-02-01')
+        assert(cache.cached_months() == ['2018-01', '2018-02', '2018-03'])
+        assert(len(data) == 15 * 2)
+        assert(len(cache.get('2018-03-01', coin='bitcoin')) == 1)
+        assert(len(cache.get()) == len(history))
+
+    def test_incremental_refresh(self):
+        psql = FakePostgresConnection(make_history('2018-01-01', '2018-01-31'))
+        CmcHistoryCache(psql, self.cache_dir).get()
+        psql.history = make_history('2018-01-01', '2018-02-05')
+        cache = CmcHistoryCache(psql, self.cache_dir)
+        data = cache.get()
+        assert(psql.start_dates == [None, '2018-01-31'])
+        assert(len(data) == 36 * 2)
+        assert(not data.duplicated(['coin', 'date']).any())
+        assert(cache.get_max_date() == '2018-02-05')
+
+    def test_write_atomic(self):
+        path = os.path.join(self.cache_dir, 'metadata.json')
+        tmp_paths = []
+
+        def write(tmp_path):
+            tmp_paths.append(tmp_path)
+            with open(tmp_path, 'w') as f:
+                f.write('{}')
+        CmcHistoryCache.write_atomic(path, write)
+        CmcHistoryCache.write_atomic(path, write)
+        assert(tmp_paths[0] != tmp_paths[1])
+        assert(os.path.dirname(tmp_paths[0]) == self.cache_dir)
+
+        def fail(tmp_path):
+            raise IOError('disk full')
+        with pytest.raises(IOError):
+            CmcHistoryCache.write_atomic(path, fail)
+        assert(os.listdir(self.cache_dir) == ['metadata.json'])
+
+    def test_filter_history(self):
+        history = make_history('2018-01-01', '2018-01-10')
+        assert(len(filter_history(history, '2018-01-05')) == 2)
+        assert(len(filter_history(history, '2018-01-05', start_date='2018-01-03')) == 6)
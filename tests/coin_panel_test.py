@@ -0,0 +1,52 @@
+from src.data_structures.coin_panel import CoinPanel, rolling_mean, ewm_mean
+import datetime
+import pandas as pd
+import numpy
+
+
+class TestCoinPanel:
+    def setup_class(self):
+        rng = numpy.random.RandomState(3)
+        start = datetime.date(2018, 1, 1)
+        rows = []
+        for coin in ['Bitcoin', 'ethereum', 'litecoin', 'monero', 'zcash']:
+            for day in range(60):
+                # gaps, late listings and missing values
+                if rng.rand() < 0.15 or (coin == 'monero' and day < 40):
+                    continue
+                volume = numpy.nan if rng.rand() < 0.05 else 1e6 * rng.rand()
+                rows.append({'id': coin, 'date': start + datetime.timedelta(days=day), 'volume': volume,
+                             'market_cap': 1e8 * (1 + rng.rand())})
+        self.data = pd.DataFrame(rows).sample(frac=1, random_state=2)
+        self.data.index = self.data.index * 10
+        self.panel = CoinPanel(self.data)
+
+    def teardown_class(self):
+        self.data = None
+        self.panel = None
+
+    def test_grid(self):
+        assert(list(self.panel.ids) == sorted(self.data['id'].unique()))
+        assert(self.panel.present.sum() == len(self.data))
+        grid = self.panel.values('market_cap')
+        row = self.data.iloc[5]
+        coin = list(self.panel.ids).index(row['id'])
+        day = numpy.searchsorted(self.panel.days, (row['date'] - datetime.date(1970, 1, 1)).days)
+        assert(grid[coin, day] == row['market_cap'])
+
+    def test_rolling_mean_matches_groupby(self):
+        for column in ['volume', 'market_cap']:
+            expected = self.data.sort_values(by=['date']).groupby('id')[column].transform(lambda x: x.rolling(7).mean())
+            result = self.panel.rolling_mean(column, 7)
+            assert(numpy.allclose(result.values, expected.reindex(self.data.index).values, equal_nan=True))
+
+    def test_ewm_mean_matches_groupby(self):
+        for column in ['volume', 'market_cap']:
+            expected = self.data.sort_values(by=['date']).groupby('id')[column].transform(lambda x: x.ewm(span=10).mean())
+            result = self.panel.ewm_mean(column, 10)
+            assert(numpy.allclose(result.values, expected.reindex(self.data.index).values, equal_nan=True))
+
+    def test_short_rows(self):
+        values = numpy.array([[1.0, 2.0], [3.0, numpy.nan]])
+        assert(numpy.isnan(rolling_mean(values, 3)).all())
+        assert(numpy.allclose(ewm_mean(values, 3), [[1.0, 1.0 / 3 + 2.0 * 2 / 3], [3.0, 3.0]]))
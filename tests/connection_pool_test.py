@@ -0,0 +1,45 @@
+from src.db import connection_pool
+from src.db.psql import PostgresConnection
+from threading import Thread
+import os
+
+os.environ['BACKTESTING'] = 'TRUE'
+
+
+class TestConnectionPool:
+    def setup_class(self):
+        self.psql = PostgresConnection()
+
+    def teardown_class(self):
+        connection_pool.close_pool()
+        self.psql = None
+
+    def test_shared_pool(self):
+        assert(connection_pool.get_pool() is connection_pool.get_pool())
+        result = self.psql._fetch_query('SELECT 1 AS one ;', {})
+        assert(result.loc[0, 'one'] == 1)
+
+    def test_connection_reused(self):
+        with connection_pool.pooled_connection() as conn:
+            first_conn = conn
+        with connection_pool.pooled_connection() as conn:
+            assert(conn is first_conn)
+
+    def test_concurrent_queries(self):
+        results = []
+
+        def fetch():
+            results.append(self.psql._fetch_query('SELECT pg_sleep(0.05), 1 AS one ;', {}))
+
+        threads = [Thread(target=fetch) for i in range(connection_pool.PSQL_POOL_MAX * 2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert(len(results) == len(threads))
+        assert(all(result.loc[0, 'one'] == 1 for result in results))
+
+    def test_failed_query_rolls_back(self):
+        assert(self.psql._fetch_query('SELECT * FROM table_that_does_not_exist ;', {}) is None)
+        result = self.psql._fetch_query('SELECT 1 AS one ;', {})
+        assert(result.loc[0, 'one'] == 1)
@@ -0,0 +1,47 @@
+from src.data_structures.date_index import DateIndex, day_number
+import datetime
+import pandas as pd
+import numpy
+
+
+class TestDateIndex:
+    def setup_class(self):
+        dates = pd.date_range('2018-01-01', '2018-03-31').strftime('%Y-%m-%d')
+        rng = numpy.random.RandomState(0)
+        rows = [{'id': coin, 'date': date, 'close': rng.rand()} for date in dates for coin in ['Bitcoin', 'Ethereum']]
+        self.data = pd.DataFrame(rows).sample(frac=1, random_state=1).reset_index(drop=True)
+        self.index = DateIndex(self.data)
+
+    def teardown_class(self):
+        self.data = None
+        self.index = None
+
+    def test_day_number(self):
+        assert(day_number('1970-01-02') == 1)
+        assert(day_number(datetime.date(2018, 1, 1)) == day_number('2018-01-01'))
+
+    def test_slice_matches_scan(self):
+        for start_date, end_date in [('2018-01-15', '2018-02-10'), (None, '2018-01-03'), ('2018-03-30', None),
+                                     (None, None), ('2018-02-01', '2018-02-01')]:
+            expected = self.data
+            if end_date is not None:
+                expected = expected[expected['date'] <= end_date]
+            if start_date is not None:
+                expected = expected[expected['date'] >= start_date]
+            result = self.index.slice(start_date, end_date)
+            assert(len(result) == len(expected))
+            assert(sorted(result['close']) == sorted(expected['close']))
+
+    def test_sorted_and_empty(self):
+        assert((numpy.diff(self.index.days) >= 0).all())
+        assert(self.index.slice('2019-01-01', '2019-02-01').empty)
+        assert(self.index.slice('2018-02-10', '2018-02-01').empty)
+        assert(len(self.index.on_date('2018-03-01')) == 2)
+
+    def test_day_slices(self):
+        slices = list(self.index.day_slices('2018-01-30', '2018-02-02'))
+        assert([day for day, rows in slices] == list(range(day_number('2018-01-30'), day_number('2018-02-03'))))
+        for day, rows in slices:
+            assert(len(rows) == 2)
+            assert(len(rows.merge(self.index.on_date(numpy.datetime64(day, 'D').astype(object)))) == 2)
+        assert(list(self.index.day_slices('2019-01-01', '2019-02-01')) == [])
@@ -0,0 +1,25 @@
+from src.indicators.ema import EMA, MACD, ema_series, macd_series
+import pandas as pd
+import numpy
+
+VALUES = numpy.random.RandomState(3).lognormal(size=2000) * 100
+
+
+class TestEMA:
+    def test_ema_matches_pandas(self):
+        ema = EMA(26)
+        result = numpy.array([ema.update(value) for value in VALUES])
+        expected = pd.Series(VALUES).ewm(span=26, adjust=False).mean().values
+        assert(numpy.allclose(result, expected, rtol=1e-12))
+
+    def test_ema_series_matches_incremental(self):
+        ema = EMA(9)
+        expected = numpy.array([ema.update(value) for value in VALUES])
+        assert(numpy.allclose(ema_series(VALUES, 9), expected, rtol=1e-12))
+
+    def test_macd_series_matches_incremental(self):
+        macd = MACD(12, 26, 9)
+        results = [macd.update(value).values() for value in VALUES]
+        expected = macd_series(VALUES, 12, 26, 9)
+        for col in ['MACD', 'emaSlw', 'emaFst', 'MACD_sign']:
+            assert(numpy.allclose([r[col] for r in results], expected[col], rtol=1e-10, atol=1e-12))
@@ -0,0 +1,78 @@
+from src.exchange.fan_out import fan_out, merge_results, failed_exchanges
+from src.utils.rate_limiter import TokenBucketLimiter
+from src.exceptions import APIRequestError, PartialResultError
+import time
+
+DELAYS = {'binance': 0.2, 'gdax': 0.1, 'gemini': 0.15, 'bitfinex': 0.05, 'cmc': 0.1}
+
+
+def slow_tickers(exchange):
+    time.sleep(DELAYS[exchange])
+    return [{'pair': 'BTC-ETH', 'base_coin': 'BTC', 'mkt_coin': 'ETH', 'last': 0.05}]
+
+
+class TestFanOut:
+    def test_takes_as_long_as_slowest(self):
+        start = time.time()
+        results = fan_out(list(DELAYS), slow_tickers)
+        elapsed = time.time() - start
+        assert(list(results) == list(DELAYS))
+        assert(elapsed < sum(DELAYS.values()) * 0.75)
+        assert(elapsed >= max(DELAYS.values()))
+
+    def test_in_process(self):
+        results = fan_out(['gdax', 'cmc'], slow_tickers, workers=0)
+        assert(len(results['gdax']) == 1 and len(results['cmc']) == 1)
+
+    def test_failed_exchange(self):
+        def call(exchange):
+            if exchange == 'gdax':
+                raise APIRequestError('gdax', 'get_current_tickers', 'down')
+            return slow_tickers(exchange)
+        results = fan_out(['gdax', 'bitfinex'], call)
+        assert(results['gdax'] is None)
+        assert(failed_exchanges(results) == ['gdax'])
+        try:
+            merge_results(results, 'get_all_current_tickers')
+            assert(False)
+        except PartialResultError as e:
+            assert(e.failed == ['gdax'] and e.fn == 'get_all_current_tickers')
+        merged = merge_results(results, allow_partial=True)
+        assert(list(merged['exchange']) == ['bitfinex'])
+
+    def test_other_errors_raise(self):
+        calls = []
+
+        def call(exchange):
+            calls.append(exchange)
+            if exchange == 'gdax':
+                raise ValueError('bug')
+            return slow_tickers(exchange)
+        try:
+            fan_out(['gdax', 'bitfinex', 'cmc'], call)
+            assert(False)
+        except ValueError:
+            pass
+        # the other exchanges still ran to completion
+        assert(sorted(calls) == ['bitfinex', 'cmc', 'gdax'])
+
+    def test_each_exchange_keeps_its_limiter(self):
+        limiters = dict((exchange, TokenBucketLimiter(exchange, [(1, 0.2)])) for exchange in ['gdax', 'gemini', 'cmc'])
+
+        def call(exchange):
+            limiters[exchange].limit()
+            limiters[exchange].limit()
+            return [{'coin': 'BTC', 'balance': 1.0}]
+        start = time.time()
+        merged = merge_results(fan_out(list(limiters), call))
+        elapsed = time.time() - start
+        # each exchange waits out its own window once, the waits overlap
+        assert(0.15 < elapsed < 0.45)
+        assert(len(merged) == 3)
+        assert(merged['balance'].sum() == 3.0)
+
+    def test_merge_keeps_exchange_column(self):
+        merged = merge_results({'gemini': [{'pair': 'btcusd', 'exchange': 'gemini_ohlc'}], 'gdax': None, 'cmc': []},
+                               allow_partial=True)
+        assert(list(merged['exchange']) == ['gemini_ohlc'])
+        assert(merge_results({}).empty)
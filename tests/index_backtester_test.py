@@ -0,0 +1,119 @@
+from src.bot.index_backtester import IndexBacktester, IndexRun, is_rebalance_day, compress_balances
+from src.strats.mkt_cap_index_strat import IndexStrat2
+from src.strats.mkt_cap_ema_index_strat import EMAIndexStrat
+from src.data_structures.date_index import DateIndex
+import datetime
+import pandas as pd
+import numpy
+
+index_options = {
+    'name': 'Basic Index',
+    'active': True,
+    'plot_overlay': False,
+    'stat_key': 'market_cap',
+    'window': 26,
+    'ema_window': 35,
+    'sma_window': 3,
+    'index_depth': 3,
+    'trade_threshold_pct': .0001,
+    'blacklist': ['tether'],
+    'whitelist': None
+}
+
+ema_options = dict(index_options, **{
+    'name': 'MC_EMA_DIFF',
+    'pre_index_depth': 5,
+    'weights': {'stat_weight': .8, 'ema_diff_avg_weight': .2},
+    'stat_top_percentile': .2,
+    'blacklist': ['Tether']
+})
+
+START_DATE = datetime.date(2018, 1, 1)
+COINS = ['Bitcoin', 'Ethereum', 'Litecoin', 'Ripple', 'Tether', 'Dash']
+
+
+def cmc_history(num_days):
+    rng = numpy.random.RandomState(5)
+    rows = []
+    for num, coin in enumerate(COINS):
+        for day in range(num_days):
+            rows.append({
+                'coin': coin, 'website_slug': coin.lower(), 'id': coin if coin == 'Bitcoin' else coin.lower(),
+                'date': START_DATE + datetime.timedelta(days=day),
+                'open': 1.0, 'high': 1.0, 'low': 1.0, 'average': 1.0,
+                'close': 100.0 * (1 + rng.rand()),
+                'market_cap': 1e8 * (len(COINS) - num) * (1 + 0.5 * rng.rand()),
+                'volume': 1e6 * rng.rand()
+            })
+    return pd.DataFrame(rows)
+
+
+def coin_metadata():
+    return pd.DataFrame([{'id': coin if coin == 'Bitcoin' else coin.lower(), 'coin': coin} for coin in COINS])
+
+
+def make_runs():
+    return [
+        IndexRun(IndexStrat2(index_options), rebalance_frequency=1, index_id='Basic_1'),
+        IndexRun(IndexStrat2(dict(index_options, index_depth=2)), rebalance_frequency=2, index_id='Basic_2'),
+        IndexRun(EMAIndexStrat(ema_options))
+    ]
+
+
+class TestIndexBacktester:
+    def setup_class(self):
+        self.data = cmc_history(80)
+        self.date_index = DateIndex(self.data)
+        self.end_date = START_DATE + datetime.timedelta(days=79)
+
+    def teardown_class(self):
+        self.data = None
+        self.date_index = None
+
+    def run_batch(self, workers):
+        backtester = IndexBacktester(make_runs())
+        backtester.load(self.date_index, coin_metadata())
+        return backtester.run(START_DATE, self.end_date, workers=workers)
+
+    def test_is_rebalance_day(self):
+        assert(is_rebalance_day(datetime.date(2018, 2, 1), 1))
+        assert(not is_rebalance_day(datetime.date(2018, 2, 15), 1))
+        assert(is_rebalance_day(datetime.date(2018, 2, 15), 2))
+        assert(is_rebalance_day(datetime.date(2018, 2, 22), 4))
+        assert(not is_rebalance_day(datetime.date(2018, 2, 23), 4))
+
+    def test_compress_balances(self):
+        balances = pd.DataFrame([
+            {'coin': 'BTC', 'id': 'Bitcoin', 'balance': 1.0, 'exchange': 'gemini'},
+            {'coin': 'BTC', 'id': 'Bitcoin', 'balance': 2.0, 'exchange': 'test'}
+        ])
+        result = compress_balances(balances, coin_metadata())
+        assert(len(result) == 1)
+        assert(result.loc[0, 'balance'] == 3.0)
+        assert(result.loc[0, 'exchange'] == 'gemini,test')
+
+    def test_run(self):
+        index_balances, index_metadata = self.run_batch(0)
+        num_days = (self.end_date - START_DATE).days + 1
+        ids = [m['index_id'] for m in index_metadata]
+        assert(ids.count('Basic_1') == num_days)
+        assert(ids.count('Basic_2') == num_days)
+        # the EMA index scores once Bitcoin has ema_window rows
+        assert(ids.count('MC_EMA_DIFF_0.8/0.2') > 0)
+        basic = index_balances[index_balances['index_id'] == 'Basic_1']
+        assert(len(basic) == 3 * num_days)
+        assert('tether' not in basic['id'].values)
+        first_day = basic[basic['index_date'] == START_DATE.strftime('%Y-%m-%d')]
+        assert(round(first_day['index_pct'].sum(), 6) == 1.0)
+        # rebalanced into the index on the first, the portfolio is worth the starting million
+        assert(round(index_metadata[ids.index('Basic_1')]['portfolio_balance_usd']) == 1000000)
+        after = index_balances[(index_balances['index_id'] == 'Basic_1') & (index_balances['index_date'] == '2018-01-02')]
+        assert(after['balance'].notnull().all() and len(after) == 3)
+
+    def test_workers_match_in_process(self):
+        expected_balances, expected_metadata = self.run_batch(0)
+        index_balances, index_metadata = self.run_batch(2)
+        assert(expected_metadata == index_metadata)
+        assert(list(expected_balances['id']) == list(index_balances['id']))
+        assert(numpy.allclose(expected_balances['balance_usd'].values.astype(float),
+                              index_balances['balance_usd'].values.astype(float), equal_nan=True))
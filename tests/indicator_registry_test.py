@@ -0,0 +1,62 @@
+from src.indicators.indicator_registry import IndicatorRegistry
+from src.indicators.ema import macd_series, ema_series
+from src.data_structures.ring_buffer import RingBuffer
+import pandas as pd
+import numpy
+
+VALUES = 100 + numpy.cumsum(numpy.random.RandomState(2).normal(size=300))
+
+
+class TestIndicatorRegistry:
+    def setup_method(self):
+        self.registry = IndicatorRegistry()
+        self.mkt_data = RingBuffer(500)
+
+    def test_shared_keys(self):
+        sma_key = self.registry.require('rolling_stats', 'last', 9)
+        std_key = self.registry.require('rolling_stats', 'last', 9)
+        assert(sma_key == std_key)
+        self.registry.require('macd', 'last', 12, 26, 9)
+        self.registry.require('macd', 'last', 12, 26, 9)
+        self.registry.require('ema', 'last', 12)
+        assert(len(self.registry.requirements) == 3)
+
+    def test_update_once_per_bar(self):
+        key = self.registry.require('rolling_stats', 'last', 9)
+        for value in VALUES:
+            self.mkt_data.append({'last': value})
+            self.registry.update('BTC-LTC', self.mkt_data)
+            self.registry.update('BTC-LTC', self.mkt_data)
+        stats = self.registry.get('BTC-LTC', key)
+        assert(numpy.isclose(stats.sma, pd.Series(VALUES).rolling(9).mean().values[-1]))
+        assert(numpy.isclose(stats.stddev, pd.Series(VALUES).rolling(9).std().values[-1]))
+
+    def test_macd(self):
+        macd_key = self.registry.require('macd', 'last', 12, 26, 9)
+        for value in VALUES:
+            self.mkt_data.append({'last': value})
+            self.registry.update('BTC-LTC', self.mkt_data)
+        expected = macd_series(VALUES, 12, 26, 9)
+        values = self.registry.get('BTC-LTC', macd_key).values()
+        for col in ['MACD', 'emaSlw', 'emaFst', 'MACD_sign']:
+            assert(numpy.isclose(values[col], expected[col][-1]))
+
+    def test_cleared_buffer_replays(self):
+        key = self.registry.require('ema', 'last', 12)
+        for value in VALUES[:20]:
+            self.mkt_data.append({'last': value})
+            self.registry.update('BTC-LTC', self.mkt_data)
+        self.mkt_data.clear()
+        for value in VALUES[100:130]:
+            self.mkt_data.append({'last': value})
+        self.registry.update('BTC-LTC', self.mkt_data)
+        # none of the bars from before the clear are in the state
+        assert(numpy.isclose(self.registry.get('BTC-LTC', key).value, ema_series(VALUES[100:130], 12)[-1]))
+
+    def test_late_requirement_replays_buffer(self):
+        for value in VALUES:
+            self.mkt_data.append({'last': value})
+            self.registry.update('BTC-LTC', self.mkt_data)
+        key = self.registry.require('extrema', 'last', 20)
+        self.registry.update('BTC-LTC', self.mkt_data)
+        assert(self.registry.get('BTC-LTC', key).highest == VALUES[-20:].max())
@@ -0,0 +1,116 @@
+from src.strats.mkt_cap_ema_index_strat import EMAIndexStrat
+from src.data_structures.date_index import DateIndex
+import pandas as pd
+import numpy
+import datetime
+
+ema_index_options = {
+    'name': 'EMAIndex',
+    'active': True,
+    'plot_overlay': False,
+    'stat_key': 'market_cap',
+    'window': 5,
+    'ema_window': 32,
+    'sma_window': 3,
+    'index_depth': 3,
+    'pre_index_depth': 5,
+    'weights': {'stat_weight': 0.5, 'ema_diff_avg_weight': 0.5},
+    'stat_top_percentile': 0.2,
+    'trade_threshold_pct': 0.1,
+    'blacklist': ['Tether'],
+    'whitelist': []
+}
+
+START_DATE = datetime.date(2018, 1, 1)
+NUM_DAYS = 75
+
+
+def cmc_history():
+    rng = numpy.random.RandomState(7)
+    rows = []
+    coins = ['Bitcoin', 'Ethereum', 'Litecoin', 'Ripple', 'Tether', 'Dash', 'Monero', 'Zcash']
+    for num, coin in enumerate(coins):
+        for day in range(NUM_DAYS):
+            # Monero lists late, Dash is delisted, Zcash misses days
+            if (coin == 'Monero' and day < 60) or (coin == 'Dash' and day > 50) or (coin == 'Zcash' and day % 4 == 0):
+                continue
+            rows.append({
+                'coin': coin,
+                'website_slug': coin.lower(),
+                'id': coin.lower(),
+                'date': START_DATE + datetime.timedelta(days=day),
+                'open': 1.0, 'high': 1.0, 'low': 1.0, 'average': 1.0,
+                'close': 1.0 + rng.rand(),
+                'market_cap': 1e8 * (num + 1) * (1 + 0.5 * rng.rand()),
+                'volume': 1e6 * rng.rand()
+            })
+    data = pd.DataFrame(rows)
+    data.loc[data['id'] == 'bitcoin', 'id'] = 'Bitcoin'
+    return data
+
+
+def holdings():
+    return pd.DataFrame({'id': ['Bitcoin', 'ethereum'], 'coin': ['Bitcoin', 'Ethereum'], 'balance': [1.0, 10.0]})
+
+
+class TestEMAIndexStrat:
+    def setup_class(self):
+        self.data = cmc_history()
+        self.date_index = DateIndex(self.data)
+        self.window = datetime.timedelta(days=ema_index_options['ema_window'])
+
+    def teardown_class(self):
+        self.data = None
+        self.date_index = None
+
+    def full_window_index(self, date, index_coins=None):
+        strat = EMAIndexStrat(ema_index_options)
+        window = self.date_index.slice(date - self.window, date).copy()
+        return strat.handle_data_index(window, holdings(), index_coins, date)
+
+    def assert_same_index(self, expected, result):
+        assert(list(result['id'].values) == list(expected['id'].values))
+        assert(numpy.allclose(result['index_pct'].values.astype(float), expected['index_pct'].values.astype(float), equal_nan=True))
+        assert(numpy.allclose(result['delta_coins'].values.astype(float), expected['delta_coins'].values.astype(float), equal_nan=True))
+
+    def test_panel_built_once_per_history(self):
+        strat = EMAIndexStrat(ema_index_options)
+        date = START_DATE + datetime.timedelta(days=NUM_DAYS - 1)
+        window = self.date_index.slice(date - self.window, date).copy()
+        first = strat.handle_data_index(window, holdings(), None, date)
+        panel = strat.panel
+        second = strat.handle_data_index(window, holdings(), None, date)
+        assert(strat.panel is panel)
+        self.assert_same_index(first, second)
+        strat.handle_data_index(window.copy(), holdings(), None, date)
+        assert(strat.panel is not panel)
+
+    def test_handle_day_index_matches_full_window(self):
+        strat = EMAIndexStrat(ema_index_options)
+        index_coins = None
+        for day in range(ema_index_options['ema_window'], NUM_DAYS):
+            date = START_DATE + datetime.timedelta(days=day)
+            if day % 7 == 0:
+                index_coins = None
+            expected = self.full_window_index(date, index_coins)
+            result = strat.handle_day_index(self.date_index, holdings(), index_coins, date, self.window.days)
+            self.assert_same_index(expected, result)
+            assert(result['index_pct'].notnull().sum() > 1)
+            if index_coins is None:
+                index_coins = result.head(ema_index_options['index_depth'])['id'].values
+
+    def test_handle_day_index_skipped_days(self):
+        strat = EMAIndexStrat(ema_index_options)
+        for day in [32, 33, 40, 68, 69, 74]:
+            date = START_DATE + datetime.timedelta(days=day)
+            expected = self.full_window_index(date)
+            result = strat.handle_day_index(self.date_index, holdings(), None, date, self.window.days)
+            self.assert_same_index(expected, result)
+            assert(strat.ema_windows.last_day == day + (START_DATE - datetime.date(1970, 1, 1)).days)
+
+    def test_handle_day_index_short_history(self):
+        strat = EMAIndexStrat(ema_index_options)
+        date = START_DATE + datetime.timedelta(days=20)
+        result = strat.handle_day_index(self.date_index, holdings(), None, date, self.window.days)
+        assert(len(result) == len(self.date_index.slice(START_DATE, date)))
+        assert('index_pct' not in result.columns)
@@ -0,0 +1,168 @@
+import asyncio
+import base64
+import json
+from aiohttp import web
+
+GEMINI_SYMBOLS = ['btcusd', 'ethusd', 'ethbtc', 'zecusd', 'zecbtc', 'zeceth', 'ltcusd', 'ltcbtc']
+
+
+class ExchangeStubServer:
+    def __init__(self, delay=0.0):
+        """
+            local http server answering the gemini and gateio routes with canned data, for testing the
+            asyncio clients offline
+            gemini is served under /gemini, gateio under /gateio and cryptopia under /cryptopia,
+            every request waits <delay> seconds
+        """
+        self.delay = delay
+        self.requests = []
+        self.nonces = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.runner = None
+        self.url = None
+        app = web.Application()
+        app.router.add_get('/gemini/v1/symbols', self.gemini_symbols)
+        app.router.add_get('/gemini/v1/pubticker/{symbol}', self.gemini_ticker)
+        app.router.add_get('/gemini/v1/book/{symbol}', self.gemini_book)
+        app.router.add_post('/gemini/v1/balances', self.gemini_balances)
+        app.router.add_post('/gemini/v1/order/new', self.gemini_new_order)
+        app.router.add_get('/gateio/api2/1/tickers', self.gateio_tickers)
+        app.router.add_get('/gateio/api2/1/orderBook/{pair}', self.gateio_book)
+        app.router.add_post('/gateio/api2/1/private/balances', self.gateio_balances)
+        app.router.add_post('/gateio/api2/1/private/buy', self.gateio_order)
+        app.router.add_get('/cryptopia/Api/GetTradePairs/', self.cryptopia_pairs)
+        app.router.add_get('/cryptopia/Api/GetMarkets/', self.cryptopia_markets)
+        app.router.add_get('/cryptopia/Api/GetMarket/{market}', self.cryptopia_market)
+        app.router.add_get('/cryptopia/Api/GetMarketOrders/{market}', self.cryptopia_book)
+        app.router.add_post('/cryptopia/Api/GetBalance', self.cryptopia_balances)
+        app.router.add_post('/cryptopia/Api/SubmitTrade', self.cryptopia_submit)
+        app.router.add_post('/cryptopia/Api/CancelTrade', self.cryptopia_cancel)
+        app.router.add_post('/cryptopia/Api/GetOpenOrders', self.cryptopia_open_orders)
+        app.middlewares.append(self.track)
+        self.app = app
+
+    async def start(self):
+        self.runner = web.AppRunner(self.app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = 'http://127.0.0.1:' + str(port)
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    @web.middleware
+    async def track(self, request, handler):
+        self.requests.append(request.path)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            return await handler(request)
+        finally:
+            self.in_flight -= 1
+
+    #
+    # GEMINI
+    #
+
+    async def gemini_symbols(self, request):
+        return web.json_response(GEMINI_SYMBOLS)
+
+    async def gemini_ticker(self, request):
+        symbol = request.match_info['symbol']
+        if symbol not in GEMINI_SYMBOLS:
+            return web.json_response({'result': 'error', 'reason': 'InvalidSymbol', 'message': symbol}, status=400)
+        return web.json_response({
+            'bid': '9.5', 'ask': '10.5', 'last': '10.0',
+            'volume': {symbol[:3].upper(): '100', symbol[3:].upper(): '1000', 'timestamp': 1520000000000}
+        })
+
+    async def gemini_book(self, request):
+        return web.json_response({
+            'bids': [{'price': '9.5', 'amount': '2', 'timestamp': '1520000000'}],
+            'asks': [{'price': '10.5', 'amount': '3', 'timestamp': '1520000000'},
+                     {'price': '11', 'amount': '1', 'timestamp': '1520000000'}]
+        })
+
+    async def gemini_balances(self, request):
+        self.nonces.append(json.loads(base64.b64decode(request.headers['X-GEMINI-PAYLOAD']))['nonce'])
+        return web.json_response([
+            {'type': 'exchange', 'currency': 'BTC', 'amount': '1.5', 'available': '1.5'},
+            {'type': 'exchange', 'currency': 'USD', 'amount': '2500', 'available': '2500'}
+        ])
+
+    async def gemini_new_order(self, request):
+        payload = json.loads(base64.b64decode(request.headers['X-GEMINI-PAYLOAD']))
+        return web.json_response({
+            'order_id': '106817811', 'type': payload['type'], 'symbol': payload['symbol'], 'side': payload['side'],
+            'is_live': True, 'is_cancelled': False, 'original_amount': payload['amount'], 'executed_amount': '0',
+            'remaining_amount': payload['amount'], 'price': payload['price'], 'avg_execution_price': '0.00',
+            'timestampms': 1520000000000
+        })
+
+    #
+    # GATEIO
+    #
+
+    async def gateio_tickers(self, request):
+        return web.json_response({
+            'eth_btc': {'result': 'true', 'last': 0.05, 'baseVolume': 10},
+            'ltc_btc': {'result': 'true', 'last': 0.01, 'baseVolume': 5}
+        })
+
+    async def gateio_book(self, request):
+        return web.json_response({'result': 'true', 'asks': [[0.051, 4]], 'bids': [[0.049, 6], [0.048, 1]]})
+
+    async def gateio_balances(self, request):
+        if 'SIGN' not in request.headers:
+            return web.json_response({'result': 'false', 'message': 'Error: invalid key or sign'})
+        return web.json_response({'result': 'true', 'available': {'BTC': '0.5', 'ETH': '12'}, 'locked': {}})
+
+    async def gateio_order(self, request):
+        form = await request.post()
+        return web.json_response({'result': 'true', 'orderNumber': '123456', 'rate': form['rate'], 'leftAmount': form['amount'],
+                                  'filledAmount': '0', 'message': 'Success'})
+
+    #
+    # CRYPTOPIA
+    #
+
+    @staticmethod
+    def cryptopia_data(data):
+        return web.json_response({'Success': True, 'Error': None, 'Data': data})
+
+    async def cryptopia_pairs(self, request):
+        return self.cryptopia_data([{'Label': 'ETH/BTC', 'Symbol': 'ETH', 'BaseSymbol': 'BTC'},
+                                    {'Label': 'LTC/BTC', 'Symbol': 'LTC', 'BaseSymbol': 'BTC'}])
+
+    async def cryptopia_markets(self, request):
+        return self.cryptopia_data([{'Label': 'ETH/BTC', 'LastPrice': 0.05}, {'Label': 'LTC/BTC', 'LastPrice': 0.01},
+                                    {'Label': 'DOT/BTC', 'LastPrice': 0.001}])
+
+    async def cryptopia_market(self, request):
+        if request.match_info['market'] != 'ETH_BTC':
+            return web.json_response({'Success': False, 'Error': 'Market not found', 'Data': None})
+        return self.cryptopia_data({'Label': 'ETH/BTC', 'LastPrice': 0.05})
+
+    async def cryptopia_book(self, request):
+        return self.cryptopia_data({'Buy': [{'Price': 0.049, 'Volume': 6}], 'Sell': [{'Price': 0.051, 'Volume': 4}]})
+
+    async def cryptopia_balances(self, request):
+        if not request.headers.get('Authorization', '').startswith('amx '):
+            return web.json_response({'Success': False, 'Error': 'Signature does not match request parameters.'})
+        return self.cryptopia_data([{'Symbol': 'BTC', 'Total': 0.5, 'Address': None},
+                                    {'Symbol': 'ETH', 'Total': 12, 'Address': '0x0'}])
+
+    async def cryptopia_submit(self, request):
+        await request.json()
+        return self.cryptopia_data({'OrderId': 23467, 'FilledOrders': []})
+
+    async def cryptopia_cancel(self, request):
+        return self.cryptopia_data([(await request.json())['OrderId']])
+
+    async def cryptopia_open_orders(self, request):
+        return self.cryptopia_data([{'OrderId': 23467, 'Market': 'ETH/BTC', 'Type': 'Buy', 'Rate': 0.05, 'Amount': 2.0,
+                                     'Remaining': 1.5}])
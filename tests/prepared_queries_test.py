@@ -0,0 +1,66 @@
+from src.db.psql import PostgresConnection
+from src.db.prepared_queries import PreparedQueries
+from src.db import connection_pool
+import os
+
+os.environ['BACKTESTING'] = 'TRUE'
+
+
+class TestPreparedQueries:
+    def setup_class(self):
+        self.psql = PostgresConnection()
+
+    def teardown_class(self):
+        self.psql = None
+
+    def test_prepare_query(self):
+        prepared = PreparedQueries(lambda table_type: 'fixture_market_summaries')
+        query = prepared.prepare_query('market_summaries_by_ticker')
+        assert(query.startswith('PREPARE market_summaries_by_ticker__fixture_market_summaries (integer,text[]) AS'))
+        assert('FROM fixture_market_summaries' in query)
+
+    def test_matches_text_query(self):
+        markets = ('BTC-LTC', 'BTC-ETH')
+        for tick in range(1, 4):
+            result = self.psql.get_market_summaries_by_ticker(tick, markets)
+            expected = self.psql._fetch_query("""
+                SELECT marketname, last, bid, ask, saved_timestamp, volume FROM fixture_market_summaries
+                WHERE ticker_nonce = %(ticker_nonce)s AND marketname IN %(market_names)s ;
+            """, {'ticker_nonce': tick, 'market_names': markets})
+            assert(sorted(result['marketname']) == sorted(expected['marketname']))
+
+    def test_shared_between_connections(self):
+        # both instances borrow the same backends, the second must not PREPARE the statements again
+        other = PostgresConnection()
+        for tick in range(1, 4):
+            first = self.psql.get_market_summaries_by_ticker(tick, ('BTC-LTC',))
+            second = other.get_market_summaries_by_ticker(tick, ('BTC-LTC',))
+            assert(first is not None and second is not None)
+            assert(list(first['marketname']) == list(second['marketname']))
+
+    def test_broken_connection_forgotten(self):
+        with connection_pool.pooled_connection() as conn:
+            backend_pid = conn.get_backend_pid()
+        self.psql.get_market_summaries_by_ticker(1, ('BTC-LTC',))
+        assert(backend_pid in connection_pool._prepared)
+        try:
+            with connection_pool.pooled_connection() as conn:
+                conn.close()
+                raise IOError('connection lost')
+        except IOError:
+            pass
+        assert(backend_pid not in connection_pool._prepared)
+
+    def test_new_pool_forgets_backends(self):
+        self.psql.get_market_summaries_by_ticker(1, ('BTC-LTC',))
+        assert(len(connection_pool._prepared) > 0)
+        # a forked child, or a closed pool, opens backends of its own
+        connection_pool.close_pool()
+        assert(connection_pool._prepared == {})
+        assert(self.psql.get_market_summaries_by_ticker(1, ('BTC-LTC',)) is not None)
+
+    def test_stats(self):
+        self.psql.get_market_summaries_by_ticker(1, ('BTC-LTC',))
+        stats = self.psql.prepared.get_stats()
+        assert(stats.loc['market_summaries_by_ticker', 'calls'] >= 1)
+        assert(stats.loc['market_summaries_by_ticker', 'rows'] >= 1)
@@ -0,0 +1,30 @@
+from src.db.psql import PostgresConnection
+import numpy
+import os
+
+os.environ['BACKTESTING'] = 'TRUE'
+
+
+class TestPsqlStream:
+    def setup_class(self):
+        self.psql = PostgresConnection()
+
+    def teardown_class(self):
+        self.psql = None
+
+    def test_cmc_historical_query(self):
+        query, params = self.psql.cmc_historical_query('2018-01-31', coin='BTC', start_date='2018-01-01',
+                                                       columns=['id', 'date', 'close'])
+        assert(query.startswith('SELECT id,date,close FROM'))
+        assert('WHERE date >= %(start_date)s AND date <= %(date)s AND coin = %(coin)s' in query)
+        assert(params == {'start_date': '2018-01-01', 'date': '2018-01-31', 'coin': 'BTC'})
+        query, params = self.psql.cmc_historical_query(None, coin='BTC')
+        assert('WHERE coin = %(coin)s' in query)
+
+    def test_stream_matches_fetch(self):
+        query = 'SELECT generate_series(1, 25) AS n, generate_series(1, 25)::numeric / 4 AS quarter'
+        chunks = list(self.psql._stream_query(query, {}, itersize=10))
+        assert([len(chunk) for chunk in chunks] == [10, 10, 5])
+        assert(chunks[0]['quarter'].dtype == numpy.float64)
+        expected = self.psql._fetch_query(query + ' ;', {})
+        assert(list(expected['n']) == sum([list(chunk['n']) for chunk in chunks], []))
@@ -0,0 +1,139 @@
+from src.utils.rate_limiter import TokenBucketLimiter, REQUESTS
+from src.exchange.exchange_limits import EXCHANGE_RATE_LIMITS, BINANCE_REQUEST_WEIGHTS, new_rate_limiter, new_rate_limiters
+from src.exceptions import RateLimitError
+from threading import Thread
+import asyncio
+import time
+import os
+import re
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucketLimiter:
+    def setup_method(self):
+        self.clock = FakeClock()
+        self.limiter = TokenBucketLimiter('binance', [(10, 1), (100, 60)], weights={'current_tickers': 4}, clock=self.clock)
+
+    def teardown_method(self):
+        self.limiter = None
+
+    def test_burst_then_refill(self):
+        assert(all(self.limiter.try_acquire() for i in range(10)))
+        assert(not self.limiter.try_acquire())
+        self.clock.now = 0.1
+        assert(self.limiter.try_acquire())
+        assert(not self.limiter.try_acquire())
+
+    def test_weights(self):
+        assert(self.limiter.weight('current_tickers') == 4)
+        assert(self.limiter.weight('order_book') == 1)
+        assert(self.limiter.try_acquire('current_tickers'))
+        assert(self.limiter.try_acquire('current_tickers'))
+        assert(not self.limiter.try_acquire('current_tickers'))
+        assert(self.limiter.try_acquire('order_book'))
+        assert(self.limiter.try_acquire(weight=1))
+
+    def test_every_window_limits(self):
+        limiter = TokenBucketLimiter('binance', [(10, 1), (20, 60)], clock=self.clock)
+        assert(all(limiter.try_acquire() for i in range(10)))
+        self.clock.now = 1.0
+        assert(all(limiter.try_acquire() for i in range(10)))
+        # the second window is full again, the minute window is not
+        self.clock.now = 2.0
+        assert(not limiter.try_acquire())
+        self.clock.now = 3.0
+        assert(limiter.try_acquire())
+
+    def test_weight_over_capacity(self):
+        try:
+            self.limiter.try_acquire(weight=11)
+            assert(False)
+        except RateLimitError as e:
+            assert(e.weight == 11)
+
+
+class TestTokenBucketLimiterBlocking:
+    def test_limit_waits_fraction_of_a_second(self):
+        limiter = TokenBucketLimiter('gdax', [(5, 0.1)])
+        start = time.monotonic()
+        for i in range(15):
+            limiter.limit()
+        elapsed = time.monotonic() - start
+        assert(0.15 < elapsed < 1.0)
+
+    def test_limit_from_threads(self):
+        limiter = TokenBucketLimiter('gdax', [(10, 0.1)])
+        done = []
+
+        def worker():
+            for i in range(5):
+                limiter.limit()
+                done.append(time.monotonic())
+
+        start = time.monotonic()
+        threads = [Thread(target=worker) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert(len(done) == 30)
+        # 10 right away, the other 20 at 100 per second
+        assert(time.monotonic() - start >= 0.18)
+
+    def test_async_acquire(self):
+        limiter = TokenBucketLimiter('gemini', [(2, 0.1)])
+
+        async def run():
+            start = time.monotonic()
+            await asyncio.gather(*[limiter.acquire() for i in range(6)])
+            return time.monotonic() - start
+
+        elapsed = asyncio.run(run())
+        assert(0.15 < elapsed < 1.0)
+
+
+def adaptor_endpoints():
+    # every endpoint an ExchangeAdaptor route passes to its limiter
+    path = os.path.join(os.path.dirname(__file__), '..', 'src', 'exchange', 'exchange_adaptor.py')
+    with open(path) as f:
+        return sorted(set(re.findall(r"\.limit\('(\w+)'\)", f.read())))
+
+
+class TestExchangeRateLimits:
+    def test_every_endpoint_fits_every_window(self):
+        endpoints = adaptor_endpoints()
+        assert('current_tickers' in endpoints)
+        assert(set(BINANCE_REQUEST_WEIGHTS).issuperset(endpoints))
+        for exchange in EXCHANGE_RATE_LIMITS:
+            for endpoint in endpoints:
+                limiter = new_rate_limiter(exchange)
+                # a fresh limiter has every window full, over weight endpoints raise RateLimitError
+                assert(limiter.try_acquire(endpoint))
+
+    def test_binance_weight_counts_against_minute_window(self):
+        limiter = new_rate_limiters()['binance']
+        clock = FakeClock()
+        for bucket in limiter.buckets:
+            bucket.clock = clock
+            bucket.updated = 0.0
+        # 40 weight, one request against the 20 per second window
+        assert(all(limiter.try_acquire('current_tickers') for i in range(20)))
+        assert(not limiter.try_acquire('order_book'))
+        clock.now = 1.0
+        # 800 of the 1200 minute weight is spent, 10 more tickers calls would be 1200
+        assert(all(limiter.try_acquire('current_tickers') for i in range(10)))
+        assert(not limiter.try_acquire('current_tickers'))
+
+    def test_requests_window(self):
+        clock = FakeClock()
+        limiter = TokenBucketLimiter('binance', [(2, 1, REQUESTS), (100, 60)], clock=clock)
+        assert(limiter.try_acquire(weight=50))
+        assert(limiter.try_acquire(weight=5))
+        assert(not limiter.try_acquire(weight=1))
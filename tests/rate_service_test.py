@@ -0,0 +1,83 @@
+from src.exchange.rate_service import HistoricalRateService, RateCache, fill_range, minute_of, MINUTE_MS
+from src.exceptions import APIRequestError
+import os
+import shutil
+import tempfile
+import numpy
+
+START = 1520000000000 - 1520000000000 % MINUTE_MS
+
+
+class FakeCandles:
+    def __init__(self, gaps=()):
+        """
+            one candle a minute closing at the minute number, except in the gap minutes
+        """
+        self.gaps = set(gaps)
+        self.calls = []
+
+    def __call__(self, exchange, base_coin, mkt_coin, start, end):
+        if mkt_coin == 'XXX':
+            raise APIRequestError(exchange, 'get_historical_candles', 'unknown pair')
+        self.calls.append((exchange, base_coin + '-' + mkt_coin, minute_of(start), minute_of(end)))
+        return [{'timestamp': minute * MINUTE_MS, 'close': float(minute)}
+                for minute in range(minute_of(start), minute_of(end) + 1) if minute not in self.gaps]
+
+
+class TestHistoricalRateService:
+    def setup_method(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.cache_dir, 'rates', 'rate_cache.sqlite')
+
+    def teardown_method(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_fill_range(self):
+        candles = [{'timestamp': 12 * MINUTE_MS, 'close': 1.0}, {'timestamp': 15 * MINUTE_MS, 'close': 2.0}]
+        assert(fill_range(10, 17, candles) == {10: 1.0, 11: 1.0, 12: 1.0, 13: 2.0, 14: 2.0, 15: 2.0})
+
+    def test_thousands_of_fills_take_few_requests(self):
+        fetch = FakeCandles()
+        service = HistoricalRateService(fetch, RateCache(self.path))
+        rng = numpy.random.RandomState(0)
+        # 3000 fills spread over two days, each needs a usd rate and a coin rate
+        timestamps = START + rng.randint(0, 2 * 24 * 60, 3000) * MINUTE_MS
+        keys = [('gdax', 'USD', 'BTC', t) for t in timestamps] + [('binance', 'BTC', 'ETH', t) for t in timestamps]
+        service.prefetch(keys)
+        # a gdax request covers 300 minutes, a binance one 1000
+        assert(len([c for c in fetch.calls if c[0] == 'gdax']) == 10)
+        assert(len([c for c in fetch.calls if c[0] == 'binance']) == 3)
+        calls = len(fetch.calls)
+        for t in timestamps[:50]:
+            assert(service.get_rate('gdax', 'usd', 'btc', t) == float(minute_of(t)))
+            assert(service.get_rate('binance', 'BTC', 'ETH', t) == float(minute_of(t)))
+        assert(len(fetch.calls) == calls)
+
+    def test_cache_persists(self):
+        service = HistoricalRateService(FakeCandles(), RateCache(self.path))
+        assert(service.get_rate('gdax', 'USD', 'ETH', START + 5 * MINUTE_MS) == float(minute_of(START) + 5))
+        service.cache.close()
+        fetch = FakeCandles()
+        service = HistoricalRateService(fetch, RateCache(self.path))
+        service.prefetch([('gdax', 'USD', 'ETH', START + m * MINUTE_MS) for m in range(5, 300)])
+        assert(service.get_rate('gdax', 'USD', 'ETH', START + 100 * MINUTE_MS) == float(minute_of(START) + 100))
+        # the range fetched for the first lookup covers the later minutes
+        assert(fetch.calls == [])
+
+    def test_gap_takes_next_candle(self):
+        first = minute_of(START)
+        fetch = FakeCandles(gaps=range(first + 250, first + 320))
+        service = HistoricalRateService(fetch, RateCache(None))
+        service.prefetch([('gdax', 'USD', 'BTC', START), ('gdax', 'USD', 'BTC', START + 260 * MINUTE_MS)])
+        # the window ends inside the gap, the trailing minute gets a range of its own
+        assert(len(fetch.calls) == 2 and fetch.calls[1][2] == first + 260)
+        assert(service.get_rate('gdax', 'USD', 'BTC', START + 260 * MINUTE_MS) == float(first + 320))
+        assert(service.get_rate('gdax', 'USD', 'BTC', START + 249 * MINUTE_MS) == float(first + 249))
+
+    def test_unsupported_and_failing_pairs(self):
+        fetch = FakeCandles()
+        service = HistoricalRateService(fetch, RateCache(None))
+        service.prefetch([('bittrex', 'BTC', 'ETH', START), ('gdax', 'BTC', 'BTC', START), ('gdax', 'BTC', 'XXX', START),
+                          ('binance', 'BTC', 'LTC', START)])
+        assert([c[1] for c in fetch.calls] == ['BTC-LTC'])
+        assert(not service.supports('bittrex'))
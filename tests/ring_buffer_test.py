@@ -0,0 +1,60 @@
+from src.data_structures.ring_buffer import RingBuffer, TICKER_COLUMNS
+import numpy
+
+
+def make_ticker(i):
+    return dict((col, float(i)) for col in TICKER_COLUMNS)
+
+
+class TestRingBuffer:
+    def setup_class(self):
+        self.buffer = RingBuffer(4)
+
+    def teardown_class(self):
+        self.buffer = None
+
+    def test_append_and_window(self):
+        for i in range(3):
+            self.buffer.append(make_ticker(i))
+        assert(len(self.buffer) == 3)
+        assert(self.buffer.count == 3)
+        assert(list(self.buffer.window('last')) == [0.0, 1.0, 2.0])
+        assert(list(self.buffer.window('last', 2)) == [1.0, 2.0])
+        assert(self.buffer.latest('close') == 2.0)
+
+    def test_wraparound(self):
+        for i in range(3, 10):
+            self.buffer.append(make_ticker(i))
+        assert(len(self.buffer) == 4)
+        assert(self.buffer.count == 10)
+        assert(list(self.buffer.window('last')) == [6.0, 7.0, 8.0, 9.0])
+
+    def test_window_is_a_view(self):
+        window = self.buffer.window('last', 3)
+        assert(numpy.shares_memory(window, self.buffer.data))
+
+    def test_add_columns_and_set_latest(self):
+        self.buffer.add_columns(['SMA'])
+        assert('SMA' in self.buffer)
+        assert(numpy.isnan(self.buffer.latest('SMA')))
+        self.buffer.set_latest('SMA', 7.5)
+        self.buffer.append(make_ticker(10))
+        assert(list(self.buffer.window('SMA', 2))[0] == 7.5)
+        assert(numpy.isnan(self.buffer.latest('SMA')))
+
+    def test_to_frame(self):
+        frame = self.buffer.to_frame(2)
+        assert(len(frame) == 2)
+        assert(list(frame['last']) == [9.0, 10.0])
+
+    def test_clear(self):
+        buffer = RingBuffer(4)
+        for i in range(6):
+            buffer.append(make_ticker(i))
+        buffer.clear()
+        assert(len(buffer) == 0 and buffer.count == 0 and buffer.head == 0)
+        assert(len(buffer.window('last')) == 0)
+        buffer.append(make_ticker(7))
+        assert(buffer.count == 1)
+        assert(list(buffer.window('last')) == [7.0])
+        assert(buffer.latest('last') == 7.0)
@@ -0,0 +1,26 @@
+from src.indicators.rolling_extrema import RollingExtrema, rolling_max, rolling_min
+import pandas as pd
+import numpy
+
+VALUES = numpy.random.RandomState(11).normal(size=1000)
+
+
+class TestRollingExtrema:
+    def test_incremental_matches_pandas(self):
+        for window in [1, 5, 64]:
+            extrema = RollingExtrema(window)
+            highest = []
+            lowest = []
+            for value in VALUES:
+                extrema.update(value)
+                highest.append(extrema.highest)
+                lowest.append(extrema.lowest)
+            assert(numpy.array_equal(highest, pd.Series(VALUES).rolling(window).max().values, equal_nan=True))
+            assert(numpy.array_equal(lowest, pd.Series(VALUES).rolling(window).min().values, equal_nan=True))
+
+    def test_vectorized_matches_pandas(self):
+        for window in [1, 3, 7, 250, 1000, 1001]:
+            expected_max = pd.Series(VALUES).rolling(window).max().values
+            expected_min = pd.Series(VALUES).rolling(window).min().values
+            assert(numpy.array_equal(rolling_max(VALUES, window), expected_max, equal_nan=True))
+            assert(numpy.array_equal(rolling_min(VALUES, window), expected_min, equal_nan=True))
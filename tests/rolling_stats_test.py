@@ -0,0 +1,20 @@
+from src.indicators.rolling_stats import RollingStats
+import pandas as pd
+import numpy
+
+
+class TestRollingStats:
+    def test_matches_pandas_rolling(self):
+        values = numpy.random.RandomState(7).lognormal(size=500) * 1000
+        window = 20
+        expected_sma = pd.Series(values).rolling(window=window).mean().values
+        expected_std = pd.Series(values).rolling(window=window).std().values
+        stats = RollingStats(window)
+        for idx, value in enumerate(values):
+            stats.update(value)
+            if idx < window - 1:
+                assert(numpy.isnan(stats.sma))
+                assert(numpy.isnan(stats.stddev))
+            else:
+                assert(numpy.isclose(stats.sma, expected_sma[idx], rtol=1e-10))
+                assert(numpy.isclose(stats.stddev, expected_std[idx], rtol=1e-8))
@@ -0,0 +1,23 @@
+from src.indicators.rsi import StochasticRSI, stochastic_rsi_series
+import numpy
+
+VALUES = 100 + numpy.cumsum(numpy.random.RandomState(5).normal(size=3000))
+COLUMNS = ['GAIN', 'LOSS', 'AVG_GAIN', 'AVG_LOSS', 'RSI', 'MAX_RSI', 'MIN_RSI', 'STOCH_RSI', 'STOCH_RSI_SMA']
+
+
+class TestStochasticRSI:
+    def test_series_matches_incremental(self):
+        state = StochasticRSI(14, 3)
+        incremental = [dict(state.update(value).values()) for value in VALUES]
+        series = stochastic_rsi_series(VALUES, 14, 3)
+        for col in COLUMNS:
+            expected = numpy.array([row[col] for row in incremental])
+            assert(numpy.allclose(series[col], expected, rtol=1e-9, atol=1e-9, equal_nan=True))
+
+    def test_wilder_seed(self):
+        series = stochastic_rsi_series(VALUES, 14, 3)
+        change = numpy.diff(VALUES[:15])
+        assert(numpy.isnan(series['RSI'][13]))
+        assert(numpy.isclose(series['AVG_GAIN'][14], numpy.maximum(change, 0).mean()))
+        assert(numpy.isclose(series['AVG_LOSS'][14], numpy.maximum(-change, 0).mean()))
+        assert(((series['STOCH_RSI'][14:] >= 0) & (series['STOCH_RSI'][14:] <= 1)).all())
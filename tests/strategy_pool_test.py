@@ -0,0 +1,53 @@
+from src.bot.strategy_pool import StrategyPool, MarketShard
+from src.strats.bollinger_bands_strat import BollingerBandsStrat
+import numpy
+
+bb_options = {
+    'name': 'BollingerBands',
+    'active': True,
+    'plot_overlay': True,
+    'num_standard_devs': 1,
+    'sma_window': 5,
+    'stat_key': 'last',
+    'window': 5,
+    'ema_window': 5
+}
+
+MKT_NAMES = ['BTC-LTC', 'BTC-ETH', 'BTC-XRP', 'ETH-LTC', 'ETH-XRP']
+
+
+def make_bars(num_bars):
+    rng = numpy.random.RandomState(4)
+    bars = []
+    for idx in range(num_bars):
+        bars.append(dict((mkt_name, [{'last': 10 + rng.normal(), 'timestamp': idx}]) for mkt_name in MKT_NAMES))
+    return bars
+
+
+class TestStrategyPool:
+    def setup_class(self):
+        self.strat = BollingerBandsStrat(bb_options)
+        self.strat.init_market_positions(dict((mkt_name, {}) for mkt_name in MKT_NAMES))
+        self.pool = StrategyPool([self.strat], 2, 50)
+        self.pool.start(dict((mkt_name, {'pair': mkt_name}) for mkt_name in MKT_NAMES))
+
+    def teardown_class(self):
+        self.pool.stop()
+        self.pool = None
+
+    def test_shards(self):
+        assert(len(self.pool.shards) == 2)
+        assert(sorted(sum([list(shard) for shard in self.pool.shards], [])) == sorted(MKT_NAMES))
+
+    def test_positions_match_in_process(self):
+        shard = MarketShard([BollingerBandsStrat(bb_options)], 50)
+        shard.init_markets(dict((mkt_name, {}) for mkt_name in MKT_NAMES))
+        num_signals = 0
+        for new_bars in make_bars(40):
+            self.pool.step(new_bars)
+            expected = shard.step(new_bars)['BollingerBands']
+            for mkt_name in MKT_NAMES:
+                assert(self.strat.buy_positions[mkt_name] == expected[mkt_name][0])
+                assert(self.strat.sell_positions[mkt_name] == expected[mkt_name][1])
+                num_signals += expected[mkt_name][0] + expected[mkt_name][1]
+        assert(num_signals > 0)
@@ -1,6 +1,6 @@
 from src.strats.williams_pct_strat import WilliamsPctStrat
+from src.data_structures.ring_buffer import RingBuffer
 import pandas as pd
-from pandas.util.testing import assert_frame_equal, assert_series_equal
 from fixtures.summary_tickers_fixture import SUMMARY_TICKERS_FIXTURE
 from fixtures.processed_summary_tickers_fixture import PROCESSED_SUMMARY_TICKERS_FIXTURE
 import os
@@ -16,7 +16,8 @@ w_pct_options = {
     'wp_window': 5,
     'minor_tick': 1,
     'major_tick': 5,
-    'window': 5
+    'window': 5,
+    'ema_window': 5
 }
 
 
@@ -29,5 +30,9 @@ class TestBBStrat:
 
     def test_calculate_williams_pct(self):
         expected_wp = -0.0
-        wp = self.strat.calculate_williams_pct(PROCESSED_SUMMARY_TICKERS_FIXTURE)
-        assert(True)
+        mkt_data = RingBuffer(10)
+        self.strat.init_indicator_columns(mkt_data)
+        for idx, ticker in PROCESSED_SUMMARY_TICKERS_FIXTURE.iterrows():
+            mkt_data.append(ticker)
+        wp = self.strat.calculate_williams_pct(mkt_data, 'BTC-LTC')
+        assert(wp.latest('W_PCT') == expected_wp)
@@ -0,0 +1,85 @@
+from src.db.write_behind import WriteBehindQueue, merge_rows
+import pandas as pd
+import subprocess
+import sys
+import os
+import time
+
+
+class TestWriteBehindQueue:
+    def setup_method(self):
+        self.written = []
+        self.failures = 0
+        self.writer = WriteBehindQueue(max_size=100, batch_size=10, flush_seconds=0.05, max_retries=2,
+                                       retry_seconds=0.01)
+        self.writer.register('trades', self.save)
+        self.writer.register('flaky', self.save_flaky)
+
+    def teardown_method(self):
+        self.writer.stop()
+        self.writer = None
+
+    def save(self, rows):
+        self.written.append(rows)
+
+    def save_flaky(self, rows):
+        self.failures += 1
+        if self.failures < 3:
+            raise Exception('db hiccup')
+        self.written.append(rows)
+
+    def test_merge_rows(self):
+        assert(merge_rows([[{'a': 1}], [{'a': 2}]]) == [{'a': 1}, {'a': 2}])
+        frames = merge_rows([pd.DataFrame([{'a': 1}]), pd.DataFrame([{'a': 2}])])
+        assert(list(frames['a']) == [1, 2])
+
+    def test_batches_and_drains_on_stop(self):
+        self.writer.start()
+        for i in range(25):
+            self.writer.put('trades', [{'trade': i}])
+        self.writer.stop()
+        rows = sum(self.written, [])
+        assert([row['trade'] for row in rows] == list(range(25)))
+        assert(len(self.written) < 25)
+
+    def test_flushes_on_time(self):
+        self.writer.start()
+        self.writer.put('trades', [{'trade': 0}])
+        time.sleep(0.3)
+        assert(self.written == [[{'trade': 0}]])
+
+    def test_retries(self):
+        self.writer.start()
+        self.writer.put('flaky', [{'trade': 0}])
+        self.writer.stop()
+        assert(self.failures == 3)
+        assert(self.written == [[{'trade': 0}]])
+        assert(self.writer.num_dropped == 0)
+
+    def test_unknown_writer(self):
+        try:
+            self.writer.put('nope', [])
+            assert(False)
+        except KeyError:
+            pass
+
+    def test_starts_on_first_put(self):
+        assert(self.writer.thread is None)
+        self.writer.put('trades', [{'trade': 0}])
+        assert(self.writer.thread is not None)
+        self.writer.stop()
+        assert(self.writer.thread is None)
+        self.writer.put('trades', [{'trade': 1}])
+        self.writer.stop()
+        assert(sum(self.written, []) == [{'trade': 0}, {'trade': 1}])
+
+    def test_drains_at_exit(self):
+        # queued rows are written even when the process exits without stop()
+        script = "from src.db.write_behind import WriteBehindQueue\n" \
+                 "writer = WriteBehindQueue(flush_seconds=60)\n" \
+                 "writer.register('trades', lambda rows: print(len(rows)))\n" \
+                 "writer.put('trades', [{'trade': i} for i in range(7)])\n"
+        root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+        out = subprocess.check_output([sys.executable, '-c', script], cwd=root,
+                                      env=dict(os.environ, PYTHONPATH=root))
+        assert(out.decode().strip() == '7')